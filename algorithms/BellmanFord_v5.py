@@ -1,81 +1,179 @@
 import numpy as np
 import time
 import multiprocessing as mp
-import matplotlib.pyplot as plt
-import pandas as pd
+from core import kernels
+from core.executors import make_executor
+from core.stats import ensure_stats, SearchStats
+from core.stepper import SearchStepper, RelaxationRound
 
 # Generate a random directed graph
-def generate_graph(nodes, density=0.1):
+# rng is a np.random.RandomState (default: the global numpy state)
+def generate_graph(nodes, density=0.1, rng=None):
+    rng = rng or np.random
     edges = []
     num_edges = int(nodes * nodes * density)
     for _ in range(num_edges):
-        u = np.random.randint(0, nodes)
-        v = np.random.randint(0, nodes)
+        u = rng.randint(0, nodes)
+        v = rng.randint(0, nodes)
         if u != v:
-            weight = np.random.randint(1, 99)
+            weight = rng.randint(1, 99)
             edges.append((u, v, weight))
     return edges, nodes
 
+# Edge orders of the serial engine. 'input' relaxes the edges as listed. 'yen' is Yen's improvement:
+# edges with u <= v by ascending source, then edges with u > v by descending source. Relaxed in place
+# (Gauss-Seidel style), one pass carries a distance along a run of ascending edges and then a run of
+# descending ones, so a shortest path needs one round per two changes of direction and at most about
+# nodes / 2 rounds instead of nodes - 1. Edges of one source are adjacent and their targets ascend,
+# so the pass walks the distance list in order instead of jumping around it.
+EDGE_ORDERS = ('input', 'yen')
+
+# Yen's order as runs of (source, [(target, weight), ...]): the forward runs, then the backward ones
+def yen_runs(graph, nodes):
+    forward = [[] for _ in range(nodes)]
+    backward = [[] for _ in range(nodes)]
+    for u, v, w in graph:
+        (forward if u <= v else backward)[u].append((v, w))
+    return ([(u, sorted(forward[u])) for u in range(nodes) if forward[u]] +
+            [(u, sorted(backward[u])) for u in reversed(range(nodes)) if backward[u]])
+
+def ordered_edges(graph, nodes, order='input'):
+    if order not in EDGE_ORDERS:
+        raise ValueError(f"Unknown edge order {order!r}, expected one of {', '.join(EDGE_ORDERS)}")
+    if order == 'input':
+        return graph
+    return [(u, v, w) for u, run in yen_runs(graph, nodes) for v, w in run]
+
+# One pass over an edge list; returns the number of relaxations
+def relax_edges(edges, distances):
+    relaxations = 0
+    for u, v, w in edges:
+        if distances[u] != float('inf') and distances[u] + w < distances[v]:
+            distances[v] = distances[u] + w
+            relaxations += 1
+    return relaxations
+
+# One pass over source runs, reading each source's distance once. A run is skipped while its source
+# is unreached or still has the distance the run was last relaxed with (relaxed_at): target
+# distances only go down, so none of its edges could relax anything
+def relax_runs(runs, relaxed_at, distances):
+    relaxations = 0
+    for index, (u, targets) in enumerate(runs):
+        distance = distances[u]
+        if distance >= relaxed_at[index]:
+            continue
+        relaxed_at[index] = distance
+        for v, w in targets:
+            if distance + w < distances[v]:
+                distances[v] = distance + w
+                relaxations += 1
+    return relaxations
+
 # Serial Bellman-Ford
-def bellman_ford_serial(graph, nodes, source=0):
+def bellman_ford_serial(graph, nodes, source=0, stats=None, order='input'):
+    if kernels.ACCELERATED:
+        stats = ensure_stats(stats, 'bellman_ford_serial')
+        distances, rounds, relaxations = kernels.bellman_ford(ordered_edges(graph, nodes, order), nodes, source)
+        stats.add('rounds', rounds)
+        stats.add('relaxations', relaxations)
+        return distances
+    return SearchStepper(bellman_ford_steps(graph, nodes, source, stats, order)).run_to_completion()
+
+# Generator form of serial Bellman-Ford: yields a RelaxationRound per pass over the edges
+# (with the live distance list as the partial result) and returns the final distances
+def bellman_ford_steps(graph, nodes, source=0, stats=None, order='input'):
+    stats = ensure_stats(stats, 'bellman_ford_serial')
+    rounds = relaxations = 0
     distances = [float('inf')] * nodes
     distances[source] = 0
-
-    for _ in range(nodes - 1):
-        updated = False
-        for u, v, w in graph:
-            if distances[u] != float('inf') and distances[u] + w < distances[v]:
-                distances[v] = distances[u] + w
-                updated = True
-        if not updated:
-            break  # No updates made, so we can exit early
+    if order not in EDGE_ORDERS:
+        raise ValueError(f"Unknown edge order {order!r}, expected one of {', '.join(EDGE_ORDERS)}")
+    runs = yen_runs(graph, nodes) if order == 'yen' else None
+    relaxed_at = [float('inf')] * len(runs) if runs is not None else None
+
+    try:
+        for _ in range(nodes - 1):
+            rounds += 1
+            if runs is None:
+                count = relax_edges(graph, distances)
+            else:
+                count = relax_runs(runs, relaxed_at, distances)
+            relaxations += count
+            updated = count > 0
+            yield RelaxationRound(rounds, updated, distances)
+            if not updated:
+                break  # No updates made, so we can exit early
+    finally:
+        stats.add('rounds', rounds)
+        stats.add('relaxations', relaxations)
 
     # Final check for negative weight cycle
     for u, v, w in graph:
         if distances[u] != float('inf') and distances[u] + w < distances[v]:
             raise ValueError("Graph contains negative weight cycle")
 
+    return distances
+
+
+# Global variables set up in each worker by init_worker
+global_edge_chunks = None
+global_distances = None
+
+def init_worker(edge_chunks, distances):
+    global global_edge_chunks, global_distances
+    global_edge_chunks = edge_chunks
+    global_distances = distances
 
 # Worker: returns list of (v, new_distance) proposals
-def relax_edges_worker(args):
-    chunk, distances_snapshot = args
+def relax_edges_worker(chunk_index):
+    # One bulk copy of the shared distances per task instead of pickling a snapshot
+    distances_snapshot = global_distances[:]
     proposals = []
-    for u, v, w in chunk:
+    for u, v, w in global_edge_chunks[chunk_index]:
         if distances_snapshot[u] != float('inf') and distances_snapshot[u] + w < distances_snapshot[v]:
             proposals.append((v, distances_snapshot[u] + w))
     return proposals
 
 # Parallel Bellman-Ford with synchronized updates
-def bellman_ford_parallel(graph, nodes, source=0, num_processes=None):
-    if num_processes is None:
-        num_processes = mp.cpu_count()
-
-    manager = mp.Manager()
-    distances = manager.list([float('inf')] * nodes)
-    distances[source] = 0
+def bellman_ford_parallel(graph, nodes, source=0, num_processes=None, stats=None, backend=None):
+    stats = ensure_stats(stats, 'bellman_ford_parallel')
+    rounds = relaxations = 0
 
-    pool = mp.Pool(processes=num_processes)
+    executor = make_executor(backend, num_processes)
+    num_processes = executor.num_workers
 
     edges_per_process = max(1, len(graph) // num_processes)
     edge_chunks = [graph[i:i + edges_per_process] for i in range(0, len(graph), edges_per_process)]
 
-    for _ in range(nodes - 1):
-        snapshot = list(distances)
-        args = [(chunk, snapshot) for chunk in edge_chunks]
-        results = pool.map(relax_edges_worker, args)
+    with executor:
+        distances = executor.array('d', [float('inf')] * nodes)
+        distances[source] = 0
+        executor.start(init_worker, (edge_chunks, distances))
 
-        updated = False
-        for proposals in results:
-            for v, new_dist in proposals:
-                if new_dist < distances[v]:
-                    distances[v] = new_dist
-                    updated = True
+        for _ in range(nodes - 1):
+            rounds += 1
+            args = list(range(len(edge_chunks)))
+            if stats.enabled:
+                stats.measure_pickle(args)
+            with stats.phase('dispatch'):
+                results = executor.map(relax_edges_worker, args)
 
-        if not updated:
-            break
+            updated = False
+            with stats.phase('merge'):
+                for proposals in results:
+                    for v, new_dist in proposals:
+                        if new_dist < distances[v]:
+                            distances[v] = new_dist
+                            updated = True
+                            relaxations += 1
+
+            if not updated:
+                break
 
-    pool.close()
-    pool.join()
+        distances = distances[:]
+
+    stats.add('rounds', rounds)
+    stats.add('relaxations', relaxations)
 
     # Final check for negative cycles
     snapshot = list(distances)
@@ -85,22 +183,156 @@ def bellman_ford_parallel(graph, nodes, source=0, num_processes=None):
 
     return list(distances)
 
+
+# Slots of the shared control array of the asynchronous mode
+VERSION, DONE, EXHAUSTED = 0, 1, 2
+
+# Global variables set up in each worker by init_async_worker
+global_control = None
+global_seen = None
+global_sweep_limit = None
+
+def init_async_worker(edge_chunks, distances, control, seen, sweep_limit):
+    global global_edge_chunks, global_distances, global_control, global_seen, global_sweep_limit
+    global_edge_chunks = edge_chunks
+    global_distances = distances
+    global_control = control
+    global_seen = seen
+    global_sweep_limit = sweep_limit
+
+# Worker of the asynchronous mode: sweeps edge partitions until every partition is quiescent.
+# control[VERSION] counts published improvements; seen[p] is the version at which partition p
+# last made no improvement. Once every partition has seen the current version, no edge can be
+# relaxed and the first worker to notice sets control[DONE]. A worker whose own partition is
+# quiescent sweeps any stale one, so the search also finishes when tasks run one after another.
+# Returns (sweeps, improvements published)
+def relax_async_worker(partition):
+    partitions = len(global_edge_chunks)
+    sweeps = improvements = 0
+    current = partition
+    while not global_control[DONE]:
+        if sweeps >= global_sweep_limit:
+            # Usually a negative cycle; the caller finishes serially and tells the two apart
+            global_control[EXHAUSTED] = 1
+            global_control[DONE] = 1
+            break
+        with global_control.get_lock():
+            version = global_control[VERSION]
+        local = global_distances[:]
+        updates = {}
+        for u, v, w in global_edge_chunks[current]:
+            if local[u] != float('inf') and local[u] + w < local[v]:
+                local[v] = local[u] + w
+                updates[v] = local[v]
+        sweeps += 1
+
+        if updates:
+            published = 0
+            with global_distances.get_lock():
+                for v, new_dist in updates.items():
+                    if new_dist < global_distances[v]:
+                        global_distances[v] = new_dist
+                        published += 1
+            if published:
+                # Distances are written before the version moves, so a sweep that read this
+                # version also read these distances
+                with global_control.get_lock():
+                    global_control[VERSION] += published
+                improvements += published
+            continue
+
+        global_seen[current] = version
+        with global_control.get_lock():
+            version = global_control[VERSION]
+            stale = [p for p in range(partitions) if global_seen[p] != version]
+            if not stale:
+                global_control[DONE] = 1
+                break
+        current = partition if partition in stale else stale[(sweeps + partition) % len(stale)]
+    return sweeps, improvements
+
+# Asynchronous parallel Bellman-Ford: no rounds and no barrier. Every worker keeps relaxing its
+# edge partition against the shared distances and publishes improvements at once, and the search
+# stops by quiescence detection instead of a master-side merge. Stats record the total sweeps of
+# all partitions as rounds.
+def bellman_ford_async(graph, nodes, source=0, num_processes=None, stats=None, backend=None):
+    stats = ensure_stats(stats, 'bellman_ford_async')
+    sweeps = improvements = 0
+
+    executor = make_executor(backend, num_processes)
+    num_processes = executor.num_workers
+
+    edges_per_process = max(1, -(-len(graph) // num_processes))
+    edge_chunks = [graph[i:i + edges_per_process] for i in range(0, len(graph), edges_per_process)] or [[]]
+    # Synchronous Bellman-Ford needs at most nodes - 1 rounds of one sweep per partition
+    sweep_limit = max(1, nodes) * len(edge_chunks)
+
+    with executor:
+        distances = executor.array('d', [float('inf')] * nodes)
+        distances[source] = 0
+        control = executor.array('q', [0, 0, 0])
+        seen = executor.array('q', [-1] * len(edge_chunks))
+        executor.start(init_async_worker, (edge_chunks, distances, control, seen, sweep_limit))
+
+        args = list(range(len(edge_chunks)))
+        if stats.enabled:
+            stats.measure_pickle(args)
+        with stats.phase('dispatch'):
+            for worker_sweeps, worker_improvements in executor.map(relax_async_worker, args):
+                sweeps += worker_sweeps
+                improvements += worker_improvements
+
+        exhausted = control[EXHAUSTED]
+        distances = distances[:]
+
+    snapshot = list(distances)
+    if exhausted:
+        # A worker hit the sweep limit before quiescence. The distances are upper bounds of real
+        # walks, so plain rounds reach the fixpoint within nodes - 1 rounds unless there is a
+        # negative cycle, which the final check then reports
+        for _ in range(max(1, nodes - 1)):
+            count = relax_edges(graph, snapshot)
+            sweeps += 1
+            improvements += count
+            if not count:
+                break
+
+    stats.add('rounds', sweeps)
+    stats.add('relaxations', improvements)
+
+    # Final check for negative cycles
+    for u, v, w in graph:
+        if snapshot[u] != float('inf') and snapshot[u] + w < snapshot[v]:
+            raise ValueError("Graph contains negative weight cycle")
+
+    return snapshot
+
 # Performance comparison
-def compare_performance(node_range, density=0.1):
+# Graphs are seeded (seed is the first trial's seed of core.corpus) or replayed from a corpus
+def compare_performance(node_range, density=0.1, seed=0, corpus=None):
+    from core.corpus import trial_graphs
+
     num_processes = mp.cpu_count()
     results = []
 
     for nodes in node_range:
-        graph, _ = generate_graph(nodes, density)
+        (graph, _), = trial_graphs(nodes, 1, density, seed, corpus)
 
         try:
+            serial_stats = SearchStats()
             start_time = time.time()
-            bellman_ford_serial(graph, nodes)
+            bellman_ford_serial(graph, nodes, stats=serial_stats)
             serial_time = time.time() - start_time
         except ValueError as e:
             print(f"[Serial] Graph with {nodes} nodes contains negative cycle: Skipping")
             continue
 
+        # Yen's edge order; the sort is part of the measured time
+        yen_stats = SearchStats()
+        start_time = time.time()
+        bellman_ford_serial(graph, nodes, stats=yen_stats, order='yen')
+        yen_time = time.time() - start_time
+
         try:
             start_time = time.time()
             bellman_ford_parallel(graph, nodes, num_processes=num_processes)
@@ -109,25 +341,46 @@ def compare_performance(node_range, density=0.1):
             print(f"[Parallel] Graph with {nodes} nodes contains negative cycle: Skipping")
             continue
 
+        try:
+            start_time = time.time()
+            bellman_ford_async(graph, nodes, num_processes=num_processes)
+            async_time = time.time() - start_time
+        except ValueError as e:
+            print(f"[Async] Graph with {nodes} nodes contains negative cycle: Skipping")
+            continue
+
         speedup = serial_time / parallel_time if parallel_time > 0 else 1.0
 
         results.append({
             'Nodes': nodes,
             'Serial Time (s)': serial_time,
+            'Yen Time (s)': yen_time,
             'Parallel Time (s)': parallel_time,
-            'Speedup': speedup
+            'Async Time (s)': async_time,
+            'Speedup': speedup,
+            'Async Speedup': serial_time / async_time if async_time > 0 else 1.0,
+            'Serial Rounds': serial_stats['rounds'],
+            'Yen Rounds': yen_stats['rounds']
         })
-        print(f"Nodes: {nodes}, Serial: {serial_time:.4f}s, Parallel: {parallel_time:.4f}s, Speedup: {speedup:.2f}x")
+        print(f"Nodes: {nodes}, Serial: {serial_time:.4f}s ({serial_stats['rounds']} rounds), "
+              f"Yen: {yen_time:.4f}s ({yen_stats['rounds']} rounds), Parallel: {parallel_time:.4f}s, "
+              f"Async: {async_time:.4f}s, Speedup: {speedup:.2f}x")
 
     return results, num_processes
 
 # Visualization
 def visualize_results(results, num_processes):
+    # Plotting libraries are only needed here; importing them lazily keeps the solvers headless
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
     df = pd.DataFrame(results)
 
     plt.figure(figsize=(10, 5))
     plt.plot(df['Nodes'], df['Serial Time (s)'], label='Serial Time', marker='o')
+    plt.plot(df['Nodes'], df['Yen Time (s)'], label="Serial Time (Yen's edge order)", marker='x')
     plt.plot(df['Nodes'], df['Parallel Time (s)'], label=f'Parallel Time ({num_processes} processes)', marker='s')
+    plt.plot(df['Nodes'], df['Async Time (s)'], label=f'Async Time ({num_processes} processes)', marker='d')
     plt.xlabel('Number of Nodes')
     plt.ylabel('Execution Time (seconds)')
     plt.title('Execution Time vs. Number of Nodes')
@@ -138,6 +391,7 @@ def visualize_results(results, num_processes):
 
     plt.figure(figsize=(10, 5))
     plt.plot(df['Nodes'], df['Speedup'], label='Speedup', marker='^', color='green')
+    plt.plot(df['Nodes'], df['Async Speedup'], label='Async Speedup', marker='v', color='purple')
     plt.xlabel('Number of Nodes')
     plt.ylabel('Speedup (Serial/Parallel)')
     plt.title('Speedup vs. Number of Nodes')
@@ -148,6 +402,8 @@ def visualize_results(results, num_processes):
 
 # Save results to CSV
 def save_results_to_csv(results, num_processes):
+    import pandas as pd
+
     df = pd.DataFrame(results)
     df['Processes'] = num_processes
     df.to_csv('bellman_ford_results.csv', index=False)
@@ -155,10 +411,18 @@ def save_results_to_csv(results, num_processes):
 
 # Main execution
 if __name__ == '__main__':
+    import argparse
+    from core.corpus import Corpus
+
+    parser = argparse.ArgumentParser(description='Compare serial and parallel Bellman-Ford on seeded graphs.')
+    parser.add_argument('--corpus', help='replay the graphs of a corpus directory (see core/corpus.py)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
     node_range = [400, 900, 1600, 3600, 6400]
 
     print(f"Running performance comparison with {mp.cpu_count()} available processes...")
-    results, num_processes = compare_performance(node_range)
+    results, num_processes = compare_performance(node_range, seed=args.seed,
+                                                 corpus=Corpus.load(args.corpus) if args.corpus else None)
 
     if results:
         print("\nGenerating visualizations...")
@@ -1,7 +1,15 @@
 from core.priority_queue import PriorityQueue
+from core.grid import wall_grid_from_nodes
+from core.heuristics import heuristic_field
+from core.maze_utils import same_component, reachable_goals
+from core.stats import ensure_stats
+from core.stepper import Expansion
+import logging
 import math
 import time
 
+logger = logging.getLogger(__name__)
+
 
 def findIndex(list, node):
     for ff in range(len(list)):
@@ -18,7 +26,100 @@ def heuristic(x, y, goal):
     return sum
 
 
-def A_star_Search(start, goal, mazeList, path, finalPath, goal_pen):
+def a_star_steps(start, goal, nodes, stats=None, heuristic_kind='euclidean', walls=None):
+    """Generator form of A*: yields an Expansion per expanded node and returns the path.
+
+    h is read from a cached field from ``core.heuristics`` (in move costs, so it
+    stays admissible); ``heuristic_kind`` picks euclidean, manhattan, true or
+    landmarks. Pass ``walls`` from ``core.grid`` to skip rebuilding it per query.
+    """
+    path_list, _ = yield from multi_a_star_steps([start], [goal], nodes, stats, heuristic_kind, walls)
+    return path_list
+
+
+def multi_a_star_steps(sources, goals, nodes, stats=None, heuristic_kind='euclidean', walls=None):
+    """A* from several sources to the nearest of several goals.
+
+    Sources start at cost 0 and h is the distance to the nearest goal, which
+    keeps it admissible. Yields an Expansion per expanded node and returns
+    (path, reached_goal), or ([], None) when no goal is reachable.
+    """
+    stats = ensure_stats(stats, 'a_star')
+    expansions = relaxations = heap_pushes = stale_pops = 0
+    goals = set(reachable_goals(sources, goals))
+    reached = None
+    if not goals:
+        # Every goal lies in another component: no path, and no heuristic field to build
+        return [], None
+
+    if walls is None:
+        walls = wall_grid_from_nodes(nodes)
+    field = heuristic_field(walls, [(goal.row, goal.col) for goal in goals], heuristic_kind)
+
+    for node in nodes:
+        node.g_cost = float('inf')
+        node.h_cost = float('inf')
+        node.parent = None
+
+    queue = PriorityQueue()
+    for start in sources:
+        start.g_cost = 0
+        start.h_cost = field[start.row, start.col]
+        # Ties on f go to the node nearest the goal, so an exact field walks straight to it
+        queue.put(start, (start.f_cost(), start.h_cost))
+        heap_pushes += 1
+    closed = set()
+
+    try:
+        while not queue.is_empty():
+            current = queue.get()
+            if current in closed:
+                stale_pops += 1
+                continue
+            closed.add(current)
+            expansions += 1
+            yield Expansion(current, len(queue.elements))
+
+            if current in goals:
+                reached = current
+                break
+
+            for neighbor in current.friend:
+                if neighbor.data == "X" or neighbor in closed:
+                    continue
+                tentative_g = current.g_cost + 20
+                if tentative_g < neighbor.g_cost:
+                    neighbor.parent = current
+                    neighbor.g_cost = tentative_g
+                    neighbor.h_cost = field[neighbor.row, neighbor.col]
+                    queue.put(neighbor, (neighbor.f_cost(), neighbor.h_cost))
+                    relaxations += 1
+                    heap_pushes += 1
+    finally:
+        stats.add('expansions', expansions)
+        stats.add('relaxations', relaxations)
+        stats.add('heap_pushes', heap_pushes)
+        stats.add('stale_pops', stale_pops)
+
+    if reached is None:
+        return [], None
+    with stats.phase('reconstruct'):
+        path_list = []
+        current = reached
+        while current is not None:
+            path_list.append(current)
+            current = current.parent
+        path_list.reverse()
+    return path_list, reached
+
+
+def A_star_Search(start, goal, mazeList, path, finalPath, goal_pen, stats=None):
+    stats = ensure_stats(stats, 'a_star')
+    if not same_component(start, goal):
+        logger.info("Goal is walled off from the start; no path")
+        return
+    expansions = relaxations = heap_pushes = 0
+    found = False
     queue = PriorityQueue()
     visited = []
     parent = []
@@ -29,8 +130,10 @@ def A_star_Search(start, goal, mazeList, path, finalPath, goal_pen):
     for i in range(len(mazeList)):
         parent.append(None)
     visited[0] = 1
-    while queue.peek() != goal:
+    heap_pushes += 1
+    while not queue.is_empty() and queue.peek() != goal:
         vertex = queue.get()
+        expansions += 1
         if vertex.data != "p":
             path.goto(vertex.x, vertex.y)
             path.speed(0)
@@ -44,15 +147,24 @@ def A_star_Search(start, goal, mazeList, path, finalPath, goal_pen):
             if visited[index] != 1 and neighbours.data != "X":
                 visited[index] = 1
                 queue.put(neighbours, f_cost)
+                relaxations += 1
+                heap_pushes += 1
                 parent[index] = vertex
                 if neighbours.data == "G":
-                    print(True)
-                    print(index)
+                    logger.debug("Goal reached at index %d", index)
                     index2 = index
+                    found = True
                     goal_pen.color("red")
-    while parent[index2].data != start.data:
-        node = parent[index2]
-        index2 = findIndex(mazeList, node)
-        finalPath.goto(node.x, node.y)
-        finalPath.stamp()
-        finalPath.speed(0)
+    stats.add('expansions', expansions)
+    stats.add('relaxations', relaxations)
+    stats.add('heap_pushes', heap_pushes)
+    if not found:
+        logger.info("Goal not reached; no path")
+        return
+    with stats.phase('reconstruct'):
+        while parent[index2] is not None and parent[index2].data != start.data:
+            node = parent[index2]
+            index2 = findIndex(mazeList, node)
+            finalPath.goto(node.x, node.y)
+            finalPath.stamp()
+            finalPath.speed(0)
@@ -0,0 +1,217 @@
+"""All-pairs distance oracle stored as memory-mapped .npy files.
+
+For a maze with N open cells, ``build_oracle`` writes next to ``prefix``:
+
+    <prefix>.walls.npy   bool  (rows, cols)  the maze, to rebuild the cell index
+    <prefix>.dist.npy    int32 (N, N)        move cost between open cells, -1 if unreachable
+    <prefix>.next.npy    uint8 (N, N)        next[target, cell]: index into core.grid.DIRECTIONS
+                                             of the first move from cell toward target
+
+Moves are undirected, so row ``t`` of both tables comes from one search out of
+``t``. Lookups read one entry and paths follow the next-hop table one move at a
+time, so a loaded oracle answers queries without searching.
+"""
+import argparse
+import logging
+import math
+import time
+
+import numpy as np
+
+from core.executors import make_executor
+from core.grid import EDGE_WEIGHT, DIRECTIONS, fingerprint, open_cells, wall_grid
+from core.heuristics import distance_field
+from core.maze_utils import read_File_Create_List
+from core.stats import ensure_stats
+
+logger = logging.getLogger(__name__)
+
+UNREACHABLE = -1
+NO_HOP = 255
+# Above this many open cells the O(N^3) Floyd-Warshall loses to one BFS per source
+FLOYD_WARSHALL_LIMIT = 600
+
+# Global variables set up in each worker by init_worker
+global_walls = None
+global_cells = None
+global_prefix = None
+global_tables = None
+
+
+def init_worker(walls, cells, prefix):
+    """Initializer function to set up global variables in each worker."""
+    global global_walls, global_cells, global_prefix, global_tables
+    global_walls = walls
+    global_cells = cells
+    global_prefix = prefix
+    global_tables = None
+
+
+def table_paths(prefix):
+    return f"{prefix}.walls.npy", f"{prefix}.dist.npy", f"{prefix}.next.npy"
+
+
+def next_hops(field):
+    """Direction code of the first move from every cell toward the source of a distance field."""
+    height, width = field.shape
+    hops = np.full(field.shape, NO_HOP, dtype=np.uint8)
+    padded = np.pad(field, 1, constant_values=np.inf)
+    for code, (d_row, d_col) in enumerate(DIRECTIONS):
+        neighbor = padded[1 + d_row:1 + d_row + height, 1 + d_col:1 + d_col + width]
+        hops[(hops == NO_HOP) & np.isfinite(field) & (neighbor == field - EDGE_WEIGHT)] = code
+    return hops
+
+
+def to_int32(distances):
+    return np.where(np.isfinite(distances), distances, UNREACHABLE).astype(np.int32)
+
+
+def solve_targets(targets):
+    """Fill rows ``targets`` of the on-disk tables with one BFS each; runs in a worker."""
+    global global_tables
+    if global_tables is None:
+        _, dist_path, next_path = table_paths(global_prefix)
+        global_tables = np.load(dist_path, mmap_mode='r+'), np.load(next_path, mmap_mode='r+')
+    dist, hops = global_tables
+    rows, cols = global_cells[:, 0], global_cells[:, 1]
+    for target in targets:
+        field = distance_field(global_walls, [tuple(global_cells[target])])
+        dist[target] = to_int32(field[rows, cols])
+        hops[target] = next_hops(field)[rows, cols]
+    dist.flush()
+    hops.flush()
+    return len(targets)
+
+
+def floyd_warshall(walls, cells):
+    """All-pairs distances in move costs by vectorized Floyd-Warshall (inf if unreachable)."""
+    count = len(cells)
+    index = np.full(walls.shape, -1, dtype=np.int64)
+    index[cells[:, 0], cells[:, 1]] = np.arange(count)
+    dist = np.full((count, count), np.inf)
+    np.fill_diagonal(dist, 0.0)
+    for d_row, d_col in DIRECTIONS:
+        n_rows, n_cols = cells[:, 0] + d_row, cells[:, 1] + d_col
+        inside = (n_rows >= 0) & (n_rows < walls.shape[0]) & (n_cols >= 0) & (n_cols < walls.shape[1])
+        neighbors = np.full(count, -1, dtype=np.int64)
+        neighbors[inside] = index[n_rows[inside], n_cols[inside]]
+        linked = neighbors >= 0
+        dist[np.arange(count)[linked], neighbors[linked]] = EDGE_WEIGHT
+    for k in range(count):
+        np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+    return dist
+
+
+def build_oracle(walls, prefix, num_processes=None, backend=None, method=None, stats=None):
+    """Precompute every pairwise distance and next hop of ``walls`` into memory-mapped files.
+
+    ``method`` is 'bfs' (one breadth-first search per cell, spread over an
+    executor from ``core.executors``) or 'floyd-warshall' (vectorized, in this
+    process); by default Floyd-Warshall is used up to FLOYD_WARSHALL_LIMIT open
+    cells. Returns the loaded DistanceOracle.
+    """
+    stats = ensure_stats(stats, 'all_pairs')
+    cells = open_cells(walls)
+    count = len(cells)
+    if method is None:
+        method = 'floyd-warshall' if count <= FLOYD_WARSHALL_LIMIT else 'bfs'
+    walls_path, dist_path, next_path = table_paths(prefix)
+    np.save(walls_path, walls)
+    dist = np.lib.format.open_memmap(dist_path, mode='w+', dtype=np.int32, shape=(count, count))
+    hops = np.lib.format.open_memmap(next_path, mode='w+', dtype=np.uint8, shape=(count, count))
+    logger.info("Building all-pairs oracle for %d cells (%d MB) with %s", count,
+                (dist.nbytes + hops.nbytes) // (1024 * 1024), method)
+
+    if method == 'floyd-warshall':
+        with stats.phase('dispatch'):
+            matrix = floyd_warshall(walls, cells)
+        with stats.phase('merge'):
+            field = np.full(walls.shape, np.inf)
+            for target in range(count):
+                dist[target] = to_int32(matrix[target])
+                field[cells[:, 0], cells[:, 1]] = matrix[target]
+                hops[target] = next_hops(field)[cells[:, 0], cells[:, 1]]
+        dist.flush()
+        hops.flush()
+    elif method == 'bfs':
+        dist.flush()
+        hops.flush()
+        del dist, hops
+        with make_executor(backend, num_processes) as executor:
+            chunk = max(1, math.ceil(count / (executor.num_workers * 4)))
+            tasks = [range(start, min(start + chunk, count)) for start in range(0, count, chunk)]
+            if stats.enabled:
+                stats.measure_pickle(tasks)
+            executor.start(init_worker, (walls, cells, prefix))
+            with stats.phase('dispatch'):
+                executor.map(solve_targets, tasks)
+    else:
+        raise ValueError(f"Unknown method {method!r}, expected 'bfs' or 'floyd-warshall'")
+    stats.add('expansions', count)
+    return DistanceOracle.load(prefix)
+
+
+class DistanceOracle:
+    """O(1) distance lookups and O(path length) paths from the files written by ``build_oracle``."""
+
+    def __init__(self, walls, dist, hops):
+        self.walls = walls
+        self.dist = dist
+        self.next = hops
+        self.cells = open_cells(walls)
+        self.index = np.full(walls.shape, -1, dtype=np.int32)
+        self.index[self.cells[:, 0], self.cells[:, 1]] = np.arange(len(self.cells), dtype=np.int32)
+        self.key = fingerprint(walls)
+
+    @classmethod
+    def load(cls, prefix):
+        walls_path, dist_path, next_path = table_paths(prefix)
+        return cls(np.load(walls_path), np.load(dist_path, mmap_mode='r'), np.load(next_path, mmap_mode='r'))
+
+    def matches(self, walls):
+        """True if the oracle was built for this wall layout."""
+        return self.key == fingerprint(walls)
+
+    def cell_index(self, cell):
+        row, col = cell
+        if not (0 <= row < self.index.shape[0] and 0 <= col < self.index.shape[1]) or self.index[row, col] < 0:
+            raise ValueError(f"{cell} is not an open cell of this maze")
+        return int(self.index[row, col])
+
+    def distance(self, start, goal):
+        """Move cost from ``start`` to ``goal`` (cells as (row, col)), or None if unreachable."""
+        value = int(self.dist[self.cell_index(goal), self.cell_index(start)])
+        return None if value == UNREACHABLE else value
+
+    def path(self, start, goal):
+        """Cells from ``start`` to ``goal`` inclusive, or [] if unreachable."""
+        target = self.cell_index(goal)
+        row, col = start
+        current = self.cell_index(start)
+        if self.dist[target, current] == UNREACHABLE:
+            return []
+        path = [(row, col)]
+        while current != target:
+            d_row, d_col = DIRECTIONS[self.next[target, current]]
+            row, col = row + d_row, col + d_col
+            current = int(self.index[row, col])
+            path.append((row, col))
+        return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute an all-pairs distance oracle for a maze.')
+    parser.add_argument('--maze', default='maze.txt')
+    parser.add_argument('--out', default=None, help='file prefix for the tables (default: the maze name)')
+    parser.add_argument('--method', choices=('bfs', 'floyd-warshall'), default=None)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--backend', default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    walls = wall_grid(read_File_Create_List(args.maze))
+    prefix = args.out or args.maze.rsplit('.', 1)[0] + '_oracle'
+    start_time = time.time()
+    oracle = build_oracle(walls, prefix, args.processes, args.backend, args.method)
+    print(f"Built {len(oracle.cells)}x{len(oracle.cells)} oracle in {time.time() - start_time:.2f}s: "
+          f"{', '.join(table_paths(prefix))}")
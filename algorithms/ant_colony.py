@@ -0,0 +1,288 @@
+"""Multi-colony ant colony optimization over the maze graph.
+
+Pheromone and visibility live in (cells, 4) NumPy arrays indexed by cell id and
+neighbor slot (the order of ``node.friend``). All ants of an iteration move
+together: each step draws the next slot of every walking ant from one
+vectorized roulette over ``pheromone ** alpha * visibility ** beta``. Walks are
+loop-erased once they reach the goal, and pheromone follows the MAX-MIN
+scheme: evaporate, deposit along the iteration's best path, clamp to
+[tau_min, tau_max] so no colony stagnates.
+
+Colonies are independent tasks on an executor from ``core.executors``; their
+pheromone tables sit side by side in one shared array. After every epoch the
+colonies' best paths are compared and the overall best is handed to every
+colony, which reinforces it at the start of the next epoch.
+
+This is a heuristic: it returns good routes on mazes where exact search is too
+slow, and stops early only when the route is provably optimal.
+"""
+import logging
+import time
+
+import numpy as np
+
+from core.executors import make_executor
+from core.grid import neighbor_table, wall_grid_from_nodes
+from core.heuristics import heuristic_field
+from core.maze_utils import same_component
+from core.stats import ensure_stats, ProgressLogger
+from core.stepper import SearchStepper, ColonyEpoch
+
+logger = logging.getLogger(__name__)
+
+# tau_min as a fraction of tau_max
+TAU_MIN_RATIO = 0.01
+# Walks that reached the goal that are loop-erased per iteration, shortest raw walk first
+CANDIDATES = 8
+# Once a route is known, walks longer than this many times its moves are abandoned
+WALK_LIMIT = 3
+# Route costs below this (zero-weight edges) are rounded up before pheromone amounts are derived from them
+MIN_COST = 1e-9
+
+# Global variables set up in each worker by init_worker
+global_neighbors = None
+global_weights = None
+global_visibility = None
+global_pheromones = None
+global_params = None
+
+
+def init_worker(neighbors, weights, visibility, pheromones, params):
+    """Initializer function to set up global variables in each worker."""
+    global global_neighbors, global_weights, global_visibility, global_pheromones, global_params
+    global_neighbors = neighbors
+    global_weights = weights
+    global_visibility = visibility
+    global_pheromones = pheromones
+    global_params = params
+
+
+def erase_loops(walk):
+    """Walk with every cycle cut out, so each cell appears at most once."""
+    position = {}
+    path = []
+    for cell in walk:
+        if cell in position:
+            cut = position[cell] + 1
+            for removed in path[cut:]:
+                del position[removed]
+            del path[cut:]
+        else:
+            position[cell] = len(path)
+            path.append(cell)
+    return path
+
+
+def path_slots(neighbors, path):
+    """Neighbor slot taken at every move of ``path`` (cell ids)."""
+    path = np.asarray(path, dtype=np.int64)
+    return (neighbors[path[:-1]] == path[1:, None]).argmax(axis=1)
+
+
+def path_cost(neighbors, weights, path):
+    if len(path) < 2:
+        return 0.0
+    return float(weights[np.asarray(path[:-1]), path_slots(neighbors, path)].sum())
+
+
+def reward(cost):
+    """Pheromone deposited per move of a route of ``cost``."""
+    return 1.0 / max(cost, MIN_COST)
+
+
+def deposit(tau, neighbors, path, amount):
+    if len(path) > 1:
+        np.add.at(tau, (np.asarray(path[:-1]), path_slots(neighbors, path)), amount)
+
+
+def run_colony(task):
+    """Run one colony for an epoch of iterations; runs in a worker.
+
+    Args:
+        task: (colony, epoch, elite) where elite is (path, cost) of the best
+            route known to any colony, or None
+
+    Returns:
+        (colony, best_path, best_cost, arrivals, steps) for this epoch
+    """
+    colony, epoch, elite = task
+    neighbors, weights, visibility = global_neighbors, global_weights, global_visibility
+    p = global_params
+    cells = len(neighbors)
+    offset = colony * cells * 4
+    tau = np.array(global_pheromones[offset:offset + cells * 4], dtype=np.float64).reshape(cells, 4)
+    rng = np.random.default_rng((p['seed'], colony, epoch))
+    valid = neighbors >= 0
+    start, goal, ants = p['start'], p['goal'], p['ants']
+    rows = np.arange(ants)
+
+    best_path, best_cost = (list(elite[0]), elite[1]) if elite else (None, np.inf)
+    if elite:
+        deposit(tau, neighbors, best_path, reward(best_cost))
+    arrivals = steps = 0
+
+    for _ in range(p['iterations']):
+        limit = p['max_steps'] if best_path is None else min(p['max_steps'], WALK_LIMIT * (len(best_path) - 1))
+        desirability = np.where(valid, tau ** p['alpha'] * visibility, 0.0)
+        position = np.full(ants, start, dtype=np.int64)
+        previous = np.full(ants, -1, dtype=np.int64)
+        arrived_at = np.zeros(ants, dtype=np.int64)
+        walking = np.ones(ants, dtype=bool)
+        trail = np.empty((limit + 1, ants), dtype=np.int64)
+        trail[0] = start
+
+        for step in range(1, limit + 1):
+            active = np.flatnonzero(walking)
+            if not len(active):
+                break
+            here = position[active]
+            options = neighbors[here]
+            weight = desirability[here]
+            # Never turn straight back unless it is the only way on (a dead end)
+            back = options == previous[active, None]
+            weight = np.where(back & ((weight * ~back).sum(axis=1) > 0)[:, None], 0.0, weight)
+            cumulative = weight.cumsum(axis=1)
+            total = cumulative[:, -1]
+            stuck = total <= 0
+            draw = rng.random(len(active)) * total
+            slot = np.minimum((cumulative <= draw[:, None]).sum(axis=1), 3)
+            chosen = options[rows[:len(active)], slot]
+            chosen[stuck] = here[stuck]
+
+            previous[active] = here
+            position[active] = chosen
+            trail[step, active] = chosen
+            steps += len(active)
+            done = chosen == goal
+            arrived_at[active[done]] = step
+            walking[active[done | stuck]] = False
+
+        tau *= 1.0 - p['evaporation']
+        finished = np.flatnonzero(arrived_at > 0)
+        arrivals += len(finished)
+        iteration_path, iteration_cost = None, np.inf
+        for ant in finished[np.argsort(arrived_at[finished])[:CANDIDATES]]:
+            path = erase_loops(trail[:arrived_at[ant] + 1, ant].tolist())
+            cost = path_cost(neighbors, weights, path)
+            if cost < iteration_cost:
+                iteration_path, iteration_cost = path, cost
+        if iteration_path is not None:
+            deposit(tau, neighbors, iteration_path, reward(iteration_cost))
+            if iteration_cost < best_cost:
+                best_path, best_cost = iteration_path, iteration_cost
+        if best_path is not None:
+            tau_max = reward(best_cost) / p['evaporation']
+            np.clip(tau, tau_max * TAU_MIN_RATIO, tau_max, out=tau)
+
+    global_pheromones[offset:offset + cells * 4] = tau.ravel().tolist()
+    return colony, best_path, best_cost, arrivals, steps
+
+
+def ant_colony_steps(start, goal, nodes, colonies=None, ants=64, epochs=20, iterations=5, alpha=1.0, beta=2.0,
+                     evaporation=0.1, max_steps=None, seed=0, edge_cost=None, stats=None, backend=None):
+    """Generator form of the multi-colony search: yields a ColonyEpoch per epoch and returns the best path.
+
+    ``colonies`` independent colonies (default: one per worker) of ``ants``
+    ants each run ``iterations`` iterations per epoch, then exchange their
+    best routes. Initial pheromone comes from ``node.pheromone``; afterwards
+    each node's ``pheromone`` holds the colonies' mean trail strength leaving
+    it, and ``parent``/``g_cost`` follow the best path. ``max_steps`` caps a
+    walk (default: the number of cells). Closing the generator shuts the
+    worker pool down.
+    """
+    stats = ensure_stats(stats, 'ant_colony')
+    progress = ProgressLogger(logger, sample_every=1)
+    if not same_component(start, goal):
+        logger.info("Goal is in another component; no path")
+        return []
+    if start is goal:
+        # Nothing to search; no colony is started and the pheromone is left as it was
+        for node in nodes:
+            node.parent = None
+            node.g_cost = float('inf')
+        start.g_cost = 0.0
+        yield ColonyEpoch(0, 0.0, [start])
+        return [start]
+
+    neighbors, weights = neighbor_table(nodes, edge_cost)
+    rows = np.array([node.row for node in nodes])
+    cols = np.array([node.col for node in nodes])
+    field = heuristic_field(wall_grid_from_nodes(nodes), (goal.row, goal.col), 'manhattan')
+    # Visibility of a move: inverse of its cost plus the estimated rest of the way, raised to beta once
+    remaining = np.where(neighbors >= 0, field[rows[neighbors], cols[neighbors]], np.inf)
+    visibility = np.where(neighbors >= 0, (1.0 / np.maximum(weights + remaining, MIN_COST)) ** beta, 0.0)
+    initial = np.repeat(np.array([node.pheromone for node in nodes], dtype=np.float64), 4)
+    # With unit moves the manhattan field is a lower bound, so reaching it proves optimality
+    lower_bound = field[start.row, start.col] if edge_cost is None else None
+
+    executor = make_executor(backend, colonies)
+    colonies = colonies or executor.num_workers
+    params = {'start': start.id, 'goal': goal.id, 'ants': ants, 'iterations': iterations, 'alpha': alpha,
+              'evaporation': evaporation, 'max_steps': max_steps or len(nodes), 'seed': seed}
+    logger.info("Running %d colonies of %d ants on %d %s workers", colonies, ants, executor.num_workers,
+                executor.name)
+
+    best_path, best_cost = None, np.inf
+    epoch = steps = arrivals = 0
+    try:
+        with executor:
+            pheromones = executor.array('d', np.tile(initial, colonies).tolist())
+            executor.start(init_worker, (neighbors, weights, visibility, pheromones, params))
+            for epoch in range(1, epochs + 1):
+                elite = (best_path, best_cost) if best_path is not None else None
+                tasks = [(colony, epoch, elite) for colony in range(colonies)]
+                if stats.enabled:
+                    stats.measure_pickle(tasks)
+                with stats.phase('dispatch'):
+                    results = executor.map(run_colony, tasks)
+                with stats.phase('merge'):
+                    for _, path, cost, colony_arrivals, colony_steps in results:
+                        arrivals += colony_arrivals
+                        steps += colony_steps
+                        if path is not None and cost < best_cost:
+                            best_path, best_cost = path, cost
+                progress.update("Epoch %d: best cost %s", epoch, best_cost)
+                yield ColonyEpoch(epoch, best_cost, [nodes[cell] for cell in best_path] if best_path else [])
+                if lower_bound is not None and best_cost <= lower_bound:
+                    logger.info("Best path meets the lower bound; stopping after epoch %d", epoch)
+                    break
+            # Copy results out before the backend releases its shared arrays
+            trails = np.array(pheromones[:], dtype=np.float64).reshape(colonies, len(nodes), 4)
+    finally:
+        stats.add('rounds', epoch)
+        stats.add('expansions', steps)
+        stats.add('relaxations', arrivals)
+
+    for node, strength in zip(nodes, trails.mean(axis=0).sum(axis=1).tolist()):
+        node.pheromone = strength
+        node.parent = None
+        node.g_cost = float('inf')
+    if best_path is None:
+        logger.info("No ant reached the goal")
+        return []
+    with stats.phase('reconstruct'):
+        path = [nodes[cell] for cell in best_path]
+        cost = 0.0
+        path[0].g_cost = 0.0
+        for parent, child, slot in zip(path, path[1:], path_slots(neighbors, best_path).tolist()):
+            cost += weights[parent.id, slot]
+            child.parent = parent
+            child.g_cost = cost
+    logger.info("Best path cost %.0f after %d epochs", best_cost, epoch)
+    return path
+
+
+def ant_colony(start, goal, nodes, colonies=None, ants=64, epochs=20, iterations=5, stats=None, backend=None,
+               **options):
+    """Best path found by the multi-colony search; returns (path, execution_time, epochs).
+
+    ``options`` are passed on to ``ant_colony_steps`` (alpha, beta,
+    evaporation, max_steps, seed, edge_cost).
+    """
+    start_time = time.time()
+    stepper = SearchStepper(ant_colony_steps(start, goal, nodes, colonies, ants, epochs, iterations,
+                                             stats=stats, backend=backend, **options))
+    path = stepper.run_to_completion()
+    execution_time = time.time() - start_time
+    logger.info("Ant colony search completed in %.4f seconds", execution_time)
+    return path, execution_time, stepper.steps
@@ -0,0 +1,226 @@
+"""Batched top-k frontier expansion for Dijkstra and A*.
+
+The serial engines pop one node per loop iteration and relax its neighbors one
+at a time in Python. Here every iteration pops the ``batch_size`` best
+frontier nodes at once and relaxes all of their neighbors with NumPy array
+operations over the (cells, 4) neighbor table of ``core.grid.neighbor_table``:
+one gather of candidate costs, one sort to keep the cheapest candidate per
+target, one masked compare against the cost array.
+
+Popping k nodes at a time expands some of them before their cost is final.
+Optimality is kept by the usual re-expansion rule: a node whose cost improves
+after it was expanded goes back into the frontier and is expanded again, and
+the search only stops once the goal's cost is no larger than the smallest f in
+the frontier (with a consistent heuristic, no frontier node can lead to a
+cheaper route after that). ``batch_size=1`` is the plain one-node-per-iteration
+search.
+
+When a backend or a worker count is given, each batch is dispatched as one
+``executor.map`` call over an executor from ``core.executors``, split into one
+slice per worker, instead of one task per expanded node as in
+``parallel_a_star``. Workers hold the neighbor table from ``init_worker`` and
+return the reduced candidates of their slice; only the main process touches
+the cost array and the frontier.
+"""
+import heapq
+import logging
+import time
+
+import numpy as np
+
+from core.executors import make_executor
+from core.grid import neighbor_table, wall_grid_from_nodes
+from core.heuristics import heuristic_field
+from core.maze_utils import same_component
+from core.stats import ensure_stats, ProgressLogger
+from core.stepper import SearchStepper, FrontierBatch
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('dijkstra', 'a_star')
+DEFAULT_BATCH = 32
+
+# Global variables set up in each worker by init_worker
+global_neighbors = None
+global_weights = None
+
+
+def init_worker(neighbors, weights):
+    """Initializer function to set up global variables in each worker."""
+    global global_neighbors, global_weights
+    global_neighbors = neighbors
+    global_weights = weights
+
+
+def relax_batch(neighbors, weights, batch, costs):
+    """Cheapest candidate per neighbor of a batch of expanded nodes.
+
+    Args:
+        neighbors, weights: (cells, 4) arrays from ``neighbor_table``
+        batch: ids of the expanded nodes
+        costs: their g costs, in the same order
+
+    Returns:
+        (targets, candidate costs, parents) arrays with one entry per distinct target
+    """
+    targets = neighbors[batch]
+    candidates = costs[:, None] + weights[batch]
+    parents = np.broadcast_to(batch[:, None], targets.shape)
+    present = targets >= 0
+    targets, candidates, parents = targets[present], candidates[present], parents[present]
+    order = np.lexsort((candidates, targets))
+    targets, candidates, parents = targets[order], candidates[order], parents[order]
+    first = np.ones(len(targets), dtype=bool)
+    first[1:] = targets[1:] != targets[:-1]
+    return targets[first], candidates[first], parents[first]
+
+
+def relax_slice(task):
+    """``relax_batch`` over the worker's neighbor table; runs in a worker."""
+    batch, costs = task
+    return relax_batch(global_neighbors, global_weights, batch, costs)
+
+
+def batched_steps(start, goal, nodes, kind='a_star', batch_size=DEFAULT_BATCH, stats=None, num_processes=None,
+                  backend=None, heuristic_kind='manhattan'):
+    """Generator form of batched search: yields a FrontierBatch per expanded batch and returns the path.
+
+    ``kind`` is 'dijkstra' or 'a_star' (heuristic field ``heuristic_kind``,
+    which must be consistent for the result to be optimal). Batches are
+    relaxed in the calling process unless ``backend`` or ``num_processes`` is
+    given. Closing the generator shuts the worker pool down.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind {kind!r}, expected one of {', '.join(KINDS)}")
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    stats = ensure_stats(stats, f'batched_{kind}')
+    progress = ProgressLogger(logger)
+
+    if not same_component(start, goal):
+        logger.info("Goal is in another component; no path")
+        return []
+
+    neighbors, weights = neighbor_table(nodes)
+    for node in nodes:
+        node.g_cost = float('inf')
+        node.h_cost = 0
+        node.parent = None
+    if kind == 'a_star':
+        field = heuristic_field(wall_grid_from_nodes(nodes), (goal.row, goal.col), heuristic_kind)
+        h_costs = field[[node.row for node in nodes], [node.col for node in nodes]]
+    else:
+        h_costs = np.zeros(len(nodes))
+
+    g_costs = np.full(len(nodes), np.inf)
+    parent = np.full(len(nodes), -1, dtype=np.int64)
+    # Cost each node had when it was last expanded; it is expanded again only if it got cheaper since
+    expanded_at = np.full(len(nodes), np.inf)
+    g_costs[start.id] = 0
+    frontier = [(float(h_costs[start.id]), start.id)]
+    goal_id = goal.id
+    expansions = reexpansions = relaxations = heap_pushes = stale_pops = batches = 0
+
+    executor = None
+    try:
+        if backend is not None or num_processes is not None:
+            executor = make_executor(backend, num_processes)
+            logger.info("Relaxing batches of %d with %d %s workers", batch_size, executor.num_workers,
+                        executor.name)
+            executor.start(init_worker, (neighbors, weights))
+
+        while frontier:
+            # Pop the batch_size best live entries; stop once nothing left can beat the goal's cost
+            batch = []
+            while frontier and len(batch) < batch_size:
+                f_cost, u = frontier[0]
+                if f_cost >= g_costs[goal_id]:
+                    break
+                heapq.heappop(frontier)
+                if g_costs[u] >= expanded_at[u] or f_cost != g_costs[u] + h_costs[u]:
+                    stale_pops += 1
+                    continue
+                if expanded_at[u] < np.inf:
+                    reexpansions += 1
+                expanded_at[u] = g_costs[u]
+                batch.append(u)
+            if not batch:
+                break
+            batches += 1
+            expansions += len(batch)
+            batch = np.asarray(batch, dtype=np.int64)
+            batch_costs = g_costs[batch]
+
+            if executor is None:
+                targets, candidates, parents = relax_batch(neighbors, weights, batch, batch_costs)
+            else:
+                slices = np.array_split(np.arange(len(batch)), min(executor.num_workers, len(batch)))
+                tasks = [(batch[part], batch_costs[part]) for part in slices]
+                if stats.enabled:
+                    stats.measure_pickle(tasks)
+                with stats.phase('dispatch'):
+                    results = executor.map(relax_slice, tasks)
+                targets, candidates, parents = (np.concatenate(arrays) for arrays in zip(*results))
+
+            with stats.phase('merge'):
+                improved = candidates < g_costs[targets]
+                targets, candidates, parents = targets[improved], candidates[improved], parents[improved]
+                # Slices may share targets; write the cheapest candidate last so it wins
+                order = np.argsort(-candidates, kind='stable')
+                g_costs[targets[order]] = candidates[order]
+                parent[targets[order]] = parents[order]
+                targets = np.unique(targets)
+                relaxations += len(targets)
+                for v, f_cost in zip(targets.tolist(), (g_costs[targets] + h_costs[targets]).tolist()):
+                    heapq.heappush(frontier, (f_cost, v))
+                heap_pushes += len(targets)
+
+            expanded = [nodes[u] for u in batch.tolist()]
+            for node in expanded:
+                node.g_cost = float(g_costs[node.id])
+                node.parent = nodes[parent[node.id]] if parent[node.id] >= 0 else None
+            progress.update("Expanded %d nodes in %d batches. Frontier size: %d", expansions, batches,
+                            len(frontier))
+            yield FrontierBatch(expanded, batches)
+    finally:
+        if executor is not None:
+            executor.close()
+        stats.add('expansions', expansions)
+        stats.add('reexpansions', reexpansions)
+        stats.add('relaxations', relaxations)
+        stats.add('heap_pushes', heap_pushes)
+        stats.add('stale_pops', stale_pops)
+        stats.add('batches', batches)
+
+    with stats.phase('reconstruct'):
+        for node in nodes:
+            node.g_cost = float(g_costs[node.id])
+            node.h_cost = float(h_costs[node.id])
+            node.parent = nodes[parent[node.id]] if parent[node.id] >= 0 else None
+        path = []
+        if g_costs[goal_id] < np.inf:
+            current = goal
+            while current is not None:
+                path.append(current)
+                current = current.parent
+            path.reverse()
+    if path:
+        logger.info("Path found with %d steps after %d expansions (%d repeated)", len(path), expansions,
+                    reexpansions)
+    else:
+        logger.info("No path found!")
+    return path
+
+
+def batched_search(start, goal, nodes, kind='a_star', batch_size=DEFAULT_BATCH, stats=None, num_processes=None,
+                   backend=None, heuristic_kind='manhattan'):
+    """Batched Dijkstra or A*; returns (path, execution_time, batches)."""
+    start_time = time.time()
+    stepper = SearchStepper(batched_steps(start, goal, nodes, kind, batch_size, stats, num_processes, backend,
+                                          heuristic_kind))
+    batches = 0
+    for _ in stepper:
+        batches += 1
+    execution_time = time.time() - start_time
+    logger.info("Batched %s finished in %.4f seconds", kind, execution_time)
+    return stepper.result, execution_time, batches
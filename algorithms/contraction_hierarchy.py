@@ -0,0 +1,382 @@
+"""Contraction hierarchies for fast point-to-point queries on a static maze.
+
+Preprocessing contracts the open cells one independent set at a time, in the
+order of their edge difference (shortcuts a contraction adds, minus the edges
+it removes, plus neighbors already contracted). Contracting ``v`` adds a
+shortcut ``u - w`` of cost ``d(u, v) + d(v, w)`` between two of its neighbors
+unless a bounded witness search finds a path at least as cheap that avoids
+``v``. Witness searches of a round run on an executor from
+``core.executors``: the remaining graph is published once per round as CSR
+in shared arrays the workers read, and every task carries only a batch of
+vertices to simulate.
+
+The result is written as one ``.npz`` file:
+
+    walls          bool  (rows, cols)  the maze, to rebuild the cell index
+    rank           int32 (N,)          contraction order of every open cell
+    indptr         int64 (N + 1,)      upward edges (toward higher rank) as CSR
+    indices        int32 (E,)
+    weights        int32 (E,)
+    middle         int32 (E,)          contracted vertex a shortcut bypasses, -1 for a maze move
+
+A query runs Dijkstra upward from both ends, meets at the highest vertex of
+the shortest path and unpacks the shortcuts back into cells, settling a few
+hundred vertices where Dijkstra settles thousands.
+"""
+import argparse
+import heapq
+import logging
+import math
+import time
+
+import numpy as np
+
+from core.executors import make_executor
+from core.grid import EDGE_WEIGHT, DIRECTIONS, fingerprint, open_cells, wall_grid
+from core.maze_utils import read_File_Create_List
+from core.stats import ensure_stats, ProgressLogger
+
+logger = logging.getLogger(__name__)
+
+# Vertices a witness search may settle before it gives up (and the shortcut is kept)
+WITNESS_LIMIT = 64
+
+# Global variables set up in each worker by init_worker
+global_indptr = None
+global_indices = None
+global_weights = None
+
+
+def init_worker(indptr, indices, weights):
+    """Initializer function to set up global variables in each worker."""
+    global global_indptr, global_indices, global_weights
+    global_indptr = indptr
+    global_indices = indices
+    global_weights = weights
+
+
+def cell_graph(walls, cells):
+    """Adjacency of the open cells as {neighbor: weight} dicts; vertex i is ``cells[i]``."""
+    index = np.full(walls.shape, -1, dtype=np.int64)
+    index[cells[:, 0], cells[:, 1]] = np.arange(len(cells))
+    graph = [{} for _ in range(len(cells))]
+    for d_row, d_col in DIRECTIONS:
+        rows, cols = cells[:, 0] + d_row, cells[:, 1] + d_col
+        inside = (rows >= 0) & (rows < walls.shape[0]) & (cols >= 0) & (cols < walls.shape[1])
+        neighbors = np.full(len(cells), -1, dtype=np.int64)
+        neighbors[inside] = index[rows[inside], cols[inside]]
+        for u, v in zip(np.flatnonzero(neighbors >= 0).tolist(), neighbors[neighbors >= 0].tolist()):
+            graph[u][v] = EDGE_WEIGHT
+    return graph
+
+
+def pack_graph(graph):
+    """CSR arrays (indptr, indices, weights) of the remaining graph; contracted vertices have no edges."""
+    indptr = np.zeros(len(graph) + 1, dtype=np.int64)
+    np.cumsum([len(edges) for edges in graph], out=indptr[1:])
+    indices = np.fromiter((u for edges in graph for u in edges), dtype=np.int32, count=int(indptr[-1]))
+    weights = np.fromiter((w for edges in graph for w in edges.values()), dtype=np.int32, count=int(indptr[-1]))
+    return indptr, indices, weights
+
+
+def witness_cost(indptr, indices, weights, source, targets, blocked, limit):
+    """Cheapest costs from ``source`` to each of ``targets`` through no vertex of ``blocked``, up to ``limit``."""
+    cost = {source: 0}
+    heap = [(0, source)]
+    remaining = set(targets)
+    settled = 0
+    while heap and remaining and settled < WITNESS_LIMIT:
+        current_cost, u = heapq.heappop(heap)
+        if current_cost > cost[u]:
+            continue
+        if current_cost > limit:
+            break
+        settled += 1
+        remaining.discard(u)
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if v in blocked:
+                continue
+            new_cost = current_cost + weights[k]
+            if new_cost < cost.get(v, math.inf):
+                cost[v] = new_cost
+                heapq.heappush(heap, (new_cost, v))
+    return cost
+
+
+def simulate_contractions(task):
+    """Shortcuts that contracting each vertex of a batch would add; runs in a worker.
+
+    Witness paths avoid the vertex itself, or every vertex of ``contracting``
+    when a whole independent set is about to be contracted at once: each
+    vertex's witness could otherwise run through another one removed in the
+    same round.
+
+    Args:
+        task: (vertices, contracting, edge_count) where contracting is a set
+            of vertices or None, and the first edge_count entries of the
+            shared edge arrays hold the remaining graph
+
+    Returns:
+        List of (vertex, [(u, w, cost), ...])
+    """
+    vertices, contracting, edge_count = task
+    # One bulk copy of the shared graph per task
+    indptr = global_indptr[:]
+    indices, weights = global_indices[:edge_count], global_weights[:edge_count]
+    results = []
+    for v in vertices:
+        edges = [(indices[k], weights[k]) for k in range(indptr[v], indptr[v + 1])]
+        shortcuts = []
+        for i, (u, weight_u) in enumerate(edges[:-1]):
+            others = edges[i + 1:]
+            limit = weight_u + max(weight for _, weight in others)
+            cost = witness_cost(indptr, indices, weights, u, [w for w, _ in others], contracting or {v}, limit)
+            for w, weight_w in others:
+                via = weight_u + weight_w
+                if cost.get(w, math.inf) > via:
+                    shortcuts.append((u, w, via))
+        results.append((v, shortcuts))
+    return results
+
+
+def run_simulations(executor, edge_count, vertices, contracting, stats):
+    """{vertex: shortcuts} for ``vertices``, simulated in batches on the executor's workers."""
+    chunk = max(1, math.ceil(len(vertices) / executor.num_workers))
+    tasks = [(vertices[i:i + chunk], contracting, edge_count) for i in range(0, len(vertices), chunk)]
+    if stats.enabled:
+        stats.measure_pickle(tasks)
+    results = {}
+    with stats.phase('dispatch'):
+        for batch in executor.map(simulate_contractions, tasks):
+            results.update(batch)
+    return results
+
+
+def build_hierarchy(walls, num_processes=None, backend=None, stats=None):
+    """Contract every open cell of ``walls``; returns the ContractionHierarchy."""
+    stats = ensure_stats(stats, 'contraction_hierarchy')
+    progress = ProgressLogger(logger)
+    cells = open_cells(walls)
+    graph = cell_graph(walls, cells)
+    count = len(cells)
+    alive = set(range(count))
+    rank = np.full(count, -1, dtype=np.int32)
+    deleted = [0] * count
+    pending = {}
+    dirty = set(alive)
+    upward = [[] for _ in range(count)]
+    middles = {}
+    rounds = shortcuts_added = 0
+
+    executor = shared = None
+    try:
+        while alive:
+            rounds += 1
+            indptr, indices, weights = pack_graph(graph)
+            edge_count = len(indices)
+            if shared is None or edge_count > len(shared[1]):
+                # Shortcuts can outgrow the shared edge arrays; restart the workers with twice the room
+                if executor is not None:
+                    executor.close()
+                executor = make_executor(backend, num_processes)
+                capacity = 2 * max(1, edge_count)
+                shared = (executor.array('q', [0] * (count + 1)), executor.array('i', [0] * capacity),
+                          executor.array('i', [0] * capacity))
+                executor.start(init_worker, shared)
+            with stats.phase('dispatch'):
+                shared[0][:] = indptr.tolist()
+                shared[1][:edge_count] = indices.tolist()
+                shared[2][:edge_count] = weights.tolist()
+            if dirty:
+                # Edge differences of every vertex whose neighborhood changed
+                pending.update(run_simulations(executor, edge_count, sorted(dirty), None, stats))
+                dirty.clear()
+            priority = {v: (len(pending[v]) - len(graph[v]) + deleted[v], v) for v in alive}
+            independent = [v for v in alive if all(priority[v] < priority[u] for u in graph[v])]
+            shortcuts = run_simulations(executor, edge_count, independent, set(independent), stats)
+
+            with stats.phase('merge'):
+                level = count - len(alive)
+                for v in independent:
+                    rank[v] = level
+                    neighbors = graph[v]
+                    # Every remaining neighbor is contracted later, so each edge of v points upward
+                    for u, weight in neighbors.items():
+                        upward[v].append((u, weight, middles.get((min(u, v), max(u, v)), -1)))
+                    del pending[v]
+                    for u, w, via in shortcuts[v]:
+                        if via < graph[u].get(w, math.inf):
+                            graph[u][w] = graph[w][u] = via
+                            middles[(min(u, w), max(u, w))] = v
+                            shortcuts_added += 1
+                    for u in neighbors:
+                        del graph[u][v]
+                        deleted[u] += 1
+                        dirty.add(u)
+                    graph[v] = {}
+                    alive.discard(v)
+                    level += 1
+            progress.update("Round %d: contracted %d of %d cells", rounds, count - len(alive), count)
+    finally:
+        if executor is not None:
+            executor.close()
+    stats.add('rounds', rounds)
+    stats.add('relaxations', shortcuts_added)
+    logger.info("Contracted %d cells in %d rounds with %d shortcuts", count, rounds, shortcuts_added)
+    return ContractionHierarchy.from_upward(walls, rank, upward)
+
+
+class ContractionHierarchy:
+    """Bidirectional upward queries on a hierarchy built by ``build_hierarchy`` or loaded from a file."""
+
+    def __init__(self, walls, rank, indptr, indices, weights, middle):
+        self.walls = walls
+        self.rank = rank
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.middle = middle
+        self.cells = open_cells(walls)
+        self.index = np.full(walls.shape, -1, dtype=np.int32)
+        self.index[self.cells[:, 0], self.cells[:, 1]] = np.arange(len(self.cells), dtype=np.int32)
+        self.key = fingerprint(walls)
+        # Plain lists are much faster than NumPy scalars in the query loop
+        self._up = [list(zip(indices[indptr[v]:indptr[v + 1]].tolist(), weights[indptr[v]:indptr[v + 1]].tolist(),
+                             middle[indptr[v]:indptr[v + 1]].tolist())) for v in range(len(rank))]
+
+    @classmethod
+    def from_upward(cls, walls, rank, upward):
+        indptr = np.zeros(len(upward) + 1, dtype=np.int64)
+        np.cumsum([len(edges) for edges in upward], out=indptr[1:])
+        table = np.array([edge for edges in upward for edge in edges], dtype=np.int32).reshape(-1, 3)
+        return cls(walls, rank, indptr, table[:, 0].copy(), table[:, 1].copy(), table[:, 2].copy())
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['walls'], data['rank'], data['indptr'], data['indices'], data['weights'], data['middle'])
+
+    def save(self, path):
+        np.savez(path, walls=self.walls, rank=self.rank, indptr=self.indptr, indices=self.indices,
+                 weights=self.weights, middle=self.middle)
+
+    def __len__(self):
+        return len(self.rank)
+
+    @property
+    def shortcut_count(self):
+        return int((self.middle >= 0).sum())
+
+    def matches(self, walls):
+        """True if the hierarchy was built for this wall layout."""
+        return self.key == fingerprint(walls)
+
+    def cell_index(self, cell):
+        row, col = cell
+        if not (0 <= row < self.index.shape[0] and 0 <= col < self.index.shape[1]) or self.index[row, col] < 0:
+            raise ValueError(f"{cell} is not an open cell of this maze")
+        return int(self.index[row, col])
+
+    def _settle(self, cost, parent, heap):
+        """Settle one vertex of an upward Dijkstra; returns the vertex or None if stale."""
+        current_cost, v = heapq.heappop(heap)
+        if current_cost > cost[v]:
+            return None
+        for u, weight, _ in self._up[v]:
+            new_cost = current_cost + weight
+            if new_cost < cost.get(u, math.inf):
+                cost[u] = new_cost
+                parent[u] = v
+                heapq.heappush(heap, (new_cost, u))
+        return v
+
+    def query(self, source, target, stats=None):
+        """(cost, vertex path) between two vertex ids; (None, []) if unreachable."""
+        stats = ensure_stats(stats, 'ch_query')
+        costs = ({source: 0}, {target: 0})
+        parents = ({source: None}, {target: None})
+        heaps = ([(0, source)], [(0, target)])
+        best, meeting = math.inf, None
+        settled = 0
+        try:
+            while heaps[0] or heaps[1]:
+                # Alternate directions; a direction stops once its smallest key cannot improve the best meeting
+                for side in (0, 1):
+                    heap = heaps[side]
+                    if heap and heap[0][0] >= best:
+                        heap.clear()
+                    if not heap:
+                        continue
+                    v = self._settle(costs[side], parents[side], heap)
+                    if v is None:
+                        continue
+                    settled += 1
+                    total = costs[side][v] + costs[1 - side].get(v, math.inf)
+                    if total < best:
+                        best, meeting = total, v
+        finally:
+            stats.add('expansions', settled)
+        if meeting is None:
+            return None, []
+
+        with stats.phase('reconstruct'):
+            up = [meeting]
+            while parents[0][up[-1]] is not None:
+                up.append(parents[0][up[-1]])
+            down = [meeting]
+            while parents[1][down[-1]] is not None:
+                down.append(parents[1][down[-1]])
+            hierarchy_path = up[::-1] + down[1:]
+            path = [hierarchy_path[0]]
+            for a, b in zip(hierarchy_path, hierarchy_path[1:]):
+                self._unpack(a, b, path)
+        return int(best), path
+
+    def _edge_middle(self, a, b):
+        """Middle vertex of the upward edge between a and b (stored at the lower-ranked end)."""
+        low, high = (a, b) if self.rank[a] < self.rank[b] else (b, a)
+        for u, _, middle in self._up[low]:
+            if u == high:
+                return middle
+        raise KeyError((a, b))
+
+    def _unpack(self, a, b, path):
+        """Append the cells of edge a -> b, excluding a, replacing shortcuts by the moves they bypass."""
+        stack = [(a, b)]
+        while stack:
+            a, b = stack.pop()
+            middle = self._edge_middle(a, b)
+            if middle < 0:
+                path.append(b)
+            else:
+                stack.append((middle, b))
+                stack.append((a, middle))
+
+    def distance(self, start, goal, stats=None):
+        """Move cost from ``start`` to ``goal`` (cells as (row, col)), or None if unreachable."""
+        cost, _ = self.query(self.cell_index(start), self.cell_index(goal), stats)
+        return cost
+
+    def path(self, start, goal, stats=None):
+        """Cells from ``start`` to ``goal`` inclusive, or [] if unreachable."""
+        _, vertices = self.query(self.cell_index(start), self.cell_index(goal), stats)
+        return [tuple(self.cells[v].tolist()) for v in vertices]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build a contraction hierarchy for a maze.')
+    parser.add_argument('--maze', default='maze.txt')
+    parser.add_argument('--out', default=None, help='hierarchy file (default: the maze name + _ch.npz)')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--backend', default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    walls = wall_grid(read_File_Create_List(args.maze))
+    path = args.out or args.maze.rsplit('.', 1)[0] + '_ch.npz'
+    start_time = time.time()
+    hierarchy = build_hierarchy(walls, args.processes, args.backend)
+    hierarchy.save(path)
+    print(f"Built hierarchy of {len(hierarchy)} cells with {hierarchy.shortcut_count} shortcuts in "
+          f"{time.time() - start_time:.2f}s: {path}")
@@ -1,54 +1,126 @@
 from core.priority_queue import PriorityQueue
+from core.maze_utils import reachable_goals
+from core.stats import ensure_stats
+from core.stepper import SearchStepper, Expansion
+import importlib.util
 import time
-from visuals.draw import display_maze_with_path
 
 
-def dijkstra_search(start, goal, nodes, original_maze, path, finalPath, goal_pen):
+def dijkstra_search(start, goal, nodes, original_maze, path, finalPath, goal_pen, stats=None):
+    if path is None and importlib.util.find_spec('numba') is not None:
+        # Nothing to draw: run the compiled kernel (imported here so plain runs stay NumPy-free)
+        from core import kernels
+        if kernels.ACCELERATED:
+            return kernel_search(start, goal, nodes, kernels, stats)
+    stepper = SearchStepper(dijkstra_steps(start, goal, nodes, stats))
+    for event in stepper:
+        # Visualize exploration
+        current = event.node
+        if path is not None and current.data not in ('p', 'G'):
+            path.goto(current.x, current.y)
+            path.stamp()
+            # time.sleep(0.1)
+    return stepper.result
+
+
+def kernel_search(start, goal, nodes, kernels, stats=None):
+    """Dijkstra on the CSR kernel; sets g_cost and parent like dijkstra_steps and returns the path."""
+    stats = ensure_stats(stats, 'dijkstra')
+    if not reachable_goals([start], [goal]):
+        # Labeled components show the goal is unreachable; skip building the graph and flooding the region
+        return []
+    graph = kernels.csr_from_nodes(nodes)
+    dist, parents, settled = kernels.dijkstra(graph, [start.id], goal.id)
+    stats.add('expansions', settled)
+    with stats.phase('reconstruct'):
+        for node, cost, parent_id in zip(nodes, dist.tolist(), parents.tolist()):
+            node.g_cost = cost
+            node.parent = nodes[parent_id] if parent_id >= 0 else None
+        path_list = []
+        current_node = goal if goal.g_cost < float('inf') else None
+        while current_node is not None:
+            path_list.append(current_node)
+            current_node = current_node.parent
+        path_list.reverse()
+    return path_list
+
+
+def dijkstra_steps(start, goal, nodes, stats=None):
+    """Generator form of Dijkstra: yields an Expansion per settled node and returns the path."""
+    path_list, _ = yield from multi_dijkstra_steps([start], [goal], nodes, stats)
+    return path_list
+
+
+def multi_dijkstra_steps(sources, goals, nodes, stats=None):
+    """Dijkstra from several sources to the nearest of several goals.
+
+    Every source starts at cost 0 and the search stops at the first goal it
+    settles, so a nearest-exit query costs one search instead of one per pair.
+    Yields an Expansion per settled node and returns (path, reached_goal), or
+    ([], None) when no goal is reachable.
+    """
+    stats = ensure_stats(stats, 'dijkstra')
+    expansions = relaxations = heap_pushes = stale_pops = 0
+    goals = set(reachable_goals(sources, goals))
+    reached = None
+    if not goals:
+        # Labeled components show that no goal shares a region with a source
+        return [], None
+
     # Reset costs and parents for all nodes
     for node in nodes:
         node.g_cost = float('inf')
         node.parent = None
-    start.g_cost = 0
 
     queue = PriorityQueue()
-    queue.put(start, start.g_cost)
+    for start in sources:
+        start.g_cost = 0
+        queue.put(start, start.g_cost)
+        heap_pushes += 1
     visited = set()
 
-    while not queue.is_empty():
-        current = queue.get()
-
-        if current in visited:
-            continue
-        visited.add(current)
+    try:
+        while not queue.is_empty():
+            current = queue.get()
 
-        # Visualize exploration
-        if current.data not in ('p', 'G'):
-            path.goto(current.x, current.y)
-            path.stamp()
-            # time.sleep(0.1)
+            if current in visited:
+                stale_pops += 1
+                continue
+            visited.add(current)
+            expansions += 1
+            yield Expansion(current, len(queue.elements))
 
-        if current == goal:
-            break
+            if current in goals:
+                reached = current
+                break
 
-        for neighbor in current.friend:
-            if neighbor.data == "X":
-                continue  # Skip walls
+            for neighbor in current.friend:
+                if neighbor.data == "X":
+                    continue  # Skip walls
 
-            tentative_g = current.g_cost + 20  # Edge cost
+                tentative_g = current.g_cost + 20  # Edge cost
 
-            if tentative_g < neighbor.g_cost:
-                neighbor.g_cost = tentative_g
-                neighbor.parent = current
-                queue.put(neighbor, neighbor.g_cost)
+                if tentative_g < neighbor.g_cost:
+                    neighbor.g_cost = tentative_g
+                    neighbor.parent = current
+                    queue.put(neighbor, neighbor.g_cost)
+                    relaxations += 1
+                    heap_pushes += 1
+    finally:
+        stats.add('expansions', expansions)
+        stats.add('relaxations', relaxations)
+        stats.add('heap_pushes', heap_pushes)
+        stats.add('stale_pops', stale_pops)
 
     # Reconstruct path
-    path_list = []
-    current_node = goal
-    while current_node is not None:
-        path_list.append(current_node)
-        current_node = current_node.parent
-    path_list.reverse()
-    return path_list
+    with stats.phase('reconstruct'):
+        path_list = []
+        current_node = reached
+        while current_node is not None:
+            path_list.append(current_node)
+            current_node = current_node.parent
+        path_list.reverse()
+    return path_list, reached
     # Draw final path
     # for node in path_list:
     #     if node.data not in ('p', 'G'):
@@ -0,0 +1,211 @@
+"""k shortest simple paths (Yen's algorithm) with parallel spur searches.
+
+Yen derives each route from the previous one: for every spur node on it, the
+root path up to the spur node is kept, the root's other cells and the edges
+already used by accepted routes with the same root are blocked, and a spur
+search finds the cheapest way on to the goal. The best candidate becomes the
+next route.
+
+Two shortest-path trees are computed once per query:
+
+- the reverse tree (distances to the goal) is an exact A* heuristic on the
+  unblocked maze and stays admissible when cells are blocked, so a spur search
+  whose way on is not blocked walks straight down the tree
+- the forward tree gives the first route
+
+Root path costs are summed along each route's own edges, since the roots of
+later routes need not lie on the forward tree.
+
+Following Lawler, a route only needs spur searches from the node where it
+deviated from its parent onward. The spur searches of a route are independent
+and run as batches on an executor from ``core.executors``.
+"""
+import heapq
+import logging
+import math
+import time
+
+from core.executors import make_executor
+from core.grid import EDGE_WEIGHT
+from core.maze_utils import same_component
+from core.stats import ensure_stats, ProgressLogger
+from core.stepper import SearchStepper, RouteFound
+
+logger = logging.getLogger(__name__)
+
+# Global variables set up in each worker by init_worker
+global_adjacency = None
+global_to_goal = None
+global_goal = None
+
+
+def init_worker(adjacency, to_goal, goal):
+    """Initializer function to set up global variables in each worker."""
+    global global_adjacency, global_to_goal, global_goal
+    global_adjacency = adjacency
+    global_to_goal = to_goal
+    global_goal = goal
+
+
+def route_graph(nodes):
+    """Adjacency lists of (neighbor id, weight) per node id; sets ``node.id``."""
+    for index, node in enumerate(nodes):
+        node.id = index
+    return [() if node.data == 'X' else tuple((neighbor.id, EDGE_WEIGHT) for neighbor in node.friend
+                                              if neighbor.data != 'X') for node in nodes]
+
+
+def shortest_tree(adjacency, source):
+    """(cost, parent) lists of a full Dijkstra out of ``source``; the graph is undirected."""
+    cost = [math.inf] * len(adjacency)
+    parent = [-1] * len(adjacency)
+    cost[source] = 0
+    heap = [(0, source)]
+    while heap:
+        current_cost, u = heapq.heappop(heap)
+        if current_cost > cost[u]:
+            continue
+        for v, weight in adjacency[u]:
+            new_cost = current_cost + weight
+            if new_cost < cost[v]:
+                cost[v] = new_cost
+                parent[v] = u
+                heapq.heappush(heap, (new_cost, v))
+    return cost, parent
+
+
+def spur_search(adjacency, to_goal, spur, goal, blocked_nodes, blocked_edges):
+    """A* from ``spur`` to ``goal`` avoiding blocked nodes and edges out of ``spur``.
+
+    Returns (cost, path of ids) or None, plus the number of nodes expanded.
+    """
+    cost = {spur: 0}
+    parent = {spur: None}
+    heap = [(to_goal[spur], 0, spur)]
+    expanded = 0
+    while heap:
+        _, current_cost, u = heapq.heappop(heap)
+        if current_cost > cost[u]:
+            continue
+        expanded += 1
+        if u == goal:
+            path = [u]
+            while parent[path[-1]] is not None:
+                path.append(parent[path[-1]])
+            path.reverse()
+            return (current_cost, path), expanded
+        for v, weight in adjacency[u]:
+            if v in blocked_nodes or (u == spur and v in blocked_edges):
+                continue
+            new_cost = current_cost + weight
+            if new_cost < cost.get(v, math.inf):
+                cost[v] = new_cost
+                parent[v] = u
+                heapq.heappush(heap, (new_cost + to_goal[v], new_cost, v))
+    return None, expanded
+
+
+def run_spurs(task):
+    """Spur searches for a batch of spur positions on one route; runs in a worker.
+
+    Args:
+        task: (route, root_costs, spurs) where spurs lists (index, blocked next
+            ids) for spur node ``route[index]``
+
+    Returns:
+        (candidates, expanded) with candidates as (cost, path, deviation index)
+    """
+    route, root_costs, spurs = task
+    candidates = []
+    expanded = 0
+    for index, blocked_next in spurs:
+        found, count = spur_search(global_adjacency, global_to_goal, route[index], global_goal,
+                                   set(route[:index]), set(blocked_next))
+        expanded += count
+        if found is not None:
+            spur_cost, spur_path = found
+            candidates.append((root_costs[index] + spur_cost, tuple(route[:index]) + tuple(spur_path), index))
+    return candidates, expanded
+
+
+def k_shortest_steps(start, goal, nodes, k=3, num_processes=None, stats=None, backend=None):
+    """Generator form of Yen's algorithm: yields a RouteFound per route and returns them all.
+
+    The result is a list of (cost, path of Nodes), cheapest first, with at
+    most ``k`` simple paths. Closing the generator shuts the worker pool down.
+    """
+    stats = ensure_stats(stats, 'k_shortest')
+    progress = ProgressLogger(logger, sample_every=1)
+    if not same_component(start, goal):
+        logger.info("Goal is in another component; no path")
+        return []
+
+    adjacency = route_graph(nodes)
+    to_goal, _ = shortest_tree(adjacency, goal.id)
+    from_start, forward_parent = shortest_tree(adjacency, start.id)
+    if from_start[goal.id] == math.inf:
+        return []
+
+    first = [goal.id]
+    while first[-1] != start.id:
+        first.append(forward_parent[first[-1]])
+    first.reverse()
+    routes = [(from_start[goal.id], tuple(first), 0)]
+    candidates = []
+    queued = {routes[0][1]}
+    expanded = spur_count = 0
+
+    executor = make_executor(backend, num_processes)
+    logger.info("Searching %d routes with %d %s workers", k, executor.num_workers, executor.name)
+    try:
+        with executor:
+            executor.start(init_worker, (adjacency, to_goal, goal.id))
+            while True:
+                cost, route, deviation = routes[-1]
+                yield RouteFound(len(routes), cost, [nodes[cell] for cell in route])
+                if len(routes) >= k:
+                    break
+                # Cost of every root path, and the next cells used by accepted routes sharing each root
+                root_costs = [0]
+                for u, v in zip(route, route[1:]):
+                    root_costs.append(root_costs[-1] + next(w for n, w in adjacency[u] if n == v))
+                spurs = []
+                for index in range(deviation, len(route) - 1):
+                    root = route[:index + 1]
+                    spurs.append((index, [other[index + 1] for _, other, _ in routes
+                                          if len(other) > index + 1 and other[:index + 1] == root]))
+                spur_count += len(spurs)
+                chunk = max(1, math.ceil(len(spurs) / (executor.num_workers * 4)))
+                tasks = [(route, root_costs, spurs[i:i + chunk]) for i in range(0, len(spurs), chunk)]
+                if stats.enabled:
+                    stats.measure_pickle(tasks)
+                with stats.phase('dispatch'):
+                    results = executor.map(run_spurs, tasks)
+                with stats.phase('merge'):
+                    for found, count in results:
+                        expanded += count
+                        for candidate in found:
+                            if candidate[1] not in queued:
+                                queued.add(candidate[1])
+                                heapq.heappush(candidates, candidate)
+                if not candidates:
+                    logger.info("Only %d simple paths exist", len(routes))
+                    break
+                routes.append(heapq.heappop(candidates))
+                progress.update("Route %d: cost %s", len(routes), routes[-1][0])
+    finally:
+        stats.add('expansions', expanded)
+        stats.add('relaxations', spur_count)
+        stats.add('rounds', len(routes))
+
+    with stats.phase('reconstruct'):
+        return [(cost, [nodes[cell] for cell in route]) for cost, route, _ in routes]
+
+
+def k_shortest_paths(start, goal, nodes, k=3, num_processes=None, stats=None, backend=None):
+    """Up to ``k`` cheapest simple paths; returns (routes, execution_time) with routes as (cost, path of Nodes)."""
+    start_time = time.time()
+    routes = SearchStepper(k_shortest_steps(start, goal, nodes, k, num_processes, stats, backend)).run_to_completion()
+    execution_time = time.time() - start_time
+    logger.info("Found %d routes in %.4f seconds", len(routes), execution_time)
+    return routes, execution_time
@@ -0,0 +1,182 @@
+"""Dijkstra and A* over a tiled on-disk maze, with bounded RAM.
+
+The maze stays in a ``core.tilestore`` store and is paged in tile by tile
+through an LRU ``TileCache`` whose memory budget is a parameter. Search state
+lives in memory-mapped files laid out tile-major like the store, so the
+state of cells that are close together shares pages:
+
+    moves.npy    uint32 per cell: moves from the start + 1 (0 = not reached)
+    parent.npy   uint8 per cell: index into core.grid.DIRECTIONS of the move that reached it
+
+Both files start sparse (all zero), so nothing is written for cells the
+search never reaches, and the operating system pages them out under memory
+pressure. What stays in RAM is the tile cache and the open list.
+"""
+import argparse
+import heapq
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from core.grid import EDGE_WEIGHT, DIRECTIONS
+from core.stats import ensure_stats, ProgressLogger
+from core.tilestore import TileStore, TileCache, DEFAULT_BUDGET
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('dijkstra', 'a_star')
+
+
+class SearchState:
+    """Memory-mapped per-cell search state of one query, in ``directory`` (default: a temporary directory)."""
+
+    def __init__(self, store, directory=None):
+        self._temporary = tempfile.TemporaryDirectory(prefix='ooc-') if directory is None else None
+        self.directory = directory or self._temporary.name
+        os.makedirs(self.directory, exist_ok=True)
+        shape = (store.tile_count * store.tile_cells,)
+        self.moves = np.lib.format.open_memmap(os.path.join(self.directory, 'moves.npy'), mode='w+',
+                                               dtype=np.uint32, shape=shape)
+        self.parent = np.lib.format.open_memmap(os.path.join(self.directory, 'parent.npy'), mode='w+',
+                                                dtype=np.uint8, shape=shape)
+
+    def close(self):
+        del self.moves, self.parent
+        if self._temporary is not None:
+            self._temporary.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def out_of_core_search(store, start=None, goal=None, kind='a_star', memory_budget=DEFAULT_BUDGET, scratch=None,
+                       stats=None):
+    """Shortest path on a TileStore; returns (path of (row, col) cells, execution_time, expansions).
+
+    ``kind`` is 'dijkstra' or 'a_star' (Manhattan heuristic, exact on
+    four-way grids). Start and goal default to the store's. ``memory_budget``
+    bounds the tile cache in bytes; ``scratch`` is a directory for the state
+    files (a temporary one by default).
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind {kind!r}, expected one of {', '.join(KINDS)}")
+    stats = ensure_stats(stats, f'out_of_core_{kind}')
+    progress = ProgressLogger(logger)
+    start_time = time.time()
+    start = tuple(start) if start is not None else store.start
+    goal = tuple(goal) if goal is not None else store.goal
+    if start is None:
+        raise ValueError("no start given and the store has none")
+    if goal is None:
+        raise ValueError("no goal given and the store has none")
+    height, width = store.height, store.width
+    tile_rows, tile_cols, tile_cells, across = store.tile_rows, store.tile_cols, store.tile_cells, store.tiles_across
+    cache = TileCache(store, memory_budget)
+    get_tile = cache.get
+    goal_row, goal_col = goal
+    use_heuristic = kind == 'a_star'
+
+    def is_open(row, col):
+        tile, offset = store.locate(row, col)
+        return not get_tile(tile)[offset]
+
+    for name, (row, col) in (('start', start), ('goal', goal)):
+        if not (0 <= row < height and 0 <= col < width) or not is_open(row, col):
+            raise ValueError(f"{name} {(row, col)} is not an open cell of the maze")
+
+    expansions = relaxations = heap_pushes = stale_pops = 0
+    path = []
+    with SearchState(store, scratch) as state:
+        moves, parent = state.moves, state.parent
+        tile, offset = store.locate(*start)
+        moves[tile * tile_cells + offset] = 1
+        h = abs(start[0] - goal_row) + abs(start[1] - goal_col) if use_heuristic else 0
+        # Ties on f go to the deeper cell, so A* runs straight down open stretches
+        heap = [(h, 0, start[0], start[1])]
+        heap_pushes += 1
+        found = False
+        try:
+            while heap:
+                _, depth, row, col = heapq.heappop(heap)
+                g = -depth
+                tile_row, local_row = divmod(row, tile_rows)
+                tile_col, local_col = divmod(col, tile_cols)
+                if g + 1 > moves[(tile_row * across + tile_col) * tile_cells + local_row * tile_cols + local_col]:
+                    stale_pops += 1
+                    continue
+                expansions += 1
+                if row == goal_row and col == goal_col:
+                    found = True
+                    break
+                progress.update("Expanded %d cells (cost %d, %d tiles cached)", expansions, g * EDGE_WEIGHT,
+                                len(cache))
+                for code, (d_row, d_col) in enumerate(DIRECTIONS):
+                    n_row, n_col = row + d_row, col + d_col
+                    if not (0 <= n_row < height and 0 <= n_col < width):
+                        continue
+                    tile_row, local_row = divmod(n_row, tile_rows)
+                    tile_col, local_col = divmod(n_col, tile_cols)
+                    tile = tile_row * across + tile_col
+                    offset = local_row * tile_cols + local_col
+                    if get_tile(tile)[offset]:
+                        continue
+                    index = tile * tile_cells + offset
+                    reached = int(moves[index])
+                    if reached and reached <= g + 2:
+                        continue
+                    moves[index] = g + 2
+                    parent[index] = code
+                    relaxations += 1
+                    h = abs(n_row - goal_row) + abs(n_col - goal_col) if use_heuristic else 0
+                    heapq.heappush(heap, (g + 1 + h, -g - 1, n_row, n_col))
+                    heap_pushes += 1
+        finally:
+            stats.add('expansions', expansions)
+            stats.add('relaxations', relaxations)
+            stats.add('heap_pushes', heap_pushes)
+            stats.add('stale_pops', stale_pops)
+            stats.add('cache_hits', cache.hits)
+            stats.add('cache_misses', cache.misses)
+
+        if found:
+            with stats.phase('reconstruct'):
+                row, col = goal
+                path.append((row, col))
+                while (row, col) != start:
+                    tile, offset = store.locate(row, col)
+                    d_row, d_col = DIRECTIONS[int(parent[tile * tile_cells + offset])]
+                    row, col = row - d_row, col - d_col
+                    path.append((row, col))
+                path.reverse()
+
+    execution_time = time.time() - start_time
+    logger.info("Out-of-core %s: %s after %d expansions, %d tile reads, %d evictions, in %.4f seconds", kind,
+                f"cost {(len(path) - 1) * EDGE_WEIGHT}" if path else "no path", expansions, cache.misses,
+                cache.evictions, execution_time)
+    return path, execution_time, expansions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Solve a maze stored as tiles on disk (see core/tilestore.py).')
+    parser.add_argument('--store', required=True)
+    parser.add_argument('--kind', choices=KINDS, default='a_star')
+    parser.add_argument('--start', type=int, nargs=2, metavar=('ROW', 'COL'))
+    parser.add_argument('--goal', type=int, nargs=2, metavar=('ROW', 'COL'))
+    parser.add_argument('--budget-mb', type=float, default=DEFAULT_BUDGET / (1024 * 1024), help='tile cache size')
+    parser.add_argument('--scratch', help='directory for the memory-mapped search state')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    path, seconds, expansions = out_of_core_search(TileStore.load(args.store), args.start, args.goal, args.kind,
+                                                   int(args.budget_mb * 1024 * 1024), args.scratch)
+    if path:
+        print(f"{args.kind}: cost {(len(path) - 1) * EDGE_WEIGHT}, {len(path)} cells, {expansions} expansions, "
+              f"{seconds:.2f}s")
+    else:
+        print(f"{args.kind}: no path found ({expansions} expansions, {seconds:.2f}s)")
@@ -1,149 +1,209 @@
 from core.priority_queue import PriorityQueue
+from core.executors import make_executor
+from core.grid import wall_grid_from_nodes
+from core.heuristics import heuristic_field
+from core.maze_utils import same_component
+from core.stats import ensure_stats, ProgressLogger
+from core.stepper import SearchStepper, Expansion
+import logging
 import math
 import time
 import multiprocessing as mp
-from visuals.draw import setup_maze, Draw
 import sys
 sys.setrecursionlimit(10000)
-def heuristic(x, y, goal):
-    # Manhattan distance may work better for grid-based mazes
-    return abs(goal.x - x) + abs(goal.y - y)
-    # Or Euclidean distance
-    # return math.sqrt((goal.x - x)**2 + (goal.y - y)**2)
 
-def process_neighbors(current_node, neighbors_chunk, goal, visited, parent, g_costs):
+logger = logging.getLogger(__name__)
+
+# Global variables set up in each worker by init_worker
+global_g_costs = None
+global_h_costs = None
+
+def init_worker(g_costs, h_costs):
+    """Initializer function to set up global variables in each worker."""
+    global global_g_costs, global_h_costs
+    global_g_costs = g_costs
+    global_h_costs = h_costs
+
+def process_neighbors(args):
     """Parallel processing of neighbors for a single node"""
+    current_id, current_g, neighbors_chunk = args
     results = []
     
-    for neighbor in neighbors_chunk:
-        # Skip walls and already visited nodes
-        if neighbor.data == "X" or visited[neighbor.id]:
-            continue
-            
+    # Walls were filtered out by the master; expanded nodes are not skipped, so they can be re-opened
+    for neighbor_id in neighbors_chunk:
         # Calculate costs
-        new_g = current_node.g_cost + 20  # Fixed edge weight
-        new_h = heuristic(neighbor.x, neighbor.y, goal)
+        new_g = current_g + 20  # Fixed edge weight
+        new_h = global_h_costs[neighbor_id]
         new_f = new_g + new_h
         
         # Only consider this neighbor if we've found a better path
-        if new_g < g_costs[neighbor.id]:
-            results.append((neighbor, new_g, new_h, new_f, current_node.id))
+        if new_g < global_g_costs[neighbor_id]:
+            results.append((neighbor_id, new_g, new_h, new_f, current_id))
         
     return results
 
 
-def parallel_a_star(start, goal, nodes, original_maze=None, path=None, finalPath=None, goal_pen=None):
+def parallel_a_star(start, goal, nodes, original_maze=None, path=None, finalPath=None, goal_pen=None, stats=None,
+                    num_processes=None, backend=None, heuristic_kind='manhattan'):
+    """A* whose neighbor evaluation is farmed out to an executor from ``core.executors``.
+
+    Returns (path, nodes_processed).
+    """
+    stepper = SearchStepper(parallel_a_star_steps(start, goal, nodes, stats, num_processes, backend,
+                                                  heuristic_kind))
+    nodes_processed = 0
+    for _ in stepper:
+        nodes_processed += 1
+    path = stepper.result
+
+    # Visualize path if visualization tools are provided
+    if path and finalPath and original_maze:
+        for node in path:
+            if node.data not in ['p', 'G']:
+                finalPath.goto(node.x, node.y)
+                finalPath.stamp()
+
+    return path, nodes_processed
+
+
+def parallel_a_star_steps(start, goal, nodes, stats=None, num_processes=None, backend=None,
+                          heuristic_kind='manhattan'):
+    """Generator form of parallel A*: yields an Expansion per expanded node and returns the path.
+
+    Workers receive the goal's cached heuristic field (``core.heuristics``) once,
+    indexed by node id. A node whose cost improves is queued again even after
+    it was expanded, so the path is optimal for any admissible heuristic.
+    Closing the generator shuts the worker pool down.
+    """
+    stats = ensure_stats(stats, 'parallel_a_star')
+    progress = ProgressLogger(logger)
+    relaxations = heap_pushes = stale_pops = reexpansions = 0
+
+    if not same_component(start, goal):
+        # Rejected from the component labels before the pool starts
+        logger.info("No path found to goal!")
+        return []
+
     # Initialize nodes with IDs
     for idx, node in enumerate(nodes):
         node.id = idx
         node.g_cost = float('inf')
         node.h_cost = 0
+        node.parent = None
     
     # Set start node cost
     start.g_cost = 0
+    field = heuristic_field(wall_grid_from_nodes(nodes), (goal.row, goal.col), heuristic_kind)
+    h_costs = field[[node.row for node in nodes], [node.col for node in nodes]].tolist()
     
-    # Print debug info
-    print(f"Start node: ID={start.id}, pos=({start.x}, {start.y})")
-    print(f"Goal node: ID={goal.id}, pos=({goal.x}, {goal.y})")
+    logger.debug("Start node: ID=%d, pos=(%s, %s)", start.id, start.x, start.y)
+    logger.debug("Goal node: ID=%d, pos=(%s, %s)", goal.id, goal.x, goal.y)
     
-    # Shared memory arrays with Manager
-    manager = mp.Manager()
-    visited = manager.list([0] * len(nodes))
-    parent = manager.list([-1] * len(nodes))
-    g_costs = manager.list([float('inf')] * len(nodes))
+    # Shared array for the chosen backend; parents and expanded flags are only needed by the master
+    executor = make_executor(backend, num_processes)
+    num_processes = executor.num_workers
+    g_costs = executor.array('d', [float('inf')] * len(nodes))
+    parent = [-1] * len(nodes)
+    expanded = [False] * len(nodes)
     g_costs[start.id] = 0
     
     # Priority queue in main process
     queue = PriorityQueue()
-    start_f = heuristic(start.x, start.y, goal)
+    start_f = h_costs[start.id]
     queue.put(start, start_f)
-    visited[start.id] = 1
+    heap_pushes += 1
     
-    # Process pool
-    num_processes = mp.cpu_count()
-    print(f"Using {num_processes} processes for parallel processing")
-    pool = mp.Pool(processes=num_processes)
+    # Worker pool
+    logger.info("Using %d %s workers for parallel processing", num_processes, executor.name)
+    executor.start(init_worker, (g_costs, h_costs))
     
     goal_found = False
     nodes_processed = 0
     
-    while not queue.is_empty() and not goal_found:
-        current_node = queue.get()
-        nodes_processed += 1
-        
-        if nodes_processed % 10 == 0:
-            print(f"Processed {nodes_processed} nodes. Queue size: {len(queue.elements)}")
-        
-        # Check if we've reached the goal
-        if current_node.id == goal.id:
-            print(f"Goal found at node {current_node.id}!")
-            goal_found = True
-            break
+    try:
+        while not queue.is_empty() and not goal_found:
+            f_cost = queue.elements[0][0]
+            current_node = queue.get()
+            
+            # Skip entries queued before a better path to this node was found
+            if f_cost > g_costs[current_node.id] + h_costs[current_node.id]:
+                stale_pops += 1
+                continue
+            if expanded[current_node.id]:
+                reexpansions += 1
+            expanded[current_node.id] = True
+
+            nodes_processed += 1
+            progress.update("Processed %d nodes. Queue size: %d", nodes_processed, len(queue.elements))
+            yield Expansion(current_node, len(queue.elements))
             
-        # Skip if we already found a better path to this node
-        if current_node.g_cost > g_costs[current_node.id]:
-            continue
+            # Check if we've reached the goal
+            if current_node.id == goal.id:
+                logger.info("Goal found at node %d!", current_node.id)
+                goal_found = True
+                break
+                
+            # Split neighbors into chunks for parallel processing
+            neighbors = [n.id for n in current_node.friend if n.data != "X"]
+            if not neighbors:
+                continue
+                
+            chunk_size = max(1, len(neighbors) // num_processes)
+            chunks = [neighbors[i:i+chunk_size] for i in range(0, len(neighbors), chunk_size)]
             
-        # Split neighbors into chunks for parallel processing
-        neighbors = [n for n in current_node.friend if n.data != "X"]
-        if not neighbors:
-            continue
+            # Process neighbors in parallel
+            args = [(current_node.id, current_node.g_cost, chunk) for chunk in chunks]
+            if stats.enabled:
+                stats.measure_pickle(args)
+            with stats.phase('dispatch'):
+                results = executor.map(process_neighbors, args)
             
-        chunk_size = max(1, len(neighbors) // num_processes)
-        chunks = [neighbors[i:i+chunk_size] for i in range(0, len(neighbors), chunk_size)]
-        
-        # Process neighbors in parallel
-        args = [(current_node, chunk, goal, visited, parent, g_costs) for chunk in chunks]
-        results = pool.starmap(process_neighbors, args)
-        
-        # Update queue and shared data structures
-        for chunk_results in results:
-            for neighbor, new_g, new_h, new_f, parent_id in chunk_results:
-                # Update costs atomically
-                if new_g < g_costs[neighbor.id]:
-                    g_costs[neighbor.id] = new_g
-                    parent[neighbor.id] = parent_id
-                    
-                    # Only add to queue if not visited
-                    if not visited[neighbor.id]:
-                        visited[neighbor.id] = 1
-                        queue.put(neighbor, new_f)
-                        
-                        # Update the node's costs for visualization purposes
-                        neighbor.g_cost = new_g
-                        neighbor.h_cost = new_h
-                        
-                        # Check if we're adding the goal to the queue
-                        if neighbor.id == goal.id:
-                            print(f"Added goal to queue with f-cost: {new_f}")
-
-    pool.close()
-    pool.join()
-    
-    # Debugging: check goal status
-    print(f"Goal node (ID: {goal.id}) final status:")
-    print(f"  Visited: {bool(visited[goal.id])}")
-    print(f"  Cost: {g_costs[goal.id]}")
-    print(f"  Parent: {parent[goal.id]}")
+            # Update queue and shared data structures
+            with stats.phase('merge'):
+                for chunk_results in results:
+                    for neighbor_id, new_g, new_h, new_f, parent_id in chunk_results:
+                        neighbor = nodes[neighbor_id]
+                        # Update costs atomically
+                        if new_g < g_costs[neighbor.id]:
+                            g_costs[neighbor.id] = new_g
+                            parent[neighbor.id] = parent_id
+                            neighbor.parent = nodes[parent_id]
+                            relaxations += 1
+                            
+                            # Queue it again even if it was expanded, so the cheaper cost propagates
+                            queue.put(neighbor, new_f)
+                            heap_pushes += 1
+                            
+                            # Update the node's costs for visualization purposes
+                            neighbor.g_cost = new_g
+                            neighbor.h_cost = new_h
+                            
+                            # Check if we're adding the goal to the queue
+                            if neighbor.id == goal.id:
+                                logger.debug("Added goal to queue with f-cost: %s", new_f)
+
+        logger.debug("Goal node (ID: %d) final status: expanded=%s, cost=%s, parent=%s",
+                     goal.id, expanded[goal.id], g_costs[goal.id], parent[goal.id])
+    finally:
+        executor.close()
+        stats.add('expansions', nodes_processed)
+        stats.add('reexpansions', reexpansions)
+        stats.add('relaxations', relaxations)
+        stats.add('heap_pushes', heap_pushes)
+        stats.add('stale_pops', stale_pops)
     
     # Reconstruct path
     path = []
-    if goal_found or visited[goal.id]:
-        current_id = goal.id
-        while current_id != -1:
-            path.append(nodes[current_id])
-            current_id = parent[current_id]
-        path.reverse()
-        
-        print(f"Path found with {len(path)} steps")
+    if goal_found:
+        with stats.phase('reconstruct'):
+            current_id = goal.id
+            while current_id != -1:
+                path.append(nodes[current_id])
+                current_id = parent[current_id]
+            path.reverse()
         
-        # Visualize path if visualization tools are provided
-        if finalPath and original_maze:
-            for node in path:
-                if node.data not in ['p', 'G']:
-                    finalPath.goto(node.x, node.y)
-                    finalPath.stamp()
+        logger.info("Path found with %d steps", len(path))
     else:
-        print("No path found to goal!")
+        logger.info("No path found to goal!")
         
-    return path, nodes_processed
\ No newline at end of file
+    return path
@@ -1,67 +1,88 @@
+import logging
 import time
 import multiprocessing as mp
 from collections import defaultdict
 import sys
+from core import kernels
+from core.executors import make_executor
+from core.maze_utils import reachable_goals
+from core.stats import ensure_stats, ProgressLogger
+from core.stepper import SearchStepper, FrontierBatch
+from core.tuning import tuned_parameters
 sys.setrecursionlimit(10000)
 
+logger = logging.getLogger(__name__)
+
 # Global variables for shared memory in worker processes
 global_costs = None
 global_parents = None
 global_visited = None
-global_goal_id = None
+global_goal_ids = None
 global_delta = None
-global_nodes_explored = None
+global_adjacency = None
+global_relaxer = None
 
-def init_worker(costs, parents, visited, goal_id, delta, nodes_explored):
+def init_worker(costs, parents, visited, goal_ids, delta, adjacency):
     """Initializer function to set up global variables in each worker process."""
-    global global_costs, global_parents, global_visited, global_goal_id, global_delta, global_nodes_explored
+    global global_costs, global_parents, global_visited, global_goal_ids, global_delta, global_adjacency
+    global global_relaxer
     global_costs = costs
     global_parents = parents
     global_visited = visited
-    global_goal_id = goal_id
+    global_goal_ids = goal_ids
     global_delta = delta
-    global_nodes_explored = nodes_explored
+    global_adjacency = adjacency
+    # With Numba, buckets are relaxed by a compiled kernel over a CSR copy of the adjacency
+    global_relaxer = kernels.BucketRelaxer(kernels.csr_from_adjacency(adjacency)) if kernels.ACCELERATED else None
+
+def build_adjacency(nodes):
+    """Neighbor ids per node id; shipped to each worker once instead of pickling Nodes per task."""
+    return [tuple(neighbor.id for neighbor in node.friend if neighbor.data != "X") for node in nodes]
 
 def process_bucket_nodes(args):
     """Process nodes in a bucket with reduced lock contention."""
     nodes_to_process, bucket_idx = args
     local_relaxed_edges = []
     found_goal = False
-    local_nodes_explored = 0
     
     # Get values once with lock to minimize contention
     with global_costs.get_lock():
-        local_costs = {node.id: global_costs[node.id] for node in nodes_to_process}
+        local_costs = {node_id: global_costs[node_id] for node_id in nodes_to_process}
     
     # Collect local updates to apply later in batch
     local_cost_updates = {}
     local_parent_updates = {}
-    
-    for node in nodes_to_process:
-        current_cost = local_costs[node.id]
-        local_nodes_explored += 1
-        
-        if node.id == global_goal_id:
-            found_goal = True
-            continue
+
+    if global_relaxer is not None:
+        frontier = [node_id for node_id in nodes_to_process if node_id not in global_goal_ids]
+        found_goal = len(frontier) < len(nodes_to_process)
+        updates = global_relaxer.relax(frontier, [local_costs[node_id] for node_id in frontier])
+        for neighbor_id, (new_cost, parent_id) in updates.items():
+            local_cost_updates[neighbor_id] = new_cost
+            local_parent_updates[neighbor_id] = parent_id
+            local_relaxed_edges.append((neighbor_id, int(new_cost // global_delta)))
+    else:
+        for node_id in nodes_to_process:
+            current_cost = local_costs[node_id]
         
-        # Process all neighbors without locks
-        for neighbor in node.friend:
-            if neighbor.data == "X":
+            if node_id in global_goal_ids:
+                found_goal = True
                 continue
-                
-            weight = 20  # Standard edge weight
-            new_cost = current_cost + weight
+        
+            # Process all neighbors without locks
+            for neighbor_id in global_adjacency[node_id]:
+                weight = 20  # Standard edge weight
+                new_cost = current_cost + weight
             
-            # Store updates locally without locks
-            if neighbor.id not in local_cost_updates or new_cost < local_cost_updates[neighbor.id]:
-                local_cost_updates[neighbor.id] = new_cost
-                local_parent_updates[neighbor.id] = node.id
-                new_bucket = int(new_cost // global_delta)
-                local_relaxed_edges.append((neighbor, new_bucket))
+                # Store updates locally without locks
+                if neighbor_id not in local_cost_updates or new_cost < local_cost_updates[neighbor_id]:
+                    local_cost_updates[neighbor_id] = new_cost
+                    local_parent_updates[neighbor_id] = node_id
+                    new_bucket = int(new_cost // global_delta)
+                    local_relaxed_edges.append((neighbor_id, new_bucket))
     
     # Now apply updates with minimal lock acquisitions
-    nodes_to_visit = set(node.id for node in nodes_to_process)
+    nodes_to_visit = set(nodes_to_process)
     
     # Update costs in a single lock acquisition
     if local_cost_updates:
@@ -72,150 +93,230 @@ def process_bucket_nodes(args):
                     global_parents[n_id] = local_parent_updates.get(n_id)
                 else:
                     # Remove from relaxed edges if we didn't actually improve
-                    local_relaxed_edges = [(n, b) for n, b in local_relaxed_edges if n.id != n_id]
+                    local_relaxed_edges = [(n, b) for n, b in local_relaxed_edges if n != n_id]
     
     # Mark visited all at once
     with global_visited.get_lock():
         for node_id in nodes_to_visit:
             global_visited[node_id] = 1
-    
-    # Update nodes explored counter once
-    with global_nodes_explored.get_lock():
-        global_nodes_explored.value += local_nodes_explored
 
     return local_relaxed_edges, found_goal
 
-def delta_stepping_dijkstra(start, goal, nodes, original_maze, path, finalPath, goal_pen, num_processes=None, delta=20):
-    """Delta-Stepping Parallel Dijkstra's algorithm using shared memory with reduced overhead."""
+def delta_stepping_steps(start, goal, nodes, num_processes=None, delta=None, chunk_size=None, stats=None,
+                         backend=None):
+    """Generator form of delta-stepping: yields a FrontierBatch per processed bucket and returns the path.
+
+    Node costs and parents of each batch are written back before it is yielded,
+    so partial paths can be read while the search is paused. Closing the
+    generator shuts the worker pool down.
+    """
+    final_path, _ = yield from multi_delta_stepping_steps([start], [goal], nodes, num_processes, delta, chunk_size,
+                                                          stats, backend)
+    return final_path
+
+def multi_delta_stepping_steps(sources, goals, nodes, num_processes=None, delta=None, chunk_size=None, stats=None,
+                               backend=None):
+    """Delta-stepping from several sources to the nearest of several goals.
+
+    All sources are seeded in bucket 0 and the search stops once the bucket
+    holding the first goal has drained, which makes that goal's cost final.
+    Yields a FrontierBatch per processed bucket and returns (path,
+    reached_goal), or ([], None) when no goal is reachable.
+    """
+    stats = ensure_stats(stats, 'delta_stepping')
+    progress = ProgressLogger(logger, sample_every=1)
+    buckets_processed = relaxations = explored = 0
+
+    goals = reachable_goals(sources, goals)
+    if not goals:
+        # Rejected from the component labels before any worker is started
+        logger.info("No goal shares a component with the sources; no path")
+        return [], None
+
+    if num_processes is None or delta is None or chunk_size is None:
+        tuned = tuned_parameters(len(nodes))
+        if tuned:
+            logger.debug("Using tuned profile entry for %d cells: %s", tuned['cells'], tuned)
+            if num_processes is None:
+                num_processes = tuned['num_processes']
+            if delta is None:
+                delta = tuned['delta']
+            if chunk_size is None:
+                chunk_size = tuned['chunk_size']
+
     # Auto-configure number of processes
     if num_processes is None:
         num_processes = max(1, mp.cpu_count() - 1)  # Leave one core free for system
+    if delta is None:
+        delta = 20
+    if chunk_size is None:
+        chunk_size = 50
+    max_chunk = chunk_size
     
     # Adjust delta based on maze size for better parallelization
     if delta <= 0:
         delta = max(20, len(nodes) // 100)
     
-    print(f"Running parallel Dijkstra with {num_processes} processes, delta={delta}")
+    executor = make_executor(backend, num_processes)
+    num_processes = executor.num_workers
+    logger.info("Running parallel Dijkstra with %d %s workers, delta=%s, chunk size=%d",
+                num_processes, executor.name, delta, max_chunk)
 
     # Reset node attributes
     for node in nodes:
         node.g_cost = float('inf')
         node.parent = None
-    start.g_cost = 0
 
     # Assign unique IDs to nodes
     num_nodes = len(nodes)
     for idx, node in enumerate(nodes):
         node.id = idx
 
-    # Create shared memory arrays
-    costs = mp.Array('d', num_nodes)
-    parents = mp.Array('i', num_nodes)
-    visited = mp.Array('b', num_nodes)
+    adjacency = build_adjacency(nodes)
 
-    # Initialize shared arrays
-    for i in range(num_nodes):
-        costs[i] = float('inf')
-        parents[i] = -1
-        visited[i] = 0
-
-    start_id = start.id
-    costs[start_id] = 0.0
-    goal_id = goal.id
+    source_ids = sorted({start.id for start in sources})
+    goal_ids = frozenset(goal.id for goal in goals)
 
     # Organize nodes into buckets
     buckets = defaultdict(list)
-    buckets[0].append(start)
-
-    # Track exploration
-    start_time = time.time()
-    nodes_explored = mp.Value('i', 0)
+    buckets[0].extend(source_ids)
 
     # Use context manager to ensure proper cleanup
-    with mp.Pool(
-        processes=num_processes,
-        initializer=init_worker,
-        initargs=(costs, parents, visited, goal_id, delta, nodes_explored)
-    ) as pool:
-        current_bucket = 0
-        max_bucket = 1000  # Reasonable upper limit
-        goal_found = False
-        
-        while current_bucket <= max_bucket and not goal_found:
-            if not buckets[current_bucket]:
-                current_bucket += 1
-                continue
+    try:
+        with executor:
+            # Create shared arrays for the chosen backend
+            costs = executor.array('d', [float('inf')] * num_nodes)
+            parents = executor.array('i', [-1] * num_nodes)
+            visited = executor.array('b', [0] * num_nodes)
+            for start_id in source_ids:
+                costs[start_id] = 0.0
 
-            # Optimize chunk size based on problem size
-            total_nodes = len(buckets[current_bucket])
-            chunk_size = max(1, min(50, total_nodes // (num_processes * 2))) 
-            
-            # Create chunks with reasonable size
-            node_chunks = []
-            for i in range(0, total_nodes, chunk_size):
-                chunk = buckets[current_bucket][i:i + chunk_size]
-                if chunk:  # Only add non-empty chunks
-                    node_chunks.append(chunk)
-            
-            args = [(chunk, current_bucket) for chunk in node_chunks]
-            if not args:
-                current_bucket += 1
-                continue
-                
-            # Process all chunks in parallel
-            results = pool.map(process_bucket_nodes, args)
-
-            # Process results
-            all_relaxed_edges = []
-            for relaxed_edges, found_goal in results:
-                all_relaxed_edges.extend(relaxed_edges)
-                if found_goal:
-                    goal_found = True
+            executor.start(init_worker, (costs, parents, visited, goal_ids, delta, adjacency))
+            current_bucket = 0
+            max_bucket = 1000  # Reasonable upper limit
+            goal_found = False
             
-            if goal_found:
-                break
+            while current_bucket <= max_bucket:
+                if not buckets[current_bucket]:
+                    current_bucket += 1
+                    continue
+                bucket_nodes = buckets.pop(current_bucket)
 
-            # Add relaxed edges to buckets, avoiding duplicates efficiently
-            bucket_node_map = {}  # Track nodes already in buckets
-            for node, bucket_idx in all_relaxed_edges:
-                max_bucket = max(max_bucket, bucket_idx)
+                # Optimize chunk size based on problem size
+                total_nodes = len(bucket_nodes)
+                chunk_size = max(1, min(max_chunk, total_nodes // (num_processes * 2)))
+                
+                # Create chunks with reasonable size
+                node_chunks = []
+                for i in range(0, total_nodes, chunk_size):
+                    chunk = bucket_nodes[i:i + chunk_size]
+                    if chunk:  # Only add non-empty chunks
+                        node_chunks.append(chunk)
                 
-                # Only add each node to a bucket once per iteration
-                node_key = (node.id, bucket_idx)
-                if node_key not in bucket_node_map:
-                    bucket_node_map[node_key] = True
-                    buckets[bucket_idx].append(node)
+                args = [(chunk, current_bucket) for chunk in node_chunks]
+                if not args:
+                    current_bucket += 1
+                    continue
+                    
+                # Process all chunks in parallel
+                if stats.enabled:
+                    stats.measure_pickle(args)
+                with stats.phase('dispatch'):
+                    results = executor.map(process_bucket_nodes, args)
+                buckets_processed += 1
+                explored += total_nodes
+                progress.update("Processed bucket %d (%d nodes)", current_bucket, total_nodes)
 
-            # Clear the current bucket after processing
-            buckets[current_bucket].clear()
-            current_bucket += 1
+                # Process results
+                all_relaxed_edges = []
+                for relaxed_edges, found_goal in results:
+                    all_relaxed_edges.extend(relaxed_edges)
+                    if found_goal:
+                        goal_found = True
+                relaxations += len(all_relaxed_edges)
 
-    # Calculate results
-    end_time = time.time()
-    execution_time = end_time - start_time
-    print(f"Delta-Stepping search completed in {execution_time:.4f} seconds")
-    print(f"Nodes explored: {nodes_explored.value}")
-
-    # Update node attributes from shared memory
-    for i, node in enumerate(nodes):
-        node.g_cost = costs[i]
-        parent_id = parents[i]
-        if parent_id >= 0 and parent_id < len(nodes):
-            node.parent = nodes[parent_id]
-        else:
-            node.parent = None
-
-    # Reconstruct path
-    final_path = []
-    current = goal
-    if visited[goal_id] or costs[goal_id] < float('inf'):
-        while current is not None:
-            final_path.append(current)
-            current = current.parent
-        final_path.reverse()
-        print(f"Path found with {len(final_path)} steps")
+                # Add relaxed edges to buckets, avoiding duplicates efficiently
+                with stats.phase('merge'):
+                    bucket_node_map = {}  # Track nodes already in buckets
+                    for node_id, bucket_idx in all_relaxed_edges:
+                        max_bucket = max(max_bucket, bucket_idx)
+                        
+                        # Only add each node to a bucket once per iteration
+                        node_key = (node_id, bucket_idx)
+                        if node_key not in bucket_node_map:
+                            bucket_node_map[node_key] = True
+                            buckets[bucket_idx].append(node_id)
+
+                batch = [nodes[node_id] for node_id in bucket_nodes]
+                for node in batch:
+                    node.g_cost = costs[node.id]
+                    parent_id = parents[node.id]
+                    node.parent = nodes[parent_id] if parent_id >= 0 else None
+                yield FrontierBatch(batch, current_bucket)
+
+                # With delta larger than the edge weight, relaxations can land back in the
+                # current bucket; keep processing it until it drains so costs stay exact
+                if buckets[current_bucket]:
+                    continue
+                if goal_found:
+                    break
+                current_bucket += 1
+
+            # Copy results out before the backend releases its shared arrays
+            costs, parents, visited = costs[:], parents[:], visited[:]
+    finally:
+        stats.add('expansions', explored)
+        stats.add('relaxations', relaxations)
+        stats.add('buckets_processed', buckets_processed)
+
+    logger.info("Nodes explored: %d", explored)
+
+    with stats.phase('reconstruct'):
+        # Update node attributes from shared memory
+        for i, node in enumerate(nodes):
+            node.g_cost = costs[i]
+            parent_id = parents[i]
+            if parent_id >= 0 and parent_id < len(nodes):
+                node.parent = nodes[parent_id]
+            else:
+                node.parent = None
+
+        # Reconstruct path to the cheapest goal reached
+        final_path = []
+        reached = None
+        reached_ids = [goal_id for goal_id in goal_ids if costs[goal_id] < float('inf')]
+        if reached_ids:
+            reached = nodes[min(reached_ids, key=lambda goal_id: (costs[goal_id], goal_id))]
+            current = reached
+            while current is not None:
+                final_path.append(current)
+                current = current.parent
+            final_path.reverse()
+    if final_path:
+        logger.info("Path found with %d steps", len(final_path))
     else:
-        print("No path found!")
+        logger.info("No path found!")
+    return final_path, reached
+
+def delta_stepping_dijkstra(start, goal, nodes, original_maze, path, finalPath, goal_pen, num_processes=None, delta=None,
+                            chunk_size=None, stats=None, backend=None):
+    """Delta-Stepping Parallel Dijkstra's algorithm using shared memory with reduced overhead.
+
+    ``num_processes``, ``delta`` and ``chunk_size`` (the most nodes handed to a
+    worker per task) default to the entry of the tuning profile written by
+    ``autotune.py`` that is closest to this maze's size, and to the built-in
+    defaults when no profile exists. ``backend`` names one of
+    ``core.executors.BACKENDS`` (shared-memory processes by default).
+    """
+    start_time = time.time()
+    stepper = SearchStepper(delta_stepping_steps(start, goal, nodes, num_processes, delta, chunk_size, stats, backend))
+    nodes_explored = 0
+    for batch in stepper:
+        nodes_explored += len(batch.nodes)
+
+    # Calculate results
+    execution_time = time.time() - start_time
+    logger.info("Delta-Stepping search completed in %.4f seconds", execution_time)
 
     # Make sure to finish the function properly
-    return final_path, execution_time, nodes_explored.value
\ No newline at end of file
+    return stepper.result, execution_time, nodes_explored
@@ -0,0 +1,360 @@
+import argparse
+import logging
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from core.executors import make_executor
+from core.grid import EDGE_WEIGHT, DIRECTIONS, wall_grid_from_nodes
+from core.maze_utils import same_component
+from core.stats import ensure_stats, ProgressLogger
+from core.stepper import SearchStepper, RelaxationRound
+
+logger = logging.getLogger(__name__)
+
+INF = float('inf')
+
+# Global variables set up in each worker by init_worker
+global_walls = None
+global_distances = None
+
+
+def init_worker(walls, distances):
+    """Initializer function to set up global variables in each worker."""
+    global global_walls, global_distances
+    global_walls = walls
+    global_distances = distances
+
+
+def make_tiles(height, width, tile_rows, tile_cols):
+    """Split the grid into rectangles; returns (bounds, tiles_across).
+
+    ``bounds[i]`` is (row_start, row_end, col_start, col_end) of tile ``i``,
+    numbered row-major so the tile to the right is ``i + 1`` and the tile below
+    is ``i + tiles_across``.
+    """
+    tiles_across = math.ceil(width / tile_cols)
+    bounds = []
+    for row_start in range(0, height, tile_rows):
+        for col_start in range(0, width, tile_cols):
+            bounds.append((row_start, min(row_start + tile_rows, height),
+                           col_start, min(col_start + tile_cols, width)))
+    return bounds, tiles_across
+
+
+def default_tile_size(height, width, num_workers):
+    """About two tiles per worker, so a round keeps every worker busy without shrinking tiles needlessly."""
+    per_side = max(1, math.ceil(math.sqrt(2 * num_workers)))
+    return max(1, math.ceil(height / per_side)), max(1, math.ceil(width / per_side))
+
+
+def relax_local(local, open_cells, width, halos, seed_all=False):
+    """Dijkstra inside one tile, in place on its flat ``local`` distances.
+
+    ``halos`` holds the distances just outside the (top, bottom, left, right)
+    border, or None where the tile touches the edge of the grid. Cells are
+    seeded from the halo and, when ``seed_all`` is set, from every finite cell.
+    Returns the number of cells settled.
+    """
+    height = len(local) // width
+    seeds = []
+    if seed_all:
+        seeds = [(value, index) for index, value in enumerate(local) if value < INF]
+
+    def pull(index, halo_value):
+        candidate = halo_value + EDGE_WEIGHT
+        if open_cells[index] and candidate < local[index]:
+            local[index] = candidate
+            seeds.append((candidate, index))
+
+    top, bottom, left, right = halos
+    if top is not None:
+        for col, value in enumerate(top):
+            pull(col, value)
+    if bottom is not None:
+        for col, value in enumerate(bottom):
+            pull((height - 1) * width + col, value)
+    if left is not None:
+        for row, value in enumerate(left):
+            pull(row * width, value)
+    if right is not None:
+        for row, value in enumerate(right):
+            pull(row * width + width - 1, value)
+
+    # Every move costs the same, so Dijkstra reduces to merging the sorted seeds
+    # with a FIFO queue whose values never decrease
+    seeds.sort()
+    seed_position = 0
+    queue = deque()
+    settled = 0
+    while seed_position < len(seeds) or queue:
+        if queue and (seed_position == len(seeds) or queue[0][0] <= seeds[seed_position][0]):
+            value, index = queue.popleft()
+        else:
+            value, index = seeds[seed_position]
+            seed_position += 1
+        if value > local[index]:
+            continue
+        settled += 1
+        new_value = value + EDGE_WEIGHT
+        col = index % width
+        for neighbor in (index - width, index + width):
+            if 0 <= neighbor < len(local) and open_cells[neighbor] and new_value < local[neighbor]:
+                local[neighbor] = new_value
+                queue.append((new_value, neighbor))
+        if col > 0 and open_cells[index - 1] and new_value < local[index - 1]:
+            local[index - 1] = new_value
+            queue.append((new_value, index - 1))
+        if col < width - 1 and open_cells[index + 1] and new_value < local[index + 1]:
+            local[index + 1] = new_value
+            queue.append((new_value, index + 1))
+    return settled
+
+
+def changed_edges(local, original, width):
+    """Flags for whether the (top, bottom, left, right) border of a tile improved."""
+    height = len(local) // width
+    return (local[:width] != original[:width],
+            local[(height - 1) * width:] != original[(height - 1) * width:],
+            any(local[row * width] < original[row * width] for row in range(height)),
+            any(local[row * width + width - 1] < original[row * width + width - 1] for row in range(height)))
+
+
+def border_values(local, width):
+    """The (top, bottom, left, right) border cells of a tile, as lists."""
+    height = len(local) // width
+    return (local[:width], local[(height - 1) * width:],
+            local[::width], local[width - 1::width])
+
+
+def relax_tile(args):
+    """Run Dijkstra inside one tile against the current distances of its one-cell halo.
+
+    Only the owning task writes a tile's cells, so no lock is taken for the
+    write-back; halo values are at least as fresh as the previous round.
+    Returns (tile_index, cells_improved, cells_settled, changed_edges) where
+    changed_edges flags the (top, bottom, left, right) border rows/columns.
+    """
+    tile_index, (row_start, row_end, col_start, col_end), seed_all = args
+    distances = global_distances
+    grid_height, grid_width = global_walls.shape
+    height = row_end - row_start
+    width = col_end - col_start
+
+    open_cells = (~global_walls[row_start:row_end, col_start:col_end]).ravel().tolist()
+
+    # One slice per row, widened by a cell on each side to pick up the left/right halo
+    left_halo = col_start > 0
+    right_halo = col_end < grid_width
+    read_start = col_start - left_halo
+    read_end = col_end + right_halo
+    local = []
+    left = [] if left_halo else None
+    right = [] if right_halo else None
+    for row in range(row_start, row_end):
+        values = distances[row * grid_width + read_start:row * grid_width + read_end]
+        local.extend(values[left_halo:len(values) - right_halo])
+        if left_halo:
+            left.append(values[0])
+        if right_halo:
+            right.append(values[-1])
+    top = bottom = None
+    if row_start > 0:
+        base = (row_start - 1) * grid_width
+        top = distances[base + col_start:base + col_end]
+    if row_end < grid_height:
+        base = row_end * grid_width
+        bottom = distances[base + col_start:base + col_end]
+    original = list(local)
+    # A tile's first task starts from its seeded sources, so compare its borders
+    # against an unreached tile; otherwise a source on the border never wakes the neighbor
+    baseline = [INF] * len(local) if seed_all else original
+
+    settled = relax_local(local, open_cells, width, (top, bottom, left, right), seed_all)
+
+    # Write back only the rows that changed
+    improved = 0
+    for row in range(height):
+        segment = local[row * width:(row + 1) * width]
+        if segment == original[row * width:(row + 1) * width]:
+            continue
+        improved += sum(1 for new, old in zip(segment, original[row * width:(row + 1) * width]) if new < old)
+        base = (row_start + row) * grid_width
+        distances[base + col_start:base + col_end] = segment
+    return tile_index, improved, settled, changed_edges(local, baseline, width)
+
+
+def tiled_distance_steps(walls, sources, num_processes=None, tile_size=None, stats=None, backend=None):
+    """Generator form of tiled Dijkstra: yields a RelaxationRound per bulk-synchronous round.
+
+    The grid is cut into rectangular tiles; each round, every active tile runs
+    a local Dijkstra in one task and the tiles whose borders changed wake their
+    neighbors for the next round, until no border changes. Returns the
+    distance field (float array, inf where unreachable) from the nearest of
+    ``sources``, given as (row, col) cells. Closing the generator shuts the
+    worker pool down.
+    """
+    stats = ensure_stats(stats, 'tiled_dijkstra')
+    progress = ProgressLogger(logger, sample_every=1)
+    rounds = relaxations = settled = 0
+    height, width = walls.shape
+
+    executor = make_executor(backend, num_processes)
+    num_processes = executor.num_workers
+    tile_rows, tile_cols = tile_size or default_tile_size(height, width, num_processes)
+    bounds, tiles_across = make_tiles(height, width, tile_rows, tile_cols)
+    logger.info("Running tiled Dijkstra with %d %s workers on %d tiles of %dx%d cells",
+                num_processes, executor.name, len(bounds), tile_rows, tile_cols)
+
+    def tile_of(row, col):
+        return (row // tile_rows) * tiles_across + col // tile_cols
+
+    initial = [INF] * (height * width)
+    active = set()
+    for row, col in sources:
+        if not walls[row, col]:
+            initial[row * width + col] = 0.0
+            active.add(tile_of(row, col))
+    seeded = set()
+
+    try:
+        with executor:
+            distances = executor.array('d', initial)
+            del initial
+            executor.start(init_worker, (walls, distances))
+
+            while active:
+                tasks = [(index, bounds[index], index not in seeded) for index in sorted(active)]
+                seeded.update(active)
+                if stats.enabled:
+                    stats.measure_pickle(tasks)
+                with stats.phase('dispatch'):
+                    results = executor.map(relax_tile, tasks)
+                rounds += 1
+
+                updated = 0
+                next_active = set()
+                with stats.phase('merge'):
+                    for index, improved, tile_settled, (top, bottom, left, right) in results:
+                        updated += improved
+                        settled += tile_settled
+                        row_start, row_end, col_start, col_end = bounds[index]
+                        if top and row_start > 0:
+                            next_active.add(index - tiles_across)
+                        if bottom and row_end < height:
+                            next_active.add(index + tiles_across)
+                        if left and col_start > 0:
+                            next_active.add(index - 1)
+                        if right and col_end < width:
+                            next_active.add(index + 1)
+                relaxations += updated
+                progress.update("Round %d: %d tiles, %d cells improved", rounds, len(tasks), updated)
+                yield RelaxationRound(rounds, updated, distances)
+                active = next_active
+
+            # Copy results out before the backend releases its shared arrays
+            field = np.array(distances[:], dtype=np.float64).reshape(height, width)
+    finally:
+        stats.add('rounds', rounds)
+        stats.add('relaxations', relaxations)
+        stats.add('expansions', settled)
+
+    logger.info("Converged after %d rounds", rounds)
+    return field
+
+
+def trace_path(field, goal):
+    """Cells from the nearest source to ``goal`` by walking down a distance field; [] if unreachable."""
+    row, col = goal
+    if not np.isfinite(field[row, col]):
+        return []
+    height, width = field.shape
+    path = [(row, col)]
+    while field[row, col] > 0:
+        target = field[row, col] - EDGE_WEIGHT
+        for d_row, d_col in DIRECTIONS:
+            n_row, n_col = row + d_row, col + d_col
+            if 0 <= n_row < height and 0 <= n_col < width and field[n_row, n_col] == target:
+                row, col = n_row, n_col
+                break
+        path.append((row, col))
+    path.reverse()
+    return path
+
+
+def tiled_dijkstra(start, goal, nodes, num_processes=None, tile_size=None, stats=None, backend=None):
+    """Shortest path between two Nodes by tiled (spatially decomposed) parallel Dijkstra.
+
+    The whole distance field from ``start`` is computed, so this pays off on
+    large grids where tiles keep each task inside a compact block of memory.
+    ``tile_size`` is (rows, cols); by default the grid is cut into about two
+    tiles per worker. Returns (path, execution_time, rounds).
+    """
+    start_time = time.time()
+    if not same_component(start, goal):
+        logger.info("Goal is in another component; no path")
+        return [], time.time() - start_time, 0
+    stats = ensure_stats(stats, 'tiled_dijkstra')
+    walls = wall_grid_from_nodes(nodes)
+    stepper = SearchStepper(tiled_distance_steps(walls, [(start.row, start.col)], num_processes, tile_size,
+                                                 stats, backend))
+    stepper.run_to_completion()
+    field = stepper.result
+
+    with stats.phase('reconstruct'):
+        by_cell = {(node.row, node.col): node for node in nodes}
+        for node in nodes:
+            node.g_cost = field[node.row, node.col]
+            node.parent = None
+        path = [by_cell[cell] for cell in trace_path(field, (goal.row, goal.col))]
+        for parent, child in zip(path, path[1:]):
+            child.parent = parent
+
+    execution_time = time.time() - start_time
+    logger.info("Tiled Dijkstra completed in %.4f seconds", execution_time)
+    return path, execution_time, stepper.steps
+
+
+def verify(sizes=(12, 30), tile_sizes=((1, 1), (7, 2), (4, 4), None), backends=('serial', 'threads'), seed=0):
+    """Compare tiled distance fields with breadth-first search on seeded mazes; returns a list of mismatches.
+
+    Besides the mazes, a 1x8 corridor with its source on a tile border checks
+    that a source's own border wakes the neighboring tile.
+    """
+    import random
+    from core.grid import wall_grid
+    from core.heuristics import distance_field
+    from core.maze_utils import generate_maze
+
+    cases = [('corridor 1x8', np.zeros((1, 8), dtype=bool), [(0, 3)], [(1, 4)])]
+    for size in sizes:
+        rng = random.Random(seed + size)
+        walls = wall_grid(generate_maze(size, size, 0.25, rng))
+        open_cells = [tuple(cell) for cell in np.argwhere(~walls).tolist()]
+        cases.append((f"{size}x{size}", walls, rng.sample(open_cells, 2), tile_sizes))
+
+    mismatches = []
+    for name, walls, sources, case_tiles in cases:
+        expected = distance_field(walls, sources)
+        for backend in backends:
+            for tile_size in case_tiles:
+                field = SearchStepper(tiled_distance_steps(walls, sources, 2, tile_size,
+                                                           backend=backend)).run_to_completion()
+                if not np.array_equal(field, expected):
+                    mismatches.append(f"{name} tiles={tile_size} {backend}: "
+                                      f"{int((field != expected).sum())} cells differ")
+    return mismatches
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check tiled Dijkstra against breadth-first search.')
+    parser.add_argument('--verify', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.verify:
+        mismatches = verify(seed=args.seed)
+        print('\n'.join(mismatches) if mismatches else "Tiled distances match breadth-first search")
+        raise SystemExit(1 if mismatches else 0)
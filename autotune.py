@@ -0,0 +1,209 @@
+import argparse
+import csv
+import logging
+import multiprocessing as mp
+import random
+import statistics
+import time
+from collections import deque
+from itertools import product
+
+from core.maze_utils import generate_maze
+from core.maze_utils import createNodes, createFriendsList
+from core.tuning import save_profile, profile_path
+from algorithms.parallel_dijkstra import delta_stepping_dijkstra
+
+
+def default_process_counts():
+    """1, 2, 4, ... up to the number of cores, always including the core count."""
+    counts = []
+    p = 1
+    while p < mp.cpu_count():
+        counts.append(p)
+        p *= 2
+    counts.append(mp.cpu_count())
+    return counts
+
+
+def sample_mazes(width, height, wall_density, samples, seed):
+    """Generate reproducible sample mazes (the same as core.corpus.trial_mazes) without touching the global state."""
+    return [generate_maze(width, height, wall_density, random.Random(seed + i)) for i in range(samples)]
+
+
+def reference_cost(start, goal):
+    """Breadth-first shortest path cost (every edge weighs 20), used to validate tuned runs."""
+    depth = {start: 0}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        if node is goal:
+            return depth[node] * 20
+        for neighbor in node.friend:
+            if neighbor not in depth:
+                depth[neighbor] = depth[node] + 1
+                queue.append(neighbor)
+    return float('inf')
+
+
+def time_configuration(mazes, num_processes, delta, chunk_size, repeats=1):
+    """Return the median delta-stepping time for one configuration over all sample mazes.
+
+    A configuration that returns a wrong goal cost is never fast enough, so it
+    gets an infinite time.
+    """
+    times = []
+    for maze_list in mazes:
+        nodes = createNodes(maze_list)
+        start, goal, _ = createFriendsList(nodes)
+        expected = reference_cost(start, goal)
+        for _ in range(repeats):
+            _, execution_time, _ = delta_stepping_dijkstra(start, goal, nodes, maze_list, None, None, None,
+                                                           num_processes, delta, chunk_size)
+            if goal.g_cost != expected:
+                print(f"  processes={num_processes} delta={delta} chunk={chunk_size}: "
+                      f"wrong cost {goal.g_cost} (expected {expected}), rejected")
+                return float('inf')
+            times.append(execution_time)
+    return statistics.median(times)
+
+
+def autotune(width, height, wall_density=0.2, deltas=None, chunk_sizes=None, process_counts=None,
+             samples=2, repeats=1, seed=0):
+    """
+    Sweep delta, chunk size and process count for delta-stepping Dijkstra.
+
+    Args:
+        width: Width of the sample mazes
+        height: Height of the sample mazes
+        wall_density: Wall density of the sample mazes
+        deltas: Delta values to try
+        chunk_sizes: Maximum nodes per worker task to try
+        process_counts: Worker counts to try
+        samples: Number of seeded sample mazes
+        repeats: Runs per maze and configuration
+        seed: Seed of the first sample maze
+
+    Returns:
+        (rows, best) where rows holds the median time of every configuration
+        and best is the profile entry for the fastest one
+    """
+    deltas = deltas or [20, 40, 80, 160]
+    chunk_sizes = chunk_sizes or [10, 25, 50, 100]
+    process_counts = process_counts or default_process_counts()
+    mazes = sample_mazes(width, height, wall_density, samples, seed)
+
+    rows = []
+    for num_processes, delta, chunk_size in product(process_counts, deltas, chunk_sizes):
+        median_time = time_configuration(mazes, num_processes, delta, chunk_size, repeats)
+        rows.append({
+            'width': width,
+            'height': height,
+            'wall_density': wall_density,
+            'num_processes': num_processes,
+            'delta': delta,
+            'chunk_size': chunk_size,
+            'time': median_time,
+        })
+        print(f"  processes={num_processes} delta={delta} chunk={chunk_size}: {median_time:.4f}s")
+
+    fastest = min(rows, key=lambda row: row['time'])
+    best = {
+        'cells': width * height,
+        'wall_density': wall_density,
+        'num_processes': fastest['num_processes'],
+        'delta': fastest['delta'],
+        'chunk_size': fastest['chunk_size'],
+        'time': fastest['time'],
+        'tuned_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    return rows, best
+
+
+def strong_scaling(rows):
+    """Best time per process count, with speedup and efficiency relative to the smallest count."""
+    best_by_processes = {}
+    for row in rows:
+        current = best_by_processes.get(row['num_processes'])
+        if current is None or row['time'] < current['time']:
+            best_by_processes[row['num_processes']] = row
+    counts = sorted(best_by_processes)
+    base_count = counts[0]
+    base_time = best_by_processes[base_count]['time']
+    curve = []
+    for count in counts:
+        row = best_by_processes[count]
+        speedup = base_time / row['time'] if row['time'] > 0 else 0.0
+        curve.append({
+            'num_processes': count,
+            'delta': row['delta'],
+            'chunk_size': row['chunk_size'],
+            'time': row['time'],
+            'speedup': speedup,
+            'efficiency': speedup * base_count / count,
+        })
+    return curve
+
+
+def save_rows(rows, filename):
+    with open(filename, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Results saved to {filename}")
+
+
+def plot_strong_scaling(curve, filename):
+    import matplotlib.pyplot as plt
+
+    counts = [point['num_processes'] for point in curve]
+    plt.figure(figsize=(10, 5))
+    plt.plot(counts, [point['speedup'] for point in curve], 'g-o', label='Measured speedup')
+    plt.plot(counts, [c / counts[0] for c in counts], 'r--', label='Ideal')
+    plt.xlabel('Number of Processes')
+    plt.ylabel('Speedup')
+    plt.title('Delta-Stepping Strong Scaling')
+    plt.legend()
+    plt.grid(True)
+    plt.savefig(filename)
+    plt.close()
+
+
+def int_list(text):
+    return [int(value) for value in text.split(',') if value]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Autotune delta, chunk size and process count for parallel Dijkstra.')
+    parser.add_argument('--width', type=int, default=50)
+    parser.add_argument('--height', type=int, default=50)
+    parser.add_argument('--density', type=float, default=0.2, help='wall density of the sample mazes')
+    parser.add_argument('--deltas', type=int_list, default=None, help='comma separated, e.g. 20,40,80')
+    parser.add_argument('--chunks', type=int_list, default=None, help='comma separated chunk sizes')
+    parser.add_argument('--processes', type=int_list, default=None, help='comma separated process counts')
+    parser.add_argument('--samples', type=int, default=2)
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile', default=None, help='profile file to update (default: tuning_profile.json)')
+    parser.add_argument('--plot', action='store_true', help='save the strong-scaling curve as a PNG')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    print(f"Autotuning delta-stepping on {args.samples} sample mazes of {args.width}x{args.height}, "
+          f"density {args.density}")
+    rows, best = autotune(args.width, args.height, args.density, args.deltas, args.chunks, args.processes,
+                          args.samples, args.repeats, args.seed)
+
+    tag = f"{args.width}x{args.height}_{args.density}"
+    save_rows(rows, f"autotune_sweep_{tag}.csv")
+    curve = strong_scaling(rows)
+    save_rows(curve, f"autotune_scaling_{tag}.csv")
+    print("\nStrong scaling (best configuration per process count):")
+    for point in curve:
+        print(f"  {point['num_processes']:>3} processes: {point['time']:.4f}s, "
+              f"speedup {point['speedup']:.2f}x, efficiency {point['efficiency']:.0%}")
+    if args.plot:
+        plot_strong_scaling(curve, f"autotune_scaling_{tag}.png")
+
+    path = save_profile([best], args.profile)
+    print(f"\nBest: processes={best['num_processes']} delta={best['delta']} chunk={best['chunk_size']} "
+          f"({best['time']:.4f}s), saved to {profile_path(path)}")
@@ -0,0 +1,95 @@
+import argparse
+import csv
+import sys
+import time
+
+from core.corpus import Corpus, trial_mazes, trial_graphs
+from core.executors import BACKENDS, gil_enabled
+from core.maze_utils import createNodes, createFriendsList
+from core.stats import SearchStats
+from algorithms.parallel_dijkstra import delta_stepping_dijkstra
+from algorithms.parallel_astar import parallel_a_star
+from algorithms.BellmanFord_v5 import bellman_ford_parallel, bellman_ford_async
+
+
+def run_maze_engine(engine, maze_list, backend, num_processes):
+    nodes = createNodes(maze_list)
+    start, goal, _ = createFriendsList(nodes)
+    stats = SearchStats()
+    start_time = time.perf_counter()
+    if engine == 'delta_stepping':
+        final_path, _, _ = delta_stepping_dijkstra(start, goal, nodes, maze_list, None, None, None,
+                                                   num_processes, stats=stats, backend=backend)
+    else:
+        final_path, _ = parallel_a_star(start, goal, nodes, maze_list, stats=stats,
+                                        num_processes=num_processes, backend=backend)
+    return time.perf_counter() - start_time, len(final_path), stats
+
+
+def run_bellman_ford(engine, graph, num_nodes, backend, num_processes):
+    solve = bellman_ford_async if engine == 'bellman_ford_async' else bellman_ford_parallel
+    stats = SearchStats()
+    start_time = time.perf_counter()
+    distances = solve(graph, num_nodes, num_processes=num_processes, stats=stats, backend=backend)
+    reachable = sum(1 for d in distances if d != float('inf'))
+    return time.perf_counter() - start_time, reachable, stats
+
+
+def benchmark_backends(maze_size=40, graph_nodes=800, backends=BACKENDS, num_processes=None, seed=0, corpus=None):
+    """
+    Run every parallel engine on the same instances with each execution backend.
+
+    Args:
+        maze_size: Width and height of the generated maze
+        graph_nodes: Number of vertices of the Bellman-Ford graph
+        backends: Backend names from core.executors.BACKENDS
+        num_processes: Workers per backend (None for one per core)
+        seed: Seed for the maze and graph generators
+        corpus: core.corpus.Corpus to replay the maze and graph from, or None to generate them
+
+    Returns:
+        List of result rows
+    """
+    maze_list, = trial_mazes(maze_size, maze_size, 1, 0.2, seed, corpus)
+    (graph, num_nodes), = trial_graphs(graph_nodes, 1, 0.01, seed, corpus)
+
+    rows = []
+    for engine in ('delta_stepping', 'parallel_a_star', 'bellman_ford', 'bellman_ford_async'):
+        for backend in backends:
+            if engine.startswith('bellman_ford'):
+                elapsed, result_size, stats = run_bellman_ford(engine, graph, num_nodes, backend, num_processes)
+            else:
+                elapsed, result_size, stats = run_maze_engine(engine, maze_list, backend, num_processes)
+            rows.append({
+                'engine': engine,
+                'backend': backend,
+                'time': elapsed,
+                'result_size': result_size,
+                'dispatch_time': stats.timings.get('dispatch', 0.0),
+                'bytes_pickled': stats['bytes_pickled'],
+                'rounds': stats['rounds'],
+            })
+            print(f"  {engine:<18} {backend:<14} {elapsed:.4f}s (dispatch {rows[-1]['dispatch_time']:.4f}s"
+                  f"{', %d rounds' % stats['rounds'] if engine.startswith('bellman_ford') else ''})")
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the parallel engines on every execution backend.')
+    parser.add_argument('--maze-size', type=int, default=40)
+    parser.add_argument('--graph-nodes', type=int, default=800)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--backends', default=','.join(BACKENDS), help='comma separated backend names')
+    parser.add_argument('--output', default='backend_results.csv')
+    parser.add_argument('--corpus', help='replay the maze and graph of a corpus directory (see core/corpus.py)')
+    args = parser.parse_args()
+
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil_enabled() else 'disabled (free-threaded)'}")
+    rows = benchmark_backends(args.maze_size, args.graph_nodes, args.backends.split(','), args.processes,
+                              corpus=Corpus.load(args.corpus) if args.corpus else None)
+    with open(args.output, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]) + ['gil_enabled'])
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(dict(row, gil_enabled=gil_enabled()))
+    print(f"Results saved to {args.output}")
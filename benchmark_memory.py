@@ -0,0 +1,194 @@
+"""Memory footprint of every engine by maze size, for the parent and each pool worker.
+
+Each case runs twice in a fresh interpreter, so peaks from one case never leak
+into the next: once under ``tracemalloc`` for the Python allocations of the
+node graph (``createNodes`` + ``createFriendsList``) and of the search, and
+once untraced for the peak RSS of the parent and of every worker process.
+Results go to a CSV next to the timing results; with ``--baseline`` the run
+fails when the traced bytes per cell grew by more than ``--tolerance``.
+"""
+import argparse
+import csv
+import multiprocessing as mp
+import random
+import sys
+import time
+import tracemalloc
+
+from cli import ENGINES, build_parser
+from core.corpus import Corpus, trial_mazes
+from core.maze_utils import generate_maze, createNodes, createFriendsList
+from core.memory import WorkerMemory, current_rss, peak_rss
+
+# Engines that start workers; the others run once per maze size with backend '-'
+PARALLEL_ENGINES = ('parallel_a_star', 'delta_stepping', 'tiled')
+DEFAULT_ENGINES = ('dijkstra', 'a_star') + PARALLEL_ENGINES
+# Engines that answer from a file precomputed for one maze, so they cannot solve the generated mazes
+PRECOMPUTED_ENGINES = ('oracle', 'hierarchy')
+# Side of the maze solved first so lazily imported modules are not counted
+WARMUP_SIZE = 8
+
+
+def solve(engine, maze_list, args):
+    nodes = createNodes(maze_list)
+    start, goal, _ = createFriendsList(nodes)
+    return ENGINES[engine](start, goal, nodes, args, None)
+
+
+def check_engines(engines):
+    """Raise ValueError naming any engine this benchmark cannot run."""
+    unsupported = [engine for engine in engines if engine not in ENGINES or engine in PRECOMPUTED_ENGINES]
+    if unsupported:
+        raise ValueError(f"Cannot benchmark {', '.join(unsupported)}; choose from "
+                         f"{', '.join(sorted(set(ENGINES) - set(PRECOMPUTED_ENGINES)))}")
+
+
+def run_case(engine, maze_size, backend, num_processes, seed, corpus_dir, traced, connection):
+    """Build the maze and solve it once; runs in a fresh process and sends back a result dict."""
+    maze_list, = trial_mazes(maze_size, maze_size, 1, 0.2, seed, Corpus.load(corpus_dir) if corpus_dir else None)
+    # The CLI's own defaults, so options added for new engines are filled in too
+    argv = ['--engine', engine]
+    if num_processes is not None:
+        argv += ['--processes', str(num_processes)]
+    if backend != '-':
+        argv += ['--backend', backend]
+    args = build_parser().parse_args(argv)
+    result = {}
+    solve(engine, generate_maze(WARMUP_SIZE, WARMUP_SIZE, 0.2, random.Random(seed)), args)
+    baseline_rss = current_rss()
+    if traced:
+        tracemalloc.start()
+    nodes = createNodes(maze_list)
+    start, goal, _ = createFriendsList(nodes)
+    if traced:
+        result['graph_bytes'] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        before_search = tracemalloc.get_traced_memory()[0]
+
+    with WorkerMemory() as workers:
+        start_time = time.perf_counter()
+        path = ENGINES[engine](start, goal, nodes, args, None)
+        result['time'] = time.perf_counter() - start_time
+    result['path_cells'] = len(path)
+
+    if traced:
+        result['search_peak_bytes'] = tracemalloc.get_traced_memory()[1] - before_search
+        tracemalloc.stop()
+    else:
+        peak = peak_rss()
+        result['parent_rss_bytes'] = peak - baseline_rss if peak and baseline_rss else None
+        result['workers'] = sum(1 for _, role, _, _ in workers.peaks if role == 'worker')
+        result['worker_rss_max'] = workers.largest()
+        result['worker_rss_total'] = workers.total()
+        result['manager_rss'] = workers.total('manager')
+    connection.send(result)
+    connection.close()
+
+
+def measure(engine, maze_size, backend, num_processes, seed, corpus_dir, traced):
+    context = mp.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=run_case, args=(engine, maze_size, backend, num_processes, seed, corpus_dir,
+                                                     traced, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        raise RuntimeError(f"{engine} on {maze_size}x{maze_size} ({backend}) exited without a result") from None
+    process.join()
+    return result
+
+
+def benchmark_memory(maze_sizes=(50, 100), engines=DEFAULT_ENGINES, backends=('shm-processes',),
+                     num_processes=None, seed=0, corpus_dir=None):
+    """
+    Measure traced allocations and peak RSS of every engine on generated mazes.
+
+    Args:
+        maze_sizes: Widths (and heights) of the generated mazes
+        engines: Engine names from cli.ENGINES
+        backends: Backends from core.executors.BACKENDS for the parallel engines
+        num_processes: Workers per parallel engine (None for one per core)
+        seed: Seed for the maze generator
+        corpus_dir: Corpus directory to replay the mazes from (see core/corpus.py), or None to generate them
+
+    Returns:
+        List of result rows
+    """
+    check_engines(engines)
+    rows = []
+    for maze_size in maze_sizes:
+        cells = maze_size * maze_size
+        for engine in engines:
+            for backend in (backends if engine in PARALLEL_ENGINES else ('-',)):
+                traced = measure(engine, maze_size, backend, num_processes, seed, corpus_dir, traced=True)
+                untraced = measure(engine, maze_size, backend, num_processes, seed, corpus_dir, traced=False)
+                row = {
+                    'engine': engine,
+                    'backend': backend,
+                    'maze_size': maze_size,
+                    'cells': cells,
+                    'time': untraced['time'],
+                    'path_cells': untraced['path_cells'],
+                    'graph_bytes': traced['graph_bytes'],
+                    'search_peak_bytes': traced['search_peak_bytes'],
+                    'traced_bytes_per_cell': (traced['graph_bytes'] + traced['search_peak_bytes']) / cells,
+                    'parent_rss_bytes': untraced['parent_rss_bytes'],
+                    'workers': untraced['workers'],
+                    'worker_rss_max': untraced['worker_rss_max'],
+                    'worker_rss_total': untraced['worker_rss_total'],
+                    'manager_rss': untraced['manager_rss'],
+                }
+                rows.append(row)
+                print(f"  {engine:<16} {backend:<14} {maze_size:>5}  {row['traced_bytes_per_cell']:8.0f} B/cell  "
+                      f"parent +{(row['parent_rss_bytes'] or 0) / 2 ** 20:6.1f} MB  "
+                      f"workers {row['workers']} x <= {row['worker_rss_max'] / 2 ** 20:.1f} MB")
+    return rows
+
+
+def compare_to_baseline(rows, baseline_file, tolerance):
+    """Rows whose traced bytes per cell exceed the baseline by more than ``tolerance`` (a fraction)."""
+    with open(baseline_file, newline='') as file:
+        baseline = {(row['engine'], row['backend'], int(row['maze_size'])): float(row['traced_bytes_per_cell'])
+                    for row in csv.DictReader(file)}
+    regressions = []
+    for row in rows:
+        reference = baseline.get((row['engine'], row['backend'], row['maze_size']))
+        if reference and row['traced_bytes_per_cell'] > reference * (1 + tolerance):
+            regressions.append((row, reference))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure memory per cell of every engine, parent and workers.')
+    parser.add_argument('--sizes', default='50,100', help='comma separated maze sizes')
+    parser.add_argument('--engines', default=','.join(DEFAULT_ENGINES))
+    parser.add_argument('--backends', default='shm-processes', help='backends for the parallel engines')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus', help='replay the mazes of a corpus directory (see core/corpus.py)')
+    parser.add_argument('--output', default='memory_results.csv')
+    parser.add_argument('--baseline', help='earlier results to compare traced bytes per cell against')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed growth over the baseline')
+    args = parser.parse_args()
+
+    try:
+        check_engines(args.engines.split(','))
+    except ValueError as error:
+        parser.error(str(error))
+
+    rows = benchmark_memory([int(size) for size in args.sizes.split(',')], args.engines.split(','),
+                            args.backends.split(','), args.processes, args.seed, args.corpus)
+    with open(args.output, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(rows, args.baseline, args.tolerance)
+        for row, reference in regressions:
+            print(f"Memory regression: {row['engine']} ({row['backend']}) at {row['maze_size']}: "
+                  f"{row['traced_bytes_per_cell']:.0f} B/cell vs {reference:.0f}")
+        sys.exit(1 if regressions else 0)
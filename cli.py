@@ -0,0 +1,235 @@
+"""Headless command-line solver.
+
+    python cli.py --engine dijkstra --maze maze.txt --start 0 1 --goal 14 23 --format json
+
+Engines, GUI and plotting modules are imported only once they are selected,
+so a headless query does not pay for turtle, tkinter or matplotlib (and the
+plain Dijkstra engine does not even import NumPy).
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+from core.maze_utils import read_File_Create_List, createNodes, createFriendsList
+from core.stats import SearchStats
+from core.stepper import SearchStepper
+
+EDGE_WEIGHT = 20
+
+
+def run_dijkstra(start, goal, nodes, args, stats):
+    from algorithms.dijkstra import dijkstra_steps
+    return SearchStepper(dijkstra_steps(start, goal, nodes, stats)).run_to_completion()
+
+
+def run_a_star(start, goal, nodes, args, stats):
+    from algorithms.a_star import a_star_steps
+    return SearchStepper(a_star_steps(start, goal, nodes, stats, args.heuristic)).run_to_completion()
+
+
+def run_parallel_a_star(start, goal, nodes, args, stats):
+    from algorithms.parallel_astar import parallel_a_star
+    path, _ = parallel_a_star(start, goal, nodes, stats=stats, num_processes=args.processes, backend=args.backend,
+                              heuristic_kind=args.heuristic)
+    return path
+
+
+def run_batched_dijkstra(start, goal, nodes, args, stats):
+    from algorithms.batched_search import batched_search
+    path, _, _ = batched_search(start, goal, nodes, 'dijkstra', args.batch_size, stats, args.processes, args.backend)
+    return path
+
+
+def run_batched_a_star(start, goal, nodes, args, stats):
+    from algorithms.batched_search import batched_search
+    path, _, _ = batched_search(start, goal, nodes, 'a_star', args.batch_size, stats, args.processes, args.backend,
+                                args.heuristic)
+    return path
+
+
+def run_delta_stepping(start, goal, nodes, args, stats):
+    from algorithms.parallel_dijkstra import delta_stepping_dijkstra
+    path, _, _ = delta_stepping_dijkstra(start, goal, nodes, None, None, None, None, args.processes, args.delta,
+                                         stats=stats, backend=args.backend)
+    return path
+
+
+def run_tiled(start, goal, nodes, args, stats):
+    from algorithms.tiled_dijkstra import tiled_dijkstra
+    path, _, _ = tiled_dijkstra(start, goal, nodes, args.processes, stats=stats, backend=args.backend)
+    return path
+
+
+def run_ant_colony(start, goal, nodes, args, stats):
+    from algorithms.ant_colony import ant_colony
+    path, _, _ = ant_colony(start, goal, nodes, colonies=args.processes, stats=stats, backend=args.backend)
+    return path
+
+
+def run_reduced(start, goal, nodes, args, stats):
+    from core.reduction import reduced_dijkstra
+    return reduced_dijkstra(start, goal, nodes, stats=stats)
+
+
+def run_hierarchy(start, goal, nodes, args, stats):
+    from algorithms.contraction_hierarchy import ContractionHierarchy
+    from core.grid import wall_grid_from_nodes
+    hierarchy = ContractionHierarchy.load(args.hierarchy)
+    if not hierarchy.matches(wall_grid_from_nodes(nodes)):
+        raise ValueError(f"the hierarchy {args.hierarchy} was built for a different maze; rebuild it with "
+                         f"python -m algorithms.contraction_hierarchy --maze {args.maze} --out {args.hierarchy}")
+    by_cell = {(node.row, node.col): node for node in nodes}
+    return [by_cell[cell] for cell in hierarchy.path((start.row, start.col), (goal.row, goal.col), stats)]
+
+
+def run_oracle(start, goal, nodes, args, stats):
+    from algorithms.all_pairs import DistanceOracle
+    from core.grid import wall_grid_from_nodes
+    oracle = DistanceOracle.load(args.oracle)
+    if not oracle.matches(wall_grid_from_nodes(nodes)):
+        raise ValueError(f"the oracle tables {args.oracle} were built for a different maze; rebuild them with "
+                         f"python -m algorithms.all_pairs --maze {args.maze} --out {args.oracle}")
+    by_cell = {(node.row, node.col): node for node in nodes}
+    return [by_cell[cell] for cell in oracle.path((start.row, start.col), (goal.row, goal.col))]
+
+
+ENGINES = {
+    'dijkstra': run_dijkstra,
+    'a_star': run_a_star,
+    'parallel_a_star': run_parallel_a_star,
+    'batched_dijkstra': run_batched_dijkstra,
+    'batched_a_star': run_batched_a_star,
+    'delta_stepping': run_delta_stepping,
+    'tiled': run_tiled,
+    'ant_colony': run_ant_colony,
+    'reduced': run_reduced,
+    'oracle': run_oracle,
+    'hierarchy': run_hierarchy,
+}
+
+
+def find_node(nodes, cell, name, parser):
+    for node in nodes:
+        if (node.row, node.col) == tuple(cell):
+            if node.data == 'X':
+                parser.error(f"{name} {cell} is a wall")
+            return node
+    parser.error(f"{name} {cell} is outside the maze")
+
+
+def render_maze(maze_list, path):
+    """The maze as text with path cells other than the endpoints marked 'F'."""
+    maze_copy = [row[:] for row in maze_list]
+    for node in path[1:-1]:
+        maze_copy[node.row][node.col] = 'F'
+    return '\n'.join(''.join(row) for row in maze_copy)
+
+
+def show_window(maze_list, path):
+    """Draw the maze and the path in a turtle window; only imported when --gui is given."""
+    import turtle
+    from visuals.draw import Draw, setup_maze
+
+    wn = turtle.Screen()
+    wn.bgcolor("black")
+    wn.title("Maze Solver")
+    wn.setup(1400, 800)
+    goal_pen = Draw("G")
+    setup_maze(maze_list, Draw("W"), Draw("p"), goal_pen)
+    final_path = Draw("F")
+    for node in path[1:-1]:
+        final_path.goto(node.x, node.y)
+        final_path.stamp()
+    wn.mainloop()
+
+
+def save_image(maze_list, nodes, path, filename):
+    """Write the maze, the cells the engine reached and the path as a PNG (visuals.raster)."""
+    from visuals.raster import RasterRenderer
+
+    renderer = RasterRenderer.from_maze(maze_list)
+    renderer.mark_nodes([node for node in nodes if node.g_cost < float('inf')])
+    renderer.mark_nodes(path, explored=False)
+    renderer.save(filename)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Solve a maze without the interactive GUI.')
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='dijkstra')
+    parser.add_argument('--maze', default='maze.txt')
+    parser.add_argument('--start', type=int, nargs=2, metavar=('ROW', 'COL'), help="default: the 'p' cell")
+    parser.add_argument('--goal', type=int, nargs=2, metavar=('ROW', 'COL'), help="default: the 'G' cell")
+    parser.add_argument('--processes', type=int, default=None,
+                        help='workers for parallel engines (colonies for ant_colony)')
+    parser.add_argument('--backend', default=None, help='execution backend for parallel engines')
+    parser.add_argument('--delta', type=int, default=None, help='bucket width for delta_stepping')
+    parser.add_argument('--batch-size', type=int, default=32, help='frontier nodes per batch for the batched engines')
+    parser.add_argument('--heuristic', default='manhattan', help='heuristic field for the A* engines')
+    parser.add_argument('--oracle', default='maze_oracle', help='table prefix for the oracle engine')
+    parser.add_argument('--hierarchy', default='maze_ch.npz', help='hierarchy file for the hierarchy engine')
+    parser.add_argument('--format', choices=('text', 'json', 'maze'), default='text')
+    parser.add_argument('--stats', action='store_true', help='collect and report search statistics')
+    parser.add_argument('--gui', action='store_true', help='also draw the result in a turtle window')
+    parser.add_argument('--png', metavar='FILE', help='also save the maze, reached cells and path as a PNG')
+    parser.add_argument('--verbose', action='store_true', help='show engine progress logging')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format='%(message)s')
+
+    maze_list = read_File_Create_List(args.maze)
+    nodes = createNodes(maze_list)
+    root, goal, _ = createFriendsList(nodes)
+    start = find_node(nodes, args.start, 'start', parser) if args.start else root
+    if args.goal:
+        goal = find_node(nodes, args.goal, 'goal', parser)
+    if start is None or goal is None:
+        parser.error("the maze has no 'p' start or 'G' goal; pass --start and --goal")
+
+    stats = SearchStats() if args.stats else None
+    start_time = time.perf_counter()
+    try:
+        path = ENGINES[args.engine](start, goal, nodes, args, stats)
+    except ValueError as error:
+        parser.error(str(error))
+    elapsed = time.perf_counter() - start_time
+    cost = (len(path) - 1) * EDGE_WEIGHT if path else None
+
+    if args.format == 'json':
+        result = {
+            'engine': args.engine,
+            'start': [start.row, start.col],
+            'goal': [goal.row, goal.col],
+            'cost': cost,
+            'path': [[node.row, node.col] for node in path],
+            'seconds': elapsed,
+        }
+        if stats is not None:
+            result['stats'] = stats.as_dict()
+        print(json.dumps(result))
+    else:
+        if args.format == 'maze':
+            print(render_maze(maze_list, path))
+        if path:
+            print(f"{args.engine}: cost {cost}, {len(path)} cells, {elapsed * 1000:.2f} ms")
+            if args.format == 'text':
+                print(' '.join(f"({node.row},{node.col})" for node in path))
+        else:
+            print(f"{args.engine}: no path found ({elapsed * 1000:.2f} ms)")
+        if stats is not None:
+            print(stats.summary())
+
+    if args.png:
+        save_image(maze_list, nodes, path, args.png)
+    if args.gui:
+        show_window(maze_list, path)
+    return 0 if path else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import numpy as np
+
+from core.grid import fingerprint
+
+# Label of wall cells in the arrays returned by label_grid
+WALL_LABEL = -1
+
+
+def label_grid(walls):
+    """Label the 4-connected open regions of a wall array; returns (labels, count).
+
+    Vectorized union-find: every round hooks the larger root of each edge whose
+    endpoints disagree onto the smaller one, then compresses paths by pointer
+    jumping until every cell points at its root. Labels are renumbered
+    0..count-1 in row-major order of each region's first cell; walls get
+    WALL_LABEL.
+    """
+    height, width = walls.shape
+    open_flat = ~walls.ravel()
+    cells = np.arange(height * width)
+    # Edges between horizontally and vertically adjacent open cells
+    right = open_flat[:-1] & open_flat[1:] & ((cells[:-1] % width) != width - 1)
+    down = open_flat[:-width] & open_flat[width:]
+    u = np.concatenate([cells[:-1][right], cells[:-width][down]])
+    v = np.concatenate([cells[1:][right], cells[width:][down]])
+
+    parent = cells.copy()
+    while True:
+        root_u, root_v = parent[u], parent[v]
+        differ = root_u != root_v
+        if not differ.any():
+            break
+        low = np.minimum(root_u[differ], root_v[differ])
+        high = np.maximum(root_u[differ], root_v[differ])
+        np.minimum.at(parent, high, low)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+    labels = np.full(height * width, WALL_LABEL, dtype=np.int32)
+    roots, inverse = np.unique(parent[open_flat], return_inverse=True)
+    labels[open_flat] = inverse
+    return labels.reshape(height, width), len(roots)
+
+
+class ComponentIndex:
+    """Connected components of one maze, for O(1) reachability checks between cells."""
+
+    def __init__(self, walls):
+        self.labels, self.count = label_grid(walls)
+        self.key = fingerprint(walls)
+
+    def label(self, cell):
+        row, col = cell
+        return int(self.labels[row, col])
+
+    def connected(self, a, b):
+        """True if open cells ``a`` and ``b`` (row, col) lie in the same region."""
+        label = self.label(a)
+        return label != WALL_LABEL and label == self.label(b)
+
+    def sizes(self):
+        """Number of open cells in each component, indexed by label."""
+        return np.bincount(self.labels[self.labels != WALL_LABEL], minlength=self.count)
@@ -0,0 +1,235 @@
+"""Seeded benchmark corpus of mazes and graphs stored on disk.
+
+``build_corpus`` generates every instance from its own seed in worker
+processes and writes, into one directory:
+
+    manifest.json               every instance: kind, family, size, seed, file, checksum
+    maze-<family>-<W>x<H>-s<seed>.npy    uint8, np.packbits of the wall array
+    graph-<N>-d<density>-s<seed>.npy     int32 (E, 3) rows of (u, v, weight)
+
+Maze start and goal cells are kept in the manifest. Benchmarks load instances
+through ``Corpus`` instead of calling the generators, so every run, machine
+and commit times exactly the same inputs and no generation time is mixed
+into a trial.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+
+import numpy as np
+
+from core.executors import make_executor
+from core.grid import fingerprint, wall_grid
+from core.maze_utils import generate_maze, generate_perfect_maze
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+# Wall density of each random maze family; 'perfect' mazes come from generate_perfect_maze
+MAZE_FAMILIES = {
+    'sparse': 0.1,
+    'random': 0.2,
+    'dense': 0.3,
+    'perfect': None,
+}
+
+# Output directory, set up in each worker by init_worker
+global_directory = None
+
+
+def init_worker(directory):
+    """Initializer function to set up global variables in each worker."""
+    global global_directory
+    global_directory = directory
+
+
+def corpus_specs(maze_sizes=(), families=('random',), graph_sizes=(), graph_density=0.1, trials=1, seed=0):
+    """Instance descriptions for every maze size x family and graph size, ``trials`` seeds each."""
+    specs = []
+    for width, height in maze_sizes:
+        for family in families:
+            if family not in MAZE_FAMILIES:
+                raise ValueError(f"Unknown maze family {family!r}, expected one of {', '.join(MAZE_FAMILIES)}")
+            for trial in range(trials):
+                specs.append({'kind': 'maze', 'family': family, 'width': width, 'height': height,
+                              'seed': seed + trial, 'name': f"maze-{family}-{width}x{height}-s{seed + trial}"})
+    for nodes in graph_sizes:
+        for trial in range(trials):
+            specs.append({'kind': 'graph', 'family': 'random', 'nodes': nodes, 'density': graph_density,
+                          'seed': seed + trial, 'name': f"graph-{nodes}-d{graph_density:g}-s{seed + trial}"})
+    return specs
+
+
+def generate_instance(spec):
+    """The maze (list of rows) or (edges, nodes) graph that ``spec`` describes."""
+    if spec['kind'] == 'maze':
+        rng = random.Random(spec['seed'])
+        density = MAZE_FAMILIES[spec['family']]
+        if density is None:
+            return generate_perfect_maze(spec['width'], spec['height'], rng)
+        return generate_maze(spec['width'], spec['height'], density, rng)
+    # Imported here so maze-only corpora do not pull in the Bellman-Ford module
+    from algorithms.BellmanFord_v5 import generate_graph
+    return generate_graph(spec['nodes'], spec['density'], np.random.RandomState(spec['seed']))
+
+
+def marker_cells(maze, marker):
+    return [[row, col] for row, line in enumerate(maze) for col, character in enumerate(line) if character == marker]
+
+
+def edge_checksum(edges):
+    return hashlib.blake2b(np.ascontiguousarray(edges, dtype=np.int32).tobytes(), digest_size=16).hexdigest()
+
+
+def build_instance(spec):
+    """Generate one instance and write it to the corpus directory; runs in a worker. Returns its manifest entry."""
+    entry = dict(spec, file=spec['name'] + '.npy')
+    path = os.path.join(global_directory, entry['file'])
+    instance = generate_instance(spec)
+    if spec['kind'] == 'maze':
+        walls = wall_grid(instance)
+        np.save(path, np.packbits(walls))
+        entry.update(starts=marker_cells(instance, 'p'), goals=marker_cells(instance, 'G'),
+                     checksum=fingerprint(walls))
+    else:
+        edges, _ = instance
+        table = np.asarray(edges, dtype=np.int32).reshape(-1, 3)
+        np.save(path, table)
+        entry.update(edges=len(table), checksum=edge_checksum(table))
+    return entry
+
+
+def build_corpus(directory, specs, num_processes=None, backend=None):
+    """Generate ``specs`` in parallel into ``directory`` and write the manifest; returns the loaded Corpus."""
+    os.makedirs(directory, exist_ok=True)
+    logger.info("Generating %d instances into %s", len(specs), directory)
+    with make_executor(backend, num_processes) as executor:
+        executor.start(init_worker, (directory,))
+        entries = executor.map(build_instance, specs)
+    manifest = {'format': FORMAT_VERSION, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'instances': entries}
+    with open(os.path.join(directory, MANIFEST), 'w') as file:
+        json.dump(manifest, file, indent=1)
+    return Corpus(directory, manifest)
+
+
+class Corpus:
+    """Read access to a corpus directory written by ``build_corpus``."""
+
+    def __init__(self, directory, manifest):
+        if manifest.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported corpus format {manifest.get('format')!r} in {directory}")
+        self.directory = directory
+        self.instances = manifest['instances']
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, MANIFEST)) as file:
+            return cls(directory, json.load(file))
+
+    def __len__(self):
+        return len(self.instances)
+
+    def select(self, kind=None, family=None, width=None, height=None, nodes=None):
+        """Manifest entries matching every given field, in manifest (seed) order."""
+        wanted = {'kind': kind, 'family': family, 'width': width, 'height': height, 'nodes': nodes}
+        return [entry for entry in self.instances
+                if all(value is None or entry.get(key) == value for key, value in wanted.items())]
+
+    def _load(self, entry):
+        return np.load(os.path.join(self.directory, entry['file']))
+
+    def walls(self, entry):
+        """Boolean wall array of a maze entry."""
+        height, width = entry['height'], entry['width']
+        return np.unpackbits(self._load(entry), count=height * width).reshape(height, width).astype(bool)
+
+    def maze(self, entry):
+        """A maze entry as the list of rows that read_File_Create_List returns."""
+        maze = [['X' if wall else 'b' for wall in row] for row in self.walls(entry).tolist()]
+        for row, col in entry['starts']:
+            maze[row][col] = 'p'
+        for row, col in entry['goals']:
+            maze[row][col] = 'G'
+        return maze
+
+    def graph(self, entry):
+        """A graph entry as the (edges, nodes) pair that generate_graph returns."""
+        return [tuple(edge) for edge in self._load(entry).tolist()], entry['nodes']
+
+    def verify(self):
+        """Names of instances whose file no longer matches its manifest checksum."""
+        mismatched = []
+        for entry in self.instances:
+            if entry['kind'] == 'maze':
+                checksum = fingerprint(self.walls(entry))
+            else:
+                checksum = edge_checksum(self._load(entry))
+            if checksum != entry['checksum']:
+                mismatched.append(entry['name'])
+        return mismatched
+
+
+def trial_mazes(width, height, trials, wall_density=0.2, seed=0, corpus=None, family='random'):
+    """Mazes for ``trials`` benchmark runs at one size, replayed from ``corpus`` or else generated from seeds.
+
+    Seeded generation gives the same mazes that build_corpus writes for the
+    'random' family with the same density and seed.
+    """
+    if corpus is None:
+        return [generate_maze(width, height, wall_density, random.Random(seed + trial)) for trial in range(trials)]
+    entries = corpus.select(kind='maze', family=family, width=width, height=height)
+    if not entries:
+        raise ValueError(f"Corpus {corpus.directory} has no {family} {width}x{height} mazes")
+    return [corpus.maze(entry) for entry in entries[:trials]]
+
+
+def trial_graphs(nodes, trials, density=0.1, seed=0, corpus=None):
+    """(edges, nodes) graphs for ``trials`` benchmark runs, replayed from ``corpus`` or else generated from seeds."""
+    if corpus is None:
+        return [generate_instance({'kind': 'graph', 'nodes': nodes, 'density': density, 'seed': seed + trial})
+                for trial in range(trials)]
+    entries = [entry for entry in corpus.select(kind='graph', nodes=nodes) if entry['density'] == density]
+    if not entries:
+        raise ValueError(f"Corpus {corpus.directory} has no {nodes}-node graphs of density {density:g}")
+    return [corpus.graph(entry) for entry in entries[:trials]]
+
+
+def parse_sizes(text):
+    """'20,40x30' -> [(20, 20), (40, 30)]."""
+    sizes = []
+    for item in text.split(','):
+        width, _, height = item.partition('x')
+        sizes.append((int(width), int(height or width)))
+    return sizes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a seeded benchmark corpus of mazes and graphs.')
+    parser.add_argument('--out', default='corpus')
+    parser.add_argument('--sizes', default='10,20,30,40,50,60,80', help='maze sizes, e.g. 20,40x30')
+    parser.add_argument('--families', default='random', help=f"comma separated, from {', '.join(MAZE_FAMILIES)}")
+    parser.add_argument('--graphs', default='400,900,1600', help='graph node counts (empty for none)')
+    parser.add_argument('--graph-density', type=float, default=0.1)
+    parser.add_argument('--trials', type=int, default=3, help='seeds per size and family')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--backend', default=None)
+    parser.add_argument('--verify', action='store_true', help='check an existing corpus against its manifest')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    if args.verify:
+        mismatched = Corpus.load(args.out).verify()
+        print('\n'.join(mismatched) if mismatched else "All instances match the manifest")
+        raise SystemExit(1 if mismatched else 0)
+    specs = corpus_specs(parse_sizes(args.sizes) if args.sizes else (), args.families.split(','),
+                         [int(n) for n in args.graphs.split(',')] if args.graphs else (), args.graph_density,
+                         args.trials, args.seed)
+    start_time = time.time()
+    corpus = build_corpus(args.out, specs, args.processes, args.backend)
+    print(f"Wrote {len(corpus)} instances to {args.out} in {time.time() - start_time:.2f}s")
@@ -0,0 +1,210 @@
+import multiprocessing as mp
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+BACKENDS = ('serial', 'threads', 'processes', 'shm-processes')
+DEFAULT_BACKEND = 'shm-processes'
+
+# Callables run with the executor just before a process backend shuts its workers down
+_close_hooks = []
+
+
+def add_close_hook(hook):
+    """Call ``hook(executor)`` whenever a process executor is about to stop its workers."""
+    _close_hooks.append(hook)
+
+
+def remove_close_hook(hook):
+    _close_hooks.remove(hook)
+
+
+def gil_enabled():
+    """False on free-threaded builds (python3.13t and later) running without the GIL."""
+    check = getattr(sys, '_is_gil_enabled', None)
+    return True if check is None else check()
+
+
+class LocalArray(list):
+    """In-process array used by the serial and thread backends.
+
+    It is a plain list, so indexing costs nothing extra, plus the ``get_lock``
+    method of ``multiprocessing.Array`` so worker code is backend agnostic.
+    """
+
+    def __init__(self, values):
+        super().__init__(values)
+        self._lock = threading.Lock()
+
+    def get_lock(self):
+        return self._lock
+
+
+class ManagedArray:
+    """Array held by a ``multiprocessing.Manager`` server; every access is a round trip."""
+
+    def __init__(self, manager, values):
+        self._list = manager.list(values)
+        self._lock = manager.Lock()
+
+    def get_lock(self):
+        return self._lock
+
+    def __getitem__(self, index):
+        return self._list[index]
+
+    def __setitem__(self, index, value):
+        self._list[index] = value
+
+    def __len__(self):
+        return len(self._list)
+
+
+class Executor:
+    """Common interface of the execution backends used by the parallel engines.
+
+    Usage mirrors ``multiprocessing.Pool`` with an initializer: allocate shared
+    arrays with ``array`` first, hand them to ``start`` through ``initargs``
+    (worker functions keep them in module globals), then ``map`` tasks. Arrays
+    support indexing, slicing and ``get_lock()`` on every backend.
+    """
+
+    name = None
+    # False when tasks run one after another, so a task must never wait on another
+    concurrent = True
+
+    def __init__(self, num_workers=None):
+        self.num_workers = max(1, num_workers or mp.cpu_count())
+        self._started = False
+
+    def array(self, typecode, values):
+        return LocalArray(values)
+
+    def start(self, initializer=None, initargs=()):
+        if initializer is not None:
+            initializer(*initargs)
+        self._started = True
+        return self
+
+    def map(self, fn, items):
+        raise NotImplementedError
+
+    def worker_processes(self):
+        """(role, pid) of every helper process; empty when tasks run in the calling process."""
+        return []
+
+    def close(self):
+        self._started = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(num_workers={self.num_workers})"
+
+
+class SerialExecutor(Executor):
+    """Runs every task in the calling thread; the baseline for overhead measurements."""
+
+    name = 'serial'
+    concurrent = False
+
+    def __init__(self, num_workers=None):
+        super().__init__(1)
+
+    def map(self, fn, items):
+        return [fn(item) for item in items]
+
+
+class ThreadExecutor(Executor):
+    """Thread pool sharing the caller's memory, so nothing is pickled.
+
+    The initializer runs once in the calling process because all threads see
+    the same module globals. Only truly parallel on free-threaded builds.
+    """
+
+    name = 'threads'
+
+    def start(self, initializer=None, initargs=()):
+        super().start(initializer, initargs)
+        self._pool = ThreadPoolExecutor(max_workers=self.num_workers)
+        return self
+
+    def map(self, fn, items):
+        return list(self._pool.map(fn, items))
+
+    def close(self):
+        if self._started:
+            self._pool.shutdown()
+        super().close()
+
+
+class ProcessExecutor(Executor):
+    """Process pool whose shared arrays live in a ``Manager`` server process."""
+
+    name = 'processes'
+
+    def __init__(self, num_workers=None):
+        super().__init__(num_workers)
+        self._manager = None
+
+    def array(self, typecode, values):
+        if self._manager is None:
+            self._manager = mp.Manager()
+        return ManagedArray(self._manager, values)
+
+    def start(self, initializer=None, initargs=()):
+        self._pool = mp.Pool(processes=self.num_workers, initializer=initializer, initargs=initargs)
+        self._started = True
+        return self
+
+    def map(self, fn, items):
+        return self._pool.map(fn, items)
+
+    def worker_processes(self):
+        processes = [('worker', process.pid) for process in self._pool._pool] if self._started else []
+        if self._manager is not None:
+            processes.append(('manager', self._manager._process.pid))
+        return processes
+
+    def close(self):
+        for hook in list(_close_hooks):
+            hook(self)
+        if self._started:
+            self._pool.close()
+            self._pool.join()
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+        super().close()
+
+
+class SharedMemoryExecutor(ProcessExecutor):
+    """Process pool whose shared arrays are ``multiprocessing.Array`` blocks of shared memory."""
+
+    name = 'shm-processes'
+
+    def array(self, typecode, values):
+        return mp.Array(typecode, values)
+
+
+_EXECUTORS = {
+    'serial': SerialExecutor,
+    'threads': ThreadExecutor,
+    'processes': ProcessExecutor,
+    'shm-processes': SharedMemoryExecutor,
+}
+
+
+def make_executor(backend=None, num_workers=None):
+    """Create an (unstarted) executor for one of ``BACKENDS``."""
+    backend = backend or DEFAULT_BACKEND
+    try:
+        executor_class = _EXECUTORS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}") from None
+    return executor_class(num_workers)
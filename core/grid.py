@@ -0,0 +1,64 @@
+import hashlib
+
+import numpy as np
+
+EDGE_WEIGHT = 20  # Cost of one move between neighboring cells, as used by every engine
+
+# Row/column offsets of the four moves, in the order used for direction codes
+DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+
+def wall_grid(maze):
+    """Boolean array that is True on walls, from a maze as returned by read_File_Create_List.
+
+    Ragged rows are padded with walls.
+    """
+    height = len(maze)
+    width = max((len(row) for row in maze), default=0)
+    walls = np.ones((height, width), dtype=bool)
+    for y, row in enumerate(maze):
+        walls[y, :len(row)] = np.frombuffer(''.join(row).encode(), dtype=np.uint8) == ord('X')
+    return walls
+
+
+def open_cells(walls):
+    """(N, 2) int32 array of the open cells in row-major order; row i is cell index i."""
+    return np.argwhere(~walls).astype(np.int32)
+
+
+def wall_grid_from_nodes(nodes):
+    """Boolean wall array rebuilt from the Nodes of createNodes; missing cells count as walls."""
+    rows = np.fromiter((node.row for node in nodes), dtype=np.int64, count=len(nodes))
+    cols = np.fromiter((node.col for node in nodes), dtype=np.int64, count=len(nodes))
+    is_wall = np.fromiter((node.data == 'X' for node in nodes), dtype=bool, count=len(nodes))
+    walls = np.ones((rows.max() + 1, cols.max() + 1), dtype=bool)
+    walls[rows, cols] = is_wall
+    return walls
+
+
+def neighbor_table(nodes, edge_cost=None):
+    """(neighbors, weights) arrays of shape (cells, 4) over Nodes in ``node.friend`` order; sets ``node.id``.
+
+    -1 marks a missing neighbor and walls get none. ``edge_cost(node,
+    neighbor)`` gives edge weights for weighted mazes; by default every move
+    costs EDGE_WEIGHT.
+    """
+    for index, node in enumerate(nodes):
+        node.id = index
+    neighbors = np.full((len(nodes), 4), -1, dtype=np.int64)
+    weights = np.full((len(nodes), 4), np.inf)
+    for node in nodes:
+        if node.data == 'X':
+            continue
+        for slot, neighbor in enumerate(node.friend[:4]):
+            neighbors[node.id, slot] = neighbor.id
+            weights[node.id, slot] = EDGE_WEIGHT if edge_cost is None else edge_cost(node, neighbor)
+    return neighbors, weights
+
+
+def fingerprint(walls):
+    """Stable key identifying a wall layout, for caches shared across queries."""
+    digest = hashlib.blake2b(np.packbits(walls).tobytes(), digest_size=16)
+    digest.update(np.asarray(walls.shape, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
@@ -0,0 +1,168 @@
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from core import kernels
+from core.grid import EDGE_WEIGHT, fingerprint
+
+KINDS = ('euclidean', 'manhattan', 'true', 'landmarks')
+DEFAULT_LANDMARKS = 4
+
+
+def normalize_goals(goals):
+    """Accept one (row, col) cell or an iterable of cells; return a sorted tuple of cells."""
+    goals = list(goals)
+    if len(goals) == 2 and all(isinstance(value, (int, np.integer)) for value in goals):
+        goals = [goals]
+    return tuple(sorted((int(row), int(col)) for row, col in goals))
+
+
+def distance_field(walls, sources):
+    """Exact move-cost distance from the nearest of ``sources`` to every cell (inf if unreachable).
+
+    Breadth-first search over a flat copy of the grid; every move costs EDGE_WEIGHT.
+    """
+    height, width = walls.shape
+    if kernels.ACCELERATED:
+        open_sources = [row * width + col for row, col in sources if not walls[row, col]]
+        depth = kernels.bfs(kernels.csr_from_walls(walls), open_sources).reshape(height, width)
+        return np.where(depth >= 0, depth * float(EDGE_WEIGHT), np.inf)
+    open_cells = (~walls).ravel().tolist()
+    depth = [-1] * (height * width)
+    queue = deque()
+    for row, col in sources:
+        index = row * width + col
+        if open_cells[index] and depth[index] < 0:
+            depth[index] = 0
+            queue.append(index)
+    while queue:
+        index = queue.popleft()
+        next_depth = depth[index] + 1
+        col = index % width
+        for neighbor in (index - width, index + width):
+            if 0 <= neighbor < len(depth) and open_cells[neighbor] and depth[neighbor] < 0:
+                depth[neighbor] = next_depth
+                queue.append(neighbor)
+        if col > 0 and open_cells[index - 1] and depth[index - 1] < 0:
+            depth[index - 1] = next_depth
+            queue.append(index - 1)
+        if col < width - 1 and open_cells[index + 1] and depth[index + 1] < 0:
+            depth[index + 1] = next_depth
+            queue.append(index + 1)
+    field = np.asarray(depth, dtype=np.float64).reshape(height, width) * EDGE_WEIGHT
+    field[field < 0] = np.inf
+    return field
+
+
+def select_landmarks(walls, count):
+    """Pick ``count`` open cells spread far apart (farthest-point selection)."""
+    open_rows, open_cols = np.nonzero(~walls)
+    if len(open_rows) == 0:
+        return []
+    landmarks = []
+    nearest = distance_field(walls, [(int(open_rows[0]), int(open_cols[0]))])
+    for _ in range(count):
+        reachable = np.where(np.isfinite(nearest), nearest, -1)
+        row, col = np.unravel_index(int(np.argmax(reachable)), walls.shape)
+        if reachable[row, col] <= 0 and landmarks:
+            break
+        landmarks.append((int(row), int(col)))
+        nearest = np.minimum(nearest, distance_field(walls, [landmarks[-1]]))
+    return landmarks
+
+
+def geometric_field(shape, goals, kind):
+    """Straight-line or Manhattan distance to the nearest goal, in move costs, in one vectorized pass per goal."""
+    rows, cols = np.ogrid[:shape[0], :shape[1]]
+    field = np.full(shape, np.inf)
+    for goal_row, goal_col in goals:
+        if kind == 'euclidean':
+            distance = np.hypot(rows - goal_row, cols - goal_col)
+        else:
+            distance = np.abs(rows - goal_row) + np.abs(cols - goal_col)
+        np.minimum(field, distance * EDGE_WEIGHT, out=field)
+    return field
+
+
+def landmark_field(landmark_tables, goals):
+    """ALT lower bound: max over landmarks of |d(L, goal) - d(L, v)|, minimized over goals."""
+    field = np.full(landmark_tables[0].shape, np.inf)
+    for goal_row, goal_col in goals:
+        bound = np.zeros(field.shape)
+        for table in landmark_tables:
+            to_goal = table[goal_row, goal_col]
+            if not np.isfinite(to_goal):
+                continue
+            difference = np.abs(table - to_goal)
+            difference[~np.isfinite(difference)] = 0.0
+            np.maximum(bound, difference, out=bound)
+        np.minimum(field, bound, out=field)
+    return field
+
+
+class HeuristicCache:
+    """LRU cache of heuristic fields keyed by (maze fingerprint, goals, kind).
+
+    Fields are read-only float arrays in move-cost units, so one computation is
+    shared by every query toward the same goal. Landmark distance tables are
+    cached per maze and reused for every goal.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._fields = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key, compute):
+        field = self._fields.get(key)
+        if field is not None:
+            self._fields.move_to_end(key)
+            self.hits += 1
+            return field
+        self.misses += 1
+        field = compute()
+        field.flags.writeable = False
+        self._fields[key] = field
+        while len(self._fields) > self.maxsize:
+            self._fields.popitem(last=False)
+        return field
+
+    def get(self, walls, goals, kind='manhattan', maze_key=None, landmarks=DEFAULT_LANDMARKS):
+        """Return the heuristic field of ``kind`` toward the nearest of ``goals``.
+
+        Pass ``maze_key`` (e.g. from core.grid.fingerprint) to skip hashing the
+        wall array on every call.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown heuristic {kind!r}, expected one of {', '.join(KINDS)}")
+        goals = normalize_goals(goals)
+        maze_key = maze_key or fingerprint(walls)
+        if kind == 'true':
+            compute = lambda: distance_field(walls, goals)
+        elif kind == 'landmarks':
+            compute = lambda: landmark_field(self._landmark_tables(walls, maze_key, landmarks), goals)
+        else:
+            compute = lambda: geometric_field(walls.shape, goals, kind)
+        return self._lookup((maze_key, goals, kind), compute)
+
+    def _landmark_tables(self, walls, maze_key, count):
+        cells = self._lookup((maze_key, 'landmark-cells', count),
+                             lambda: np.asarray(select_landmarks(walls, count), dtype=np.int64).reshape(-1, 2))
+        return [self._lookup((maze_key, 'landmark', (int(row), int(col))),
+                             lambda row=row, col=col: distance_field(walls, [(int(row), int(col))]))
+                for row, col in cells]
+
+    def clear(self):
+        self._fields.clear()
+
+    def __len__(self):
+        return len(self._fields)
+
+
+default_cache = HeuristicCache()
+
+
+def heuristic_field(walls, goals, kind='manhattan', maze_key=None, cache=None):
+    """Heuristic toward ``goals`` for every cell, served from ``default_cache`` unless another cache is given."""
+    return (cache or default_cache).get(walls, goals, kind, maze_key)
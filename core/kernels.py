@@ -0,0 +1,309 @@
+"""Search inner loops over flat CSR arrays, compiled with Numba when it is installed.
+
+A graph is three arrays: ``indptr`` (n + 1 offsets), ``indices`` (neighbor ids)
+and ``weights`` (edge weights), so the edges of vertex ``u`` are
+``indices[indptr[u]:indptr[u + 1]]``. The kernels below are written in the
+subset of Python that Numba compiles; with Numba they run as machine code on
+NumPy arrays, and without it the same functions run as plain Python on lists
+(faster than NumPy scalar indexing). The engines only call them when
+``ACCELERATED`` is true and keep their own pure Python loops otherwise.
+
+Set ``PDC_KERNELS=python`` to disable compilation, and run
+``python -m core.kernels --verify`` to check that the kernels return exactly
+the costs of the reference engines.
+"""
+import argparse
+import heapq
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from core.grid import EDGE_WEIGHT
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+ACCELERATED = numba is not None and os.environ.get('PDC_KERNELS', 'auto') != 'python'
+INF = float('inf')
+
+CSRGraph = namedtuple('CSRGraph', 'indptr indices weights')
+
+
+def _jit(function):
+    return numba.njit(cache=True, nogil=True)(function) if ACCELERATED else function
+
+
+def _as_input(array):
+    """Kernel argument: the array itself when compiled, a list for the Python fallback."""
+    return array if ACCELERATED else array.tolist()
+
+
+def _buffer(size, value, dtype):
+    return np.full(size, value, dtype=dtype) if ACCELERATED else [value] * size
+
+
+@_jit
+def _dijkstra(indptr, indices, weights, sources, target, dist, parent):
+    if len(sources) == 0:
+        return 0
+    heap = [(0.0, sources[0])]
+    for i in range(len(sources)):
+        dist[sources[i]] = 0.0
+        if i > 0:
+            heapq.heappush(heap, (0.0, sources[i]))
+    settled = 0
+    while len(heap) > 0:
+        cost, u = heapq.heappop(heap)
+        if cost > dist[u]:
+            continue
+        settled += 1
+        if u == target:
+            break
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            new_cost = cost + weights[k]
+            if new_cost < dist[v]:
+                dist[v] = new_cost
+                parent[v] = u
+                heapq.heappush(heap, (new_cost, v))
+    return settled
+
+
+@_jit
+def _bfs(indptr, indices, sources, depth, queue):
+    tail = 0
+    for i in range(len(sources)):
+        if depth[sources[i]] < 0:
+            depth[sources[i]] = 0
+            queue[tail] = sources[i]
+            tail += 1
+    head = 0
+    while head < tail:
+        u = queue[head]
+        head += 1
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if depth[v] < 0:
+                depth[v] = depth[u] + 1
+                queue[tail] = v
+                tail += 1
+    return tail
+
+
+@_jit
+def _bellman_ford(edge_u, edge_v, edge_w, count, dist):
+    rounds = 0
+    relaxations = 0
+    for _ in range(count - 1):
+        rounds += 1
+        updated = False
+        for k in range(len(edge_u)):
+            u = edge_u[k]
+            if dist[u] != INF and dist[u] + edge_w[k] < dist[edge_v[k]]:
+                dist[edge_v[k]] = dist[u] + edge_w[k]
+                updated = True
+                relaxations += 1
+        if not updated:
+            break
+    negative_cycle = False
+    for k in range(len(edge_u)):
+        u = edge_u[k]
+        if dist[u] != INF and dist[u] + edge_w[k] < dist[edge_v[k]]:
+            negative_cycle = True
+            break
+    return rounds, relaxations, negative_cycle
+
+
+@_jit
+def _relax_bucket(indptr, indices, weights, bucket, bucket_costs, best, best_parent, touched):
+    count = 0
+    for i in range(len(bucket)):
+        u = bucket[i]
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            new_cost = bucket_costs[i] + weights[k]
+            if new_cost < best[v]:
+                if best[v] == INF:
+                    touched[count] = v
+                    count += 1
+                best[v] = new_cost
+                best_parent[v] = u
+    return count
+
+
+def csr_from_adjacency(adjacency, weight=EDGE_WEIGHT):
+    """CSRGraph from neighbor ids per vertex (``build_adjacency`` in the delta-stepping engine)."""
+    degrees = np.fromiter((len(neighbors) for neighbors in adjacency), dtype=np.int64, count=len(adjacency))
+    indptr = np.zeros(len(adjacency) + 1, dtype=np.int64)
+    np.cumsum(degrees, out=indptr[1:])
+    indices = np.fromiter((v for neighbors in adjacency for v in neighbors), dtype=np.int64, count=int(indptr[-1]))
+    return CSRGraph(indptr, indices, np.full(len(indices), float(weight)))
+
+
+def csr_from_nodes(nodes, weight=EDGE_WEIGHT):
+    """CSRGraph over Nodes, with ``node.id`` set to each node's vertex id; walls get no edges."""
+    for index, node in enumerate(nodes):
+        node.id = index
+    return csr_from_adjacency([[] if node.data == 'X' else [neighbor.id for neighbor in node.friend
+                                                           if neighbor.data != 'X'] for node in nodes], weight)
+
+
+def csr_from_walls(walls, weight=EDGE_WEIGHT):
+    """CSRGraph whose vertex ``row * width + col`` is a cell of the wall array; walls get no edges."""
+    height, width = walls.shape
+    open_flat = ~walls.ravel()
+    cells = np.arange(height * width)
+    row, col = np.divmod(cells, width)
+    targets = []
+    for d_row, d_col in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        inside = (row + d_row >= 0) & (row + d_row < height) & (col + d_col >= 0) & (col + d_col < width)
+        neighbor = np.where(inside, cells + d_row * width + d_col, 0)
+        targets.append(np.where(inside & open_flat & open_flat[neighbor], neighbor, -1))
+    table = np.stack(targets, axis=1)
+    valid = table >= 0
+    indptr = np.zeros(height * width + 1, dtype=np.int64)
+    np.cumsum(valid.sum(axis=1), out=indptr[1:])
+    indices = table[valid].astype(np.int64)
+    return CSRGraph(indptr, indices, np.full(len(indices), float(weight)))
+
+
+def csr_from_edges(edge_u, edge_v, weights, count):
+    """CSRGraph of a directed edge list given as arrays (the Bellman-Ford ``(u, v, w)`` graphs)."""
+    order = np.argsort(edge_u, kind='stable')
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edge_u, minlength=count), out=indptr[1:])
+    return CSRGraph(indptr, np.asarray(edge_v, dtype=np.int64)[order], np.asarray(weights, dtype=np.float64)[order])
+
+
+def dijkstra(graph, sources, target=-1):
+    """(dist, parent, settled) from the nearest of ``sources``; stops once ``target`` is settled.
+
+    dist is inf and parent -1 for vertices never reached.
+    """
+    count = len(graph.indptr) - 1
+    dist = _buffer(count, INF, np.float64)
+    parent = _buffer(count, -1, np.int64)
+    settled = _dijkstra(_as_input(graph.indptr), _as_input(graph.indices), _as_input(graph.weights),
+                        _as_input(np.asarray(sources, dtype=np.int64)), target, dist, parent)
+    return np.asarray(dist, dtype=np.float64), np.asarray(parent, dtype=np.int64), settled
+
+
+def bfs(graph, sources):
+    """Hop count from the nearest of ``sources`` to every vertex, -1 if unreachable."""
+    count = len(graph.indptr) - 1
+    depth = _buffer(count, -1, np.int64)
+    _bfs(_as_input(graph.indptr), _as_input(graph.indices), _as_input(np.asarray(sources, dtype=np.int64)),
+         depth, _buffer(count, 0, np.int64))
+    return np.asarray(depth, dtype=np.int64)
+
+
+def bellman_ford(graph, nodes, source=0):
+    """Bellman-Ford over an (u, v, w) edge list; returns (distances, rounds, relaxations).
+
+    Edges are relaxed in list order, so rounds and relaxations match the
+    serial engine. Raises ValueError on a negative weight cycle.
+    """
+    table = np.asarray(graph, dtype=np.float64).reshape(-1, 3)
+    dist = _buffer(nodes, INF, np.float64)
+    dist[source] = 0.0
+    rounds, relaxations, negative_cycle = _bellman_ford(
+        _as_input(table[:, 0].astype(np.int64)), _as_input(table[:, 1].astype(np.int64)), _as_input(table[:, 2]),
+        nodes, dist)
+    if negative_cycle:
+        raise ValueError("Graph contains negative weight cycle")
+    return dist.tolist() if ACCELERATED else dist, rounds, relaxations
+
+
+class BucketRelaxer:
+    """Per-worker scratch space for relaxing delta-stepping buckets with ``_relax_bucket``."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        count = len(graph.indptr) - 1
+        self._inputs = (_as_input(graph.indptr), _as_input(graph.indices), _as_input(graph.weights))
+        self._best = _buffer(count, INF, np.float64)
+        self._parent = _buffer(count, -1, np.int64)
+        self._touched = _buffer(count, 0, np.int64)
+
+    def relax(self, bucket, bucket_costs):
+        """{neighbor: (best new cost, parent)} over every edge leaving ``bucket``."""
+        count = _relax_bucket(*self._inputs, _as_input(np.asarray(bucket, dtype=np.int64)),
+                              _as_input(np.asarray(bucket_costs, dtype=np.float64)), self._best, self._parent,
+                              self._touched)
+        updates = {}
+        for i in range(count):
+            v = int(self._touched[i])
+            updates[v] = (float(self._best[v]), int(self._parent[v]))
+            self._best[v] = INF
+        return updates
+
+
+def verify(sizes=(20, 40, 80), graph_sizes=(50, 200), seed=0):
+    """Compare every kernel with the reference engines on seeded instances; returns a list of mismatches."""
+    import random
+    from algorithms.BellmanFord_v5 import bellman_ford_steps, generate_graph
+    from algorithms.dijkstra import dijkstra_steps
+    from algorithms.parallel_dijkstra import delta_stepping_steps
+    from core.grid import wall_grid
+    from core.maze_utils import createNodes, createFriendsList, generate_maze
+    from core.heuristics import distance_field
+    from core.stepper import SearchStepper
+
+    mismatches = []
+    for size in sizes:
+        maze = generate_maze(size, size, 0.25, random.Random(seed + size))
+        nodes = createNodes(maze)
+        start, goal, _ = createFriendsList(nodes)
+        reference = SearchStepper(dijkstra_steps(start, goal, nodes)).run_to_completion()
+        dist, _, _ = dijkstra(csr_from_nodes(nodes), [start.id], goal.id)
+        expected = (len(reference) - 1) * EDGE_WEIGHT if reference else INF
+        if dist[goal.id] != expected:
+            mismatches.append(f"dijkstra {size}x{size}: {dist[goal.id]} != {expected}")
+
+        walls = wall_grid(maze)
+        field = distance_field(walls, [(start.row, start.col)]).ravel()
+        depth = bfs(csr_from_walls(walls), [start.row * walls.shape[1] + start.col])
+        hops = np.where(depth >= 0, depth * float(EDGE_WEIGHT), INF)
+        if not np.array_equal(hops, field):
+            mismatches.append(f"bfs {size}x{size}: {int((hops != field).sum())} cells differ")
+
+        # Delta-stepping (bucket kernel) toward the farthest cell settles every reachable cell
+        rows = np.array([node.row for node in nodes])
+        cols = np.array([node.col for node in nodes])
+        expected = field.reshape(walls.shape)[rows, cols]
+        farthest = nodes[int(np.where(np.isfinite(expected), expected, -1).argmax())]
+        for delta in (EDGE_WEIGHT, 3 * EDGE_WEIGHT):
+            path = SearchStepper(delta_stepping_steps(start, farthest, nodes, 2, delta, 8,
+                                                      backend='serial')).run_to_completion()
+            costs = np.array([node.g_cost for node in nodes], dtype=np.float64)
+            goal_cost = (len(path) - 1) * EDGE_WEIGHT if path else INF
+            if goal_cost != expected[farthest.id]:
+                mismatches.append(f"delta_stepping {size}x{size} delta={delta}: goal cost {goal_cost} != "
+                                  f"{expected[farthest.id]}")
+            if not np.array_equal(costs, expected):
+                mismatches.append(f"delta_stepping {size}x{size} delta={delta}: "
+                                  f"{int((costs != expected).sum())} distances differ")
+
+    for count in graph_sizes:
+        edges, count = generate_graph(count, 0.05, np.random.RandomState(seed + count))
+        expected = SearchStepper(bellman_ford_steps(edges, count)).run_to_completion()
+        distances, _, _ = bellman_ford(edges, count)
+        if distances != [float(value) for value in expected]:
+            mismatches.append(f"bellman_ford {count} nodes: distances differ")
+    return mismatches
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check the search kernels against the reference engines.')
+    parser.add_argument('--verify', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Kernels: {'numba ' + numba.__version__ if ACCELERATED else 'pure Python (Numba not in use)'}")
+    if args.verify:
+        mismatches = verify(seed=args.seed)
+        print('\n'.join(mismatches) if mismatches else "All kernels match the reference engines")
+        raise SystemExit(1 if mismatches else 0)
@@ -1,17 +1,19 @@
 from core.node import Node
 import random
 
-def generate_maze(width, height, wall_density=0.2):
+def generate_maze(width, height, wall_density=0.2, rng=None):
     """Generate a random maze of specified dimensions.
     
     Args:
         width: Width of the maze
         height: Height of the maze
         wall_density: Probability of a cell being a wall (0.0 to 1.0)
+        rng: ``random.Random`` to draw from (default: the global ``random`` state)
         
     Returns:
         2D list representing the maze
     """
+    rng = rng or random
     maze = []
     
     # Generate random maze with specified wall density
@@ -29,7 +31,7 @@ def generate_maze(width, height, wall_density=0.2):
                 row.append('G')
             # Random walls or open spaces elsewhere
             else:
-                if random.random() < wall_density:
+                if rng.random() < wall_density:
                     row.append('X')
                 else:
                     row.append('b')
@@ -41,6 +43,32 @@ def generate_maze(width, height, wall_density=0.2):
     
     return maze
 
+def generate_perfect_maze(width, height, rng=None):
+    """Generate a maze with exactly one route between any two open cells (randomized depth-first search).
+
+    Rooms sit on odd rows and columns and are joined by carving the wall
+    between them, which gives long corridors and dead ends instead of open
+    areas. The start is the top-left room and the goal the bottom-right one.
+    """
+    rng = rng or random
+    maze = [['X'] * width for _ in range(height)]
+    maze[1][1] = 'b'
+    stack = [(1, 1)]
+    while stack:
+        row, col = stack[-1]
+        options = [(row + dr, col + dc) for dr, dc in ((0, 2), (0, -2), (2, 0), (-2, 0))
+                   if 0 < row + dr < height - 1 and 0 < col + dc < width - 1 and maze[row + dr][col + dc] == 'X']
+        if not options:
+            stack.pop()
+            continue
+        n_row, n_col = rng.choice(options)
+        maze[(row + n_row) // 2][(col + n_col) // 2] = 'b'
+        maze[n_row][n_col] = 'b'
+        stack.append((n_row, n_col))
+    maze[1][1] = 'p'
+    maze[2 * ((height - 1) // 2) - 1][2 * ((width - 1) // 2) - 1] = 'G'
+    return maze
+
 def ensure_path_exists(maze, start_x, start_y, goal_x, goal_y):
     """Ensure there is a valid path from start to goal."""
     # Simple solution: create a corridor from start to goal
@@ -83,6 +111,51 @@ def createNodes(maze):
     return listOfNodes
 
 
+def find_cells(nodes, marker):
+    """All nodes marked ``marker`` (e.g. every 'p' start or 'G' exit), in row-major order.
+
+    createFriendsList only returns the last start and goal it sees; use this for
+    the multi-source / multi-goal engines.
+    """
+    return [node for node in nodes if node.data == marker]
+
+
+def label_components(nodes):
+    """Flood-fill the open regions of a maze whose friend lists are built; sets ``node.component``.
+
+    Walls keep component None. Returns the number of components.
+    """
+    for node in nodes:
+        node.component = None
+    count = 0
+    for node in nodes:
+        if node.data == "X" or node.component is not None:
+            continue
+        node.component = count
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for neighbor in current.friend:
+                if neighbor.component is None:
+                    neighbor.component = count
+                    stack.append(neighbor)
+        count += 1
+    return count
+
+
+def same_component(a, b):
+    """False only when both nodes are labeled and lie in different regions, i.e. no path can exist."""
+    return a.component is None or b.component is None or a.component == b.component
+
+
+def reachable_goals(sources, goals):
+    """The goals that share a component with at least one source (all of them if unlabeled)."""
+    components = {source.component for source in sources}
+    if None in components:
+        return list(goals)
+    return [goal for goal in goals if goal.component is None or goal.component in components]
+
+
 def createFriendsList(nodes):
     root, goal = None, None
     edges = []
@@ -99,4 +172,6 @@ def createFriendsList(nodes):
             if neighbor and neighbor.data != "X":  # <--- KEY CHANGE HERE
                 node.friend.append(neighbor)
                 edges.append((node, neighbor, 20))  # Edge weight = 20
+    # Label regions once so engines can reject unreachable goals before searching
+    label_components(nodes)
     return root, goal, edges
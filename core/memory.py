@@ -0,0 +1,71 @@
+"""Peak memory of this process and of executor worker processes.
+
+Peaks come from ``VmHWM`` in ``/proc/<pid>/status`` on Linux. Elsewhere only
+this process can be measured, through ``resource.getrusage``.
+"""
+import sys
+
+from core.executors import add_close_hook, remove_close_hook
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _status_bytes(pid, field):
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss(pid=None):
+    """Peak resident set size in bytes of ``pid`` (default: this process), or None if unknown."""
+    value = _status_bytes(pid or 'self', 'VmHWM')
+    if value is None and pid is None and resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        value = usage if sys.platform == 'darwin' else usage * 1024
+    return value
+
+
+def current_rss(pid=None):
+    """Resident set size in bytes of ``pid`` (default: this process), or None if unknown."""
+    return _status_bytes(pid or 'self', 'VmRSS')
+
+
+class WorkerMemory:
+    """Records the peak RSS of every worker process that an executor shuts down inside the block.
+
+    Engines create and close their executors internally, so this hooks
+    ``core.executors`` instead of needing a handle on the executor::
+
+        with WorkerMemory() as workers:
+            delta_stepping_dijkstra(...)
+        workers.peaks  # [(backend, role, pid, bytes), ...]
+    """
+
+    def __init__(self):
+        self.peaks = []
+
+    def _record(self, executor):
+        for role, pid in executor.worker_processes():
+            self.peaks.append((executor.name, role, pid, peak_rss(pid)))
+
+    def __enter__(self):
+        add_close_hook(self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        remove_close_hook(self._record)
+
+    def total(self, role='worker'):
+        return sum(peak or 0 for _, kind, _, peak in self.peaks if kind == role)
+
+    def largest(self, role='worker'):
+        return max((peak or 0 for _, kind, _, peak in self.peaks if kind == role), default=0)
@@ -10,6 +10,8 @@ class Node:
         self.g_cost = float('inf')
         self.h_cost = float('inf')
         self.pheromone = 1.0
+        # Connected region of open cells, set by label_components; None until labeled
+        self.component = None
 
     def f_cost(self):
         return self.g_cost + self.h_cost
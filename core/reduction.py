@@ -0,0 +1,217 @@
+"""Corridor contraction: shrink the maze graph before searching it.
+
+Two reductions, both exact for paths between the vertices that are kept:
+
+- dead-end pruning: an open cell with at most one remaining neighbor cannot be
+  inside a simple path, so it is removed, repeatedly, until every spur is gone
+- chain contraction: a maximal run of cells with exactly two neighbors becomes
+  one edge between the cells at its ends, weighted with the sum of its moves
+
+What remains are the junctions, the kept cells (start, goal, ...) and the
+edges between them; every edge remembers the cells it replaced, so a path in
+the reduced graph is expanded back to the full cell path on demand. Graphs are
+assumed undirected (every edge listed from both ends), as maze graphs are.
+"""
+import heapq
+import logging
+from collections import deque
+
+from core.grid import EDGE_WEIGHT
+from core.maze_utils import same_component
+from core.stats import ensure_stats
+
+logger = logging.getLogger(__name__)
+
+
+class ReducedGraph:
+    """Junction graph left after pruning and contraction.
+
+    ``vertices[i]`` is the original id of reduced vertex ``i``;
+    ``adjacency[i]`` lists ``(j, weight, chain)`` for every edge, where
+    ``chains[chain]`` is ``(a, b, cells)``: the reduced endpoints and the
+    original ids of the contracted cells in order from ``a`` to ``b``.
+    """
+
+    def __init__(self, vertices, adjacency, chains, original_size):
+        self.vertices = vertices
+        self.adjacency = adjacency
+        self.chains = chains
+        self.original_size = original_size
+        self.index = {original: i for i, original in enumerate(vertices)}
+
+    def __len__(self):
+        return len(self.vertices)
+
+    @property
+    def edge_count(self):
+        return len(self.chains)
+
+    def chain_cells(self, chain, source):
+        """Contracted cells of ``chain`` in the order they are walked when leaving reduced vertex ``source``."""
+        a, _, cells = self.chains[chain]
+        return cells if source == a else cells[::-1]
+
+    def expand(self, vertex_path, chain_path):
+        """Original ids along a reduced path (vertices and the chain taken between each pair)."""
+        cells = [self.vertices[vertex_path[0]]]
+        for source, target, chain in zip(vertex_path, vertex_path[1:], chain_path):
+            cells.extend(self.chain_cells(chain, source))
+            cells.append(self.vertices[target])
+        return cells
+
+    def shortest_path(self, source, target, stats=None):
+        """(cost, original ids) of the cheapest path between two kept original ids; (inf, []) if none.
+
+        Dijkstra over the reduced graph, then expansion of the chains it used.
+        """
+        stats = ensure_stats(stats, 'reduced_dijkstra')
+        if source not in self.index or target not in self.index:
+            raise ValueError("Source and target must be kept vertices of the reduced graph")
+        start, goal = self.index[source], self.index[target]
+        cost = {start: 0}
+        parent = {start: None}
+        heap = [(0, start)]
+        settled = set()
+        expansions = relaxations = 0
+        try:
+            while heap:
+                current_cost, u = heapq.heappop(heap)
+                if u in settled:
+                    continue
+                settled.add(u)
+                expansions += 1
+                if u == goal:
+                    break
+                for v, weight, chain in self.adjacency[u]:
+                    new_cost = current_cost + weight
+                    if new_cost < cost.get(v, float('inf')):
+                        cost[v] = new_cost
+                        parent[v] = (u, chain)
+                        heapq.heappush(heap, (new_cost, v))
+                        relaxations += 1
+        finally:
+            stats.add('expansions', expansions)
+            stats.add('relaxations', relaxations)
+        if goal not in settled:
+            return float('inf'), []
+
+        with stats.phase('reconstruct'):
+            vertex_path, chain_path = [goal], []
+            while parent[vertex_path[-1]] is not None:
+                u, chain = parent[vertex_path[-1]]
+                vertex_path.append(u)
+                chain_path.append(chain)
+            vertex_path.reverse()
+            chain_path.reverse()
+            return cost[goal], self.expand(vertex_path, chain_path)
+
+
+def prune_dead_ends(adjacency, keep):
+    """Set of ids left after repeatedly removing non-kept vertices with at most one live neighbor."""
+    alive = {u for u, edges in enumerate(adjacency) if edges or u in keep}
+    degree = {u: len(adjacency[u]) for u in alive}
+    queue = deque(u for u in alive if degree[u] <= 1 and u not in keep)
+    while queue:
+        u = queue.popleft()
+        if u not in alive:
+            continue
+        alive.discard(u)
+        for v, _ in adjacency[u]:
+            if v in alive:
+                degree[v] -= 1
+                if degree[v] <= 1 and v not in keep:
+                    queue.append(v)
+    return alive
+
+
+def reduce_graph(adjacency, keep=(), prune=True):
+    """Contract degree-2 chains (and prune dead ends) of an adjacency list of ``(neighbor, weight)`` pairs.
+
+    Vertices in ``keep`` always survive as reduced vertices. Of parallel
+    edges between two vertices, only the cheapest is kept; chains that
+    close on themselves are dropped.
+    """
+    keep = set(keep)
+    alive = prune_dead_ends(adjacency, keep) if prune else {u for u, edges in enumerate(adjacency)
+                                                              if edges or u in keep}
+    live = {u: [(v, w) for v, w in adjacency[u] if v in alive] for u in alive}
+    junctions = sorted(u for u in alive if len(live[u]) != 2 or u in keep)
+    index = {u: i for i, u in enumerate(junctions)}
+
+    reduced = [[] for _ in junctions]
+    chains = []
+    best = {}
+    for a in junctions:
+        for first, weight in live[a]:
+            previous, current, cells = a, first, []
+            while current not in index:
+                cells.append(current)
+                onward, step = next(edge for edge in live[current] if edge[0] != previous)
+                previous, current = current, onward
+                weight += step
+            b = current
+            # Each chain is found once from each end; record it from the lower end only
+            if index[a] >= index[b]:
+                continue
+            key = (index[a], index[b])
+            if key in best and chains[best[key]][3] <= weight:
+                continue
+            if key not in best:
+                best[key] = len(chains)
+                chains.append(None)
+            chains[best[key]] = (index[a], index[b], tuple(cells), weight)
+
+    for chain, (i, j, _, weight) in enumerate(chains):
+        reduced[i].append((j, weight, chain))
+        reduced[j].append((i, weight, chain))
+    return ReducedGraph(junctions, reduced, [(i, j, cells) for i, j, cells, _ in chains], len(adjacency))
+
+
+def reduce_nodes(nodes, keep=None, prune=True):
+    """ReducedGraph over Nodes after createFriendsList; sets ``node.id``.
+
+    ``keep`` defaults to every start ('p') and goal ('G') cell. Vertices of
+    the result are node ids (``nodes[vertex]``).
+    """
+    for index, node in enumerate(nodes):
+        node.id = index
+    if keep is None:
+        keep = [node for node in nodes if node.data in ('p', 'G')]
+    adjacency = [[] if node.data == 'X' else [(neighbor.id, EDGE_WEIGHT) for neighbor in node.friend
+                                              if neighbor.data != 'X'] for node in nodes]
+    reduced = reduce_graph(adjacency, [node.id for node in keep], prune)
+    logger.info("Reduced %d open cells to %d vertices and %d edges",
+                sum(1 for node in nodes if node.data != 'X'), len(reduced), reduced.edge_count)
+    return reduced
+
+
+def reduce_csr(graph, keep=(), prune=True):
+    """ReducedGraph over a ``core.kernels.CSRGraph`` (for example ``csr_from_walls``)."""
+    indptr, indices, weights = graph.indptr.tolist(), graph.indices.tolist(), graph.weights.tolist()
+    adjacency = [list(zip(indices[indptr[u]:indptr[u + 1]], weights[indptr[u]:indptr[u + 1]]))
+                 for u in range(len(indptr) - 1)]
+    return reduce_graph(adjacency, keep, prune)
+
+
+def reduced_dijkstra(start, goal, nodes, reduced=None, stats=None):
+    """Shortest path from start to goal searched on the contracted graph; returns the full cell path.
+
+    Pass a ``reduced`` graph from ``reduce_nodes`` to reuse it across queries
+    (start and goal must have been kept). ``g_cost`` and ``parent`` are set
+    along the returned path.
+    """
+    stats = ensure_stats(stats, 'reduced_dijkstra')
+    if not same_component(start, goal):
+        logger.info("Goal is in another component; no path")
+        return []
+    if reduced is None:
+        reduced = reduce_nodes(nodes, [start, goal])
+    _, cells = reduced.shortest_path(start.id, goal.id, stats)
+    path = [nodes[cell] for cell in cells]
+    for node in nodes:
+        node.g_cost = float('inf')
+        node.parent = None
+    for step, node in enumerate(path):
+        node.g_cost = step * EDGE_WEIGHT
+        node.parent = path[step - 1] if step else None
+    return path
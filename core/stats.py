@@ -0,0 +1,137 @@
+import logging
+import pickle
+import time
+from contextlib import contextmanager, nullcontext
+
+
+COUNTERS = (
+    'expansions',
+    'relaxations',
+    'heap_pushes',
+    'stale_pops',
+    'buckets_processed',
+    'rounds',
+    'bytes_pickled',
+)
+
+
+class SearchStats:
+    """Counters and phase timings collected during one engine run.
+
+    Pass an instance as the ``stats`` argument of any engine and it is filled
+    in place. Engines keep their hot-loop counters in local variables and add
+    them here once at the end, so the object itself is never touched per node.
+    """
+
+    enabled = True
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.timings = {}
+        self.extra = {}
+
+    def add(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def __getitem__(self, name):
+        if name in self.counters:
+            return self.counters[name]
+        if name in self.timings:
+            return self.timings[name]
+        return self.extra[name]
+
+    @contextmanager
+    def phase(self, name):
+        """Accumulate wall-clock time spent inside the block under ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def measure_pickle(self, obj):
+        """Add the pickled size of ``obj`` (what a process pool would ship)."""
+        self.counters['bytes_pickled'] += len(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+    def as_dict(self):
+        result = {'engine': self.engine}
+        result.update(self.counters)
+        for name, seconds in self.timings.items():
+            result[f'{name}_time'] = seconds
+        result.update(self.extra)
+        return result
+
+    def summary(self):
+        """Return a multi-line, human readable report."""
+        lines = [f"Search stats ({self.engine or 'unknown engine'}):"]
+        for name, value in self.counters.items():
+            if value:
+                lines.append(f"  {name}: {value}")
+        for name, seconds in self.timings.items():
+            lines.append(f"  {name} time: {seconds:.4f}s")
+        for name, value in self.extra.items():
+            lines.append(f"  {name}: {value}")
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return f"SearchStats({self.as_dict()!r})"
+
+
+class NullStats(SearchStats):
+    """Stand-in used when the caller did not ask for stats; every call is a no-op."""
+
+    enabled = False
+
+    def __init__(self):
+        super().__init__(None)
+
+    def add(self, name, amount=1):
+        pass
+
+    def phase(self, name):
+        return nullcontext()
+
+    def measure_pickle(self, obj):
+        pass
+
+
+NULL_STATS = NullStats()
+
+
+def ensure_stats(stats, engine):
+    """Return ``stats`` tagged with the engine name, or the shared no-op object."""
+    if stats is None:
+        return NULL_STATS
+    if stats.engine is None:
+        stats.engine = engine
+    return stats
+
+
+class ProgressLogger:
+    """Leveled, rate-limited progress reporting for long-running loops.
+
+    ``update`` is cheap enough to call once per expansion: only every
+    ``sample_every``-th call looks at the logger level and the clock, and at most
+    one record is emitted per ``interval`` seconds.
+    """
+
+    def __init__(self, logger, level=logging.INFO, interval=1.0, sample_every=256):
+        self.logger = logger
+        self.level = level
+        self.interval = interval
+        self.sample_every = max(1, sample_every)
+        self._calls = 0
+        self._last = time.monotonic()
+
+    def update(self, msg, *args):
+        self._calls += 1
+        if self._calls % self.sample_every:
+            return
+        if not self.logger.isEnabledFor(self.level):
+            return
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return
+        self._last = now
+        self.logger.log(self.level, msg, *args)
@@ -0,0 +1,108 @@
+import time
+from collections import namedtuple
+
+
+# Events yielded by the *_steps generators of the engines
+Expansion = namedtuple('Expansion', 'node frontier_size')
+FrontierBatch = namedtuple('FrontierBatch', 'nodes bucket')
+RelaxationRound = namedtuple('RelaxationRound', 'round updated distances')
+# Best route so far of a heuristic search (ant colonies), as a list of Nodes
+ColonyEpoch = namedtuple('ColonyEpoch', 'epoch best_cost best_path')
+# One more route of a k-shortest-paths search (rank 1 is the shortest), as a list of Nodes
+RouteFound = namedtuple('RouteFound', 'rank cost path')
+
+
+class SearchStepper:
+    """Drive a search generator a slice at a time.
+
+    The engines expose ``*_steps`` generators that yield one event per expansion
+    (or per frontier batch / relaxation round) and return the final path. The
+    stepper adds what time-sliced callers need on top of that: run for at most
+    N events or T seconds and hand control back (pausing is simply not calling
+    again), cancel, and look at partial results while the search is unfinished.
+    """
+
+    def __init__(self, generator):
+        self._generator = generator
+        self.done = False
+        self.cancelled = False
+        self.result = None
+        self.steps = 0
+        self.last_event = None
+
+    def step(self):
+        """Advance by one event; returns it, or None once the search has finished."""
+        if self.done:
+            return None
+        try:
+            event = next(self._generator)
+        except StopIteration as stop:
+            self.done = True
+            self.result = stop.value
+            return None
+        self.steps += 1
+        self.last_event = event
+        return event
+
+    def run(self, max_steps=None, time_budget=None):
+        """Advance until finished, ``max_steps`` events or ``time_budget`` seconds have passed.
+
+        Returns the list of events produced during this slice.
+        """
+        events = []
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        while not self.done:
+            if max_steps is not None and len(events) >= max_steps:
+                break
+            if deadline is not None and events and time.perf_counter() >= deadline:
+                break
+            event = self.step()
+            if event is not None:
+                events.append(event)
+        return events
+
+    def run_to_completion(self):
+        while not self.done:
+            self.step()
+        return self.result
+
+    def cancel(self):
+        """Stop the search and release its resources (worker pools are closed)."""
+        if not self.done:
+            self._generator.close()
+            self.done = True
+            self.cancelled = True
+
+    def partial_path(self, node=None):
+        """Path from the start to ``node`` (default: the most recently expanded node).
+
+        Follows the ``parent`` links the engines maintain on Nodes, so it is only
+        meaningful for nodes that have already been reached. After a
+        ColonyEpoch it is the best complete route found so far, and after a
+        RouteFound the route just found.
+        """
+        if node is None:
+            event = self.last_event
+            if isinstance(event, ColonyEpoch):
+                return list(event.best_path)
+            if isinstance(event, RouteFound):
+                return list(event.path)
+            if isinstance(event, Expansion):
+                node = event.node
+            elif isinstance(event, FrontierBatch) and event.nodes:
+                node = event.nodes[-1]
+            else:
+                return []
+        path = []
+        while node is not None:
+            path.append(node)
+            node = node.parent
+        path.reverse()
+        return path
+
+    def __iter__(self):
+        while True:
+            event = self.step()
+            if event is None:
+                return
+            yield event
@@ -0,0 +1,229 @@
+"""On-disk tiled maze store with an LRU tile cache, for mazes larger than RAM.
+
+A store is a directory:
+
+    manifest.json     format, height, width, tile size, start and goal cells
+    walls.npy         uint8 (tiles, tile_bytes): np.packbits of every tile's wall flags,
+                      tile-major so paging a tile in reads one contiguous block
+
+Tiles are numbered row-major (the tile to the right of ``t`` is ``t + 1``);
+edge tiles are padded with walls. Stores are written one band of tile rows at
+a time, from a wall array, a maze text file streamed line by line, or the
+seeded generator, so building one never holds the whole maze in memory.
+``TileCache`` pages tiles in on demand and evicts the least recently used
+ones to stay within a memory budget.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+WALLS = 'walls.npy'
+DEFAULT_TILE = (256, 256)
+DEFAULT_BUDGET = 64 * 1024 * 1024
+
+
+def write_store(directory, bands, height, width, tile_size=DEFAULT_TILE, start=None, goal=None):
+    """Write a store from ``bands``: boolean wall arrays of ``tile_rows`` rows (fewer for the last) by ``width``.
+
+    Returns the loaded TileStore.
+    """
+    tile_rows, tile_cols = tile_size
+    tiles_down, tiles_across = math.ceil(height / tile_rows), math.ceil(width / tile_cols)
+    tile_bytes = math.ceil(tile_rows * tile_cols / 8)
+    os.makedirs(directory, exist_ok=True)
+    packed = np.lib.format.open_memmap(os.path.join(directory, WALLS), mode='w+', dtype=np.uint8,
+                                       shape=(tiles_down * tiles_across, tile_bytes))
+    for band_index, band in enumerate(bands):
+        block = np.ones((tile_rows, tiles_across * tile_cols), dtype=bool)
+        block[:band.shape[0], :width] = band
+        tiles = block.reshape(tile_rows, tiles_across, tile_cols).transpose(1, 0, 2).reshape(tiles_across, -1)
+        packed[band_index * tiles_across:(band_index + 1) * tiles_across] = np.packbits(tiles, axis=1)
+    packed.flush()
+    del packed
+    manifest = {'format': FORMAT_VERSION, 'height': height, 'width': width, 'tile_rows': tile_rows,
+                'tile_cols': tile_cols, 'start': start, 'goal': goal}
+    with open(os.path.join(directory, MANIFEST), 'w') as file:
+        json.dump(manifest, file, indent=1)
+    return TileStore.load(directory)
+
+
+def store_from_walls(directory, walls, tile_size=DEFAULT_TILE, start=None, goal=None):
+    """Store of an in-memory wall array (for tests and for converting existing mazes)."""
+    tile_rows = tile_size[0]
+    bands = (walls[row:row + tile_rows] for row in range(0, walls.shape[0], tile_rows))
+    # Cells may hold NumPy integers (say, from core.grid.open_cells), which json cannot write
+    return write_store(directory, bands, walls.shape[0], walls.shape[1], tile_size,
+                       [int(x) for x in start] if start is not None else None,
+                       [int(x) for x in goal] if goal is not None else None)
+
+
+def store_from_file(directory, filename, tile_size=DEFAULT_TILE):
+    """Store of a maze text file (the read_File_Create_List format), read one band of lines at a time.
+
+    The last 'p' and 'G' cells become the start and goal, as in createFriendsList.
+    """
+    with open(filename) as file:
+        height, width = 0, 0
+        for line in file:
+            height += 1
+            width = max(width, len(line.strip()))
+    markers = {}
+
+    def bands():
+        with open(filename) as file:
+            band = np.ones((tile_size[0], width), dtype=bool)
+            filled = 0
+            for row, line in enumerate(file):
+                line = line.strip()
+                for marker in ('p', 'G'):
+                    col = line.rfind(marker)
+                    if col >= 0:
+                        markers[marker] = [row, col]
+                band[filled] = True
+                band[filled, :len(line)] = np.frombuffer(line.encode(), dtype=np.uint8) == ord('X')
+                filled += 1
+                if filled == tile_size[0]:
+                    yield band
+                    filled = 0
+            if filled:
+                yield band[:filled]
+
+    store = write_store(directory, bands(), height, width, tile_size)
+    return store.with_endpoints(markers.get('p'), markers.get('G'))
+
+
+def generate_store(directory, height, width, wall_density=0.2, seed=0, tile_size=DEFAULT_TILE):
+    """Seeded random maze written band by band; start is the top-left and goal the bottom-right cell."""
+    def bands():
+        for band_index, row in enumerate(range(0, height, tile_size[0])):
+            rng = np.random.default_rng((seed, band_index))
+            band = rng.random((min(tile_size[0], height - row), width)) < wall_density
+            if row == 0:
+                band[0, 0] = False
+            if row + band.shape[0] == height:
+                band[-1, -1] = False
+            yield band
+
+    return write_store(directory, bands(), height, width, tile_size, [0, 0], [height - 1, width - 1])
+
+
+class TileStore:
+    """Read access to a store directory; use a TileCache to page tiles in."""
+
+    def __init__(self, directory, manifest):
+        if manifest.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported tile store format {manifest.get('format')!r} in {directory}")
+        self.directory = directory
+        self.manifest = manifest
+        self.height, self.width = manifest['height'], manifest['width']
+        self.tile_rows, self.tile_cols = manifest['tile_rows'], manifest['tile_cols']
+        self.tile_cells = self.tile_rows * self.tile_cols
+        self.tiles_across = math.ceil(self.width / self.tile_cols)
+        self.tiles_down = math.ceil(self.height / self.tile_rows)
+        self.start = tuple(manifest['start']) if manifest.get('start') else None
+        self.goal = tuple(manifest['goal']) if manifest.get('goal') else None
+        self._packed = np.load(os.path.join(directory, WALLS), mmap_mode='r')
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, MANIFEST)) as file:
+            return cls(directory, json.load(file))
+
+    def with_endpoints(self, start, goal):
+        """Record start and goal cells in the manifest; returns the reloaded store."""
+        self.manifest.update(start=start, goal=goal)
+        with open(os.path.join(self.directory, MANIFEST), 'w') as file:
+            json.dump(self.manifest, file, indent=1)
+        return TileStore.load(self.directory)
+
+    @property
+    def tile_count(self):
+        return self.tiles_down * self.tiles_across
+
+    def locate(self, row, col):
+        """(tile id, offset inside the tile) of a cell."""
+        tile_row, local_row = divmod(row, self.tile_rows)
+        tile_col, local_col = divmod(col, self.tile_cols)
+        return tile_row * self.tiles_across + tile_col, local_row * self.tile_cols + local_col
+
+    def read_tile(self, tile):
+        """Wall flags of one tile as ``bytes`` (1 on walls), row-major inside the tile."""
+        return np.unpackbits(self._packed[tile], count=self.tile_cells).tobytes()
+
+    def walls(self):
+        """The whole wall array; only for mazes that fit in memory."""
+        tiles = np.unpackbits(self._packed, axis=1, count=self.tile_cells).astype(bool)
+        grid = tiles.reshape(self.tiles_down, self.tiles_across, self.tile_rows, self.tile_cols)
+        return grid.transpose(0, 2, 1, 3).reshape(self.tiles_down * self.tile_rows, -1)[:self.height, :self.width]
+
+
+class TileCache:
+    """LRU cache of unpacked tiles holding at most ``budget`` bytes."""
+
+    def __init__(self, store, budget=DEFAULT_BUDGET):
+        self.store = store
+        self.capacity = max(1, budget // store.tile_cells)
+        self._tiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, tile):
+        walls = self._tiles.get(tile)
+        if walls is not None:
+            self._tiles.move_to_end(tile)
+            self.hits += 1
+            return walls
+        self.misses += 1
+        walls = self._tiles[tile] = self.store.read_tile(tile)
+        if len(self._tiles) > self.capacity:
+            self._tiles.popitem(last=False)
+            self.evictions += 1
+        return walls
+
+    def __len__(self):
+        return len(self._tiles)
+
+    @property
+    def resident_bytes(self):
+        return len(self._tiles) * self.store.tile_cells
+
+
+def parse_size(text):
+    """'256' -> (256, 256), '512x256' -> (512, 256): columns, then rows."""
+    width, _, height = text.partition('x')
+    return int(width), int(height or width)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write a tiled on-disk maze store.')
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--maze', help='maze text file to convert')
+    parser.add_argument('--generate', metavar='WxH', help='generate a seeded random maze of this size instead')
+    parser.add_argument('--density', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tile', default='256', help='tile size, e.g. 256 or 512x256 (columns x rows)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    tile_cols, tile_rows = parse_size(args.tile)
+    start_time = time.time()
+    if args.generate:
+        width, height = parse_size(args.generate)
+        store = generate_store(args.out, height, width, args.density, args.seed, (tile_rows, tile_cols))
+    elif args.maze:
+        store = store_from_file(args.out, args.maze, (tile_rows, tile_cols))
+    else:
+        parser.error("pass --maze or --generate")
+    print(f"Wrote {store.height}x{store.width} maze as {store.tile_count} tiles to {args.out} "
+          f"in {time.time() - start_time:.2f}s")
@@ -0,0 +1,76 @@
+import json
+import math
+import os
+import multiprocessing as mp
+
+# Profile written by autotune.py and read by delta_stepping_dijkstra.
+# Set PDC_TUNING_PROFILE to point the solver at a different file.
+DEFAULT_PROFILE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'tuning_profile.json')
+PROFILE_VERSION = 1
+
+_cache = {}
+
+
+def profile_path(path=None):
+    return path or os.environ.get('PDC_TUNING_PROFILE') or DEFAULT_PROFILE_PATH
+
+
+def load_profile(path=None):
+    """Load a tuning profile, returning None when it is missing or unreadable.
+
+    The parsed file is cached by modification time so repeated solver calls do
+    not hit the disk.
+    """
+    path = profile_path(path)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(path, 'r') as file:
+            profile = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if profile.get('version') != PROFILE_VERSION:
+        return None
+    _cache[path] = (mtime, profile)
+    return profile
+
+
+def save_profile(entries, path=None):
+    """Merge tuned entries into the profile, replacing any with the same size and density."""
+    path = profile_path(path)
+    profile = load_profile(path) or {'version': PROFILE_VERSION, 'entries': []}
+    profile['cpu_count'] = mp.cpu_count()
+    new_keys = {(e['cells'], e['wall_density']) for e in entries}
+    kept = [e for e in profile['entries'] if (e['cells'], e['wall_density']) not in new_keys]
+    profile['entries'] = sorted(kept + list(entries), key=lambda e: (e['cells'], e['wall_density']))
+    with open(path, 'w') as file:
+        json.dump(profile, file, indent=2)
+    _cache.pop(path, None)
+    return path
+
+
+def tuned_parameters(num_cells, wall_density=None, path=None):
+    """Return the profile entry closest in size to ``num_cells``, or None.
+
+    Sizes are compared on a log scale. When ``wall_density`` is given it breaks
+    ties between entries of similar size. ``num_processes`` is clamped to the
+    cores available on this machine.
+    """
+    profile = load_profile(path)
+    if not profile or not profile.get('entries'):
+        return None
+
+    def distance(entry):
+        size_gap = abs(math.log(max(1, entry['cells'])) - math.log(max(1, num_cells)))
+        density_gap = abs(entry['wall_density'] - wall_density) if wall_density is not None else 0.0
+        return size_gap, density_gap
+
+    entry = dict(min(profile['entries'], key=distance))
+    entry['num_processes'] = max(1, min(entry['num_processes'], mp.cpu_count()))
+    return entry
@@ -0,0 +1,288 @@
+"""Coordinator for the distributed tiled solver.
+
+The grid is cut into tiles as in ``algorithms.tiled_dijkstra``, and contiguous
+bands of tiles are assigned to partition workers (``distributed.worker``)
+reached over TCP. Each bulk-synchronous round the coordinator sends every
+active tile the border values of its neighbors, workers relax their tiles
+locally and send back only borders that changed, and the tiles next to those
+borders become active. When no border changes, the distance field is collected
+from the workers and assembled.
+
+Run workers on each host with ``python -m distributed.worker --port 8790``
+and point the coordinator at them, or use ``--local N`` to start N worker
+processes on this machine in their place.
+"""
+import argparse
+import logging
+import multiprocessing as mp
+import time
+from multiprocessing.connection import Client
+
+import numpy as np
+
+from algorithms.tiled_dijkstra import INF, make_tiles, default_tile_size, trace_path
+from core.grid import wall_grid, wall_grid_from_nodes
+from core.maze_utils import read_File_Create_List, same_component
+from core.stats import ensure_stats, ProgressLogger
+from core.stepper import SearchStepper, RelaxationRound
+from distributed.worker import authkey_from_env, check_bind, run_worker
+
+logger = logging.getLogger(__name__)
+
+
+def parse_address(text):
+    """'host:port' -> (host, port)."""
+    host, _, port = text.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def spawn_local_workers(count, host='127.0.0.1', authkey=None):
+    """Start ``count`` worker processes on free local ports; returns (processes, addresses)."""
+    check_bind(host, authkey)
+    ready = mp.Queue()
+    processes = [mp.Process(target=run_worker, args=(host, 0, authkey, ready), daemon=True) for _ in range(count)]
+    try:
+        for process in processes:
+            process.start()
+        addresses = [ready.get(timeout=30) for _ in processes]
+    except BaseException:
+        stop_local_workers(processes, timeout=0)
+        raise
+    return processes, addresses
+
+
+def stop_local_workers(processes, timeout=5.0):
+    """Wait for local workers to exit, terminating any still running after ``timeout`` seconds.
+
+    Workers a coordinator never reached (say, because connecting failed) do
+    not get a 'shutdown' message and are terminated here.
+    """
+    deadline = time.monotonic() + timeout
+    for process in processes:
+        if process.pid is None:
+            continue
+        process.join(max(0.0, deadline - time.monotonic()))
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+
+class Coordinator:
+    """Connections to a fixed set of partition workers, reused across jobs."""
+
+    def __init__(self, addresses, authkey=None, connect_timeout=10.0):
+        self.addresses = list(addresses)
+        self.authkey = authkey or authkey_from_env()
+        self.connect_timeout = connect_timeout
+        self.connections = []
+
+    def connect(self):
+        deadline = time.monotonic() + self.connect_timeout
+        for address in self.addresses:
+            while True:
+                try:
+                    self.connections.append(Client(address, authkey=self.authkey))
+                    break
+                except ConnectionRefusedError:
+                    # The worker may still be starting up
+                    if time.monotonic() >= deadline:
+                        raise
+                    time.sleep(0.1)
+        logger.info("Connected to %d workers", len(self.connections))
+        return self
+
+    def close(self, shutdown=False):
+        """Disconnect; with ``shutdown`` the workers exit instead of waiting for the next coordinator."""
+        for conn in self.connections:
+            try:
+                conn.send(('shutdown',) if shutdown else ('release',))
+            except OSError:
+                pass
+            conn.close()
+        self.connections = []
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _exchange(self, messages, stats):
+        """Send one message per worker (None to skip it), then gather the replies in worker order."""
+        if stats.enabled:
+            stats.measure_pickle([message for message in messages if message is not None])
+        for conn, message in zip(self.connections, messages):
+            if message is not None:
+                conn.send(message)
+        replies = []
+        for conn, message in zip(self.connections, messages):
+            reply = conn.recv() if message is not None else None
+            if reply is not None and reply[0] == 'error':
+                raise RuntimeError(f"worker error: {reply[1]}")
+            replies.append(reply)
+        return replies
+
+    def distance_steps(self, walls, sources, tile_size=None, stats=None):
+        """Generator form of the distributed solver: yields a RelaxationRound per round.
+
+        The distance field stays on the workers until the search converges, so
+        the events carry ``distances=None``. Returns the assembled field (inf
+        where unreachable) from the nearest of ``sources``.
+        """
+        stats = ensure_stats(stats, 'distributed_dijkstra')
+        progress = ProgressLogger(logger, sample_every=1)
+        rounds = relaxations = settled = 0
+        height, width = walls.shape
+        num_workers = len(self.connections)
+
+        tile_rows, tile_cols = tile_size or default_tile_size(height, width, num_workers)
+        bounds, tiles_across = make_tiles(height, width, tile_rows, tile_cols)
+        # Contiguous bands of tiles per worker, so most neighbors share an owner
+        owner = [index * num_workers // len(bounds) for index in range(len(bounds))]
+        logger.info("Distributing %d tiles of %dx%d cells over %d workers",
+                    len(bounds), tile_rows, tile_cols, num_workers)
+
+        tile_sources = {}
+        for row, col in sources:
+            if not walls[row, col]:
+                tile_sources.setdefault((row // tile_rows) * tiles_across + col // tile_cols, []).append((row, col))
+
+        loads = [[] for _ in range(num_workers)]
+        for index, (row_start, row_end, col_start, col_end) in enumerate(bounds):
+            loads[owner[index]].append((index, bounds[index], walls[row_start:row_end, col_start:col_end].copy(),
+                                        tile_sources.get(index, [])))
+        with stats.phase('dispatch'):
+            self._exchange([('load', load) for load in loads], stats)
+
+        # Latest known (top, bottom, left, right) border of every tile
+        borders = [[None] * 4 for _ in bounds]
+        active = set(tile_sources)
+
+        try:
+            while active:
+                tasks = [[] for _ in range(num_workers)]
+                for index in sorted(active):
+                    row_start, row_end, col_start, col_end = bounds[index]
+                    halos = (borders[index - tiles_across][1] if row_start > 0 else None,
+                             borders[index + tiles_across][0] if row_end < height else None,
+                             borders[index - 1][3] if col_start > 0 else None,
+                             borders[index + 1][2] if col_end < width else None)
+                    tasks[owner[index]].append((index, halos))
+                with stats.phase('dispatch'):
+                    replies = self._exchange([('round', task) if task else None for task in tasks], stats)
+                rounds += 1
+
+                updated = 0
+                next_active = set()
+                with stats.phase('merge'):
+                    for reply in replies:
+                        if reply is None:
+                            continue
+                        for index, improved, tile_settled, changed, tile_borders in reply[1]:
+                            updated += improved
+                            settled += tile_settled
+                            for side, values in enumerate(tile_borders):
+                                if values is not None:
+                                    borders[index][side] = values
+                            row_start, row_end, col_start, col_end = bounds[index]
+                            top, bottom, left, right = changed
+                            if top and row_start > 0:
+                                next_active.add(index - tiles_across)
+                            if bottom and row_end < height:
+                                next_active.add(index + tiles_across)
+                            if left and col_start > 0:
+                                next_active.add(index - 1)
+                            if right and col_end < width:
+                                next_active.add(index + 1)
+                relaxations += updated
+                progress.update("Round %d: %d tiles, %d cells improved", rounds, len(active), updated)
+                yield RelaxationRound(rounds, updated, None)
+                active = next_active
+
+            with stats.phase('merge'):
+                field = np.full((height, width), INF)
+                for reply in self._exchange([('collect',)] * num_workers, stats):
+                    for index, local in reply[1].items():
+                        row_start, row_end, col_start, col_end = bounds[index]
+                        field[row_start:row_end, col_start:col_end] = np.asarray(local).reshape(
+                            row_end - row_start, col_end - col_start)
+        finally:
+            stats.add('rounds', rounds)
+            stats.add('relaxations', relaxations)
+            stats.add('expansions', settled)
+
+        logger.info("Converged after %d rounds", rounds)
+        return field
+
+
+def distributed_dijkstra(start, goal, nodes, addresses=None, num_workers=None, tile_size=None, stats=None):
+    """Shortest path between two Nodes, solved by partition workers over TCP.
+
+    ``addresses`` lists (host, port) of running workers; when omitted,
+    ``num_workers`` local worker processes are started for the call and shut
+    down afterwards. Returns (path, execution_time, rounds).
+    """
+    start_time = time.time()
+    if not same_component(start, goal):
+        # No workers are started or contacted for a query with no possible path
+        logger.info("Goal is in another component; no path")
+        return [], time.time() - start_time, 0
+    stats = ensure_stats(stats, 'distributed_dijkstra')
+    processes = []
+    if addresses is None:
+        processes, addresses = spawn_local_workers(num_workers or mp.cpu_count())
+    coordinator = Coordinator(addresses)
+    try:
+        coordinator.connect()
+        stepper = SearchStepper(coordinator.distance_steps(wall_grid_from_nodes(nodes), [(start.row, start.col)],
+                                                           tile_size, stats))
+        field = stepper.run_to_completion()
+    finally:
+        coordinator.close(shutdown=bool(processes))
+        stop_local_workers(processes)
+
+    with stats.phase('reconstruct'):
+        by_cell = {(node.row, node.col): node for node in nodes}
+        for node in nodes:
+            node.g_cost = field[node.row, node.col]
+            node.parent = None
+        path = [by_cell[cell] for cell in trace_path(field, (goal.row, goal.col))]
+        for parent, child in zip(path, path[1:]):
+            child.parent = parent
+
+    execution_time = time.time() - start_time
+    logger.info("Distributed Dijkstra completed in %.4f seconds", execution_time)
+    return path, execution_time, stepper.steps
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Solve a maze on distributed partition workers.')
+    parser.add_argument('--maze', default='maze.txt')
+    parser.add_argument('--workers', help='comma-separated host:port list of running workers')
+    parser.add_argument('--local', type=int, default=None, help='start this many local workers instead')
+    parser.add_argument('--tile', type=int, nargs=2, metavar=('ROWS', 'COLS'), default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    maze = read_File_Create_List(args.maze)
+    walls = wall_grid(maze)
+    cells = {maze[row][col]: (row, col) for row in range(len(maze)) for col in range(len(maze[row]))}
+
+    processes = []
+    if args.workers:
+        addresses = [parse_address(text) for text in args.workers.split(',')]
+    else:
+        processes, addresses = spawn_local_workers(args.local or mp.cpu_count())
+    coordinator = Coordinator(addresses)
+    try:
+        coordinator.connect()
+        start_time = time.time()
+        stepper = SearchStepper(coordinator.distance_steps(walls, [cells['p']], args.tile))
+        field = stepper.run_to_completion()
+        elapsed = time.time() - start_time
+    finally:
+        coordinator.close(shutdown=bool(processes))
+        stop_local_workers(processes)
+    path = trace_path(field, cells['G'])
+    print(f"Rounds: {stepper.steps}, time: {elapsed:.4f}s")
+    print(f"Path cost: {field[cells['G']]:.0f} ({len(path)} cells)" if path else "No path found!")
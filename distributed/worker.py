@@ -0,0 +1,144 @@
+"""Partition worker for the distributed tiled solver.
+
+A worker listens on a TCP address with ``multiprocessing.connection`` and
+serves one coordinator at a time. It keeps the tiles it was assigned (walls and
+current distances) in memory across rounds, so only tile borders travel over
+the network. Messages are tuples whose first item names the command:
+
+    ('load', [(tile_index, bounds, tile_walls, seeded), ...])  -> ('ok', cells)
+    ('round', [(tile_index, halos), ...])                      -> ('done', results)
+    ('collect',)                                               -> ('tiles', {tile_index: distances})
+    ('release',)    end this job and wait for the next coordinator
+    ('shutdown',)   exit the worker
+"""
+import argparse
+import ipaddress
+import logging
+import os
+from multiprocessing.connection import Listener
+
+from algorithms.tiled_dijkstra import INF, relax_local, changed_edges, border_values
+
+logger = logging.getLogger(__name__)
+
+# Only good enough for workers bound to loopback; see check_bind
+DEFAULT_AUTHKEY = b'pdc-maze-solver'
+
+
+def authkey_from_env():
+    """Shared secret for worker connections; set PDC_AUTHKEY on every host to override the default."""
+    value = os.environ.get('PDC_AUTHKEY')
+    return value.encode() if value else DEFAULT_AUTHKEY
+
+
+def is_loopback(host):
+    """Whether ``host`` is 'localhost' or a loopback address."""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def check_bind(host, authkey=None):
+    """Refuse to listen beyond loopback with the public default key.
+
+    Connections unpickle what they receive, so anyone holding the key can run
+    code in the worker. Raises ValueError unless ``host`` is loopback, a key
+    was passed, or PDC_AUTHKEY is set.
+    """
+    if not is_loopback(host) and authkey is None and not os.environ.get('PDC_AUTHKEY'):
+        raise ValueError(f"Refusing to listen on {host} with the default authkey; set PDC_AUTHKEY on every host")
+
+
+class TileState:
+    """One owned tile: its open cells and current distances, flat and row-major."""
+
+    def __init__(self, bounds, walls, sources):
+        row_start, row_end, col_start, col_end = bounds
+        self.width = col_end - col_start
+        self.open_cells = (~walls).ravel().tolist()
+        self.local = [INF] * len(self.open_cells)
+        for row, col in sources:
+            index = (row - row_start) * self.width + col - col_start
+            if self.open_cells[index]:
+                self.local[index] = 0.0
+        self.seed_all = bool(sources)
+
+    def relax(self, halos):
+        # The first round starts from the seeded sources, so compare against an
+        # unreached tile; otherwise a border holding a source is never sent
+        original = [INF] * len(self.local) if self.seed_all else list(self.local)
+        settled = relax_local(self.local, self.open_cells, self.width, halos, self.seed_all)
+        self.seed_all = False
+        improved = sum(1 for new, old in zip(self.local, original) if new < old)
+        changed = changed_edges(self.local, original, self.width)
+        borders = tuple(values if flag else None
+                        for values, flag in zip(border_values(self.local, self.width), changed))
+        return improved, settled, changed, borders
+
+
+def handle_job(conn):
+    """Serve one coordinator connection; returns True when asked to shut down."""
+    tiles = {}
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return False
+        command = message[0]
+        if command == 'load':
+            tiles = {index: TileState(bounds, walls, sources) for index, bounds, walls, sources in message[1]}
+            conn.send(('ok', sum(len(tile.local) for tile in tiles.values())))
+        elif command == 'round':
+            results = []
+            for index, halos in message[1]:
+                improved, settled, changed, borders = tiles[index].relax(halos)
+                results.append((index, improved, settled, changed, borders))
+            conn.send(('done', results))
+        elif command == 'collect':
+            conn.send(('tiles', {index: tile.local for index, tile in tiles.items()}))
+        elif command == 'release':
+            return False
+        elif command == 'shutdown':
+            return True
+        else:
+            conn.send(('error', f"unknown command {command!r}"))
+
+
+def serve(listener):
+    """Accept coordinators one after another until one sends 'shutdown'."""
+    logger.info("Worker listening on %s", listener.address)
+    while True:
+        with listener.accept() as conn:
+            logger.info("Coordinator connected from %s", listener.last_accepted)
+            if handle_job(conn):
+                return
+
+
+def run_worker(host, port, authkey=None, ready=None):
+    """Listen on (host, port) and serve; ``ready`` (a queue) receives the bound address."""
+    check_bind(host, authkey)
+    with Listener((host, port), authkey=authkey or authkey_from_env()) as listener:
+        if ready is not None:
+            ready.put(listener.address)
+        serve(listener)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Partition worker for distributed.coordinator.')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='address to listen on; anything beyond loopback requires PDC_AUTHKEY')
+    parser.add_argument('--port', type=int, default=8790)
+    args = parser.parse_args()
+    try:
+        check_bind(args.host)
+    except ValueError as error:
+        parser.error(str(error))
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    try:
+        run_worker(args.host, args.port)
+    except KeyboardInterrupt:
+        pass
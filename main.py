@@ -1,15 +1,9 @@
-from visuals.draw import Draw
-from visuals.draw import reset_maze
-from visuals.draw import setup_maze
-import turtle
 from core.maze_utils import read_File_Create_List
 from core.maze_utils import createNodes
 from core.maze_utils import createFriendsList
-from algorithms.a_star import A_star_Search
-from algorithms.dijkstra import dijkstra_search
-# Import the parallel implementation
-from algorithms.parallel_dijkstra import delta_stepping_dijkstra
-from algorithms.parallel_astar import parallel_a_star
+from core.stats import SearchStats
+from core.stepper import SearchStepper
+import logging
 import time
 # Add to imports at top
 # from algorithms.delta_stepping_dijkstra import delta_stepping_dijkstra
@@ -29,22 +23,48 @@ def print_maze_with_path(maze_list, path_nodes):
     for row in maze_copy:
         print(''.join(row))
 
+def open_window(maze_list):
+    """Create the turtle window and pens and draw the maze; GUI modules are imported only here."""
+    import turtle
+    from visuals.draw import Draw, setup_maze
+
+    wn = turtle.Screen()
+    wn.bgcolor("black")
+    wn.title("Maze Solver")
+    wn.setup(1400, 800)
+    Wall = Draw("W")
+    Start = Draw("p")
+    goal_pen = Draw("G")
+    path = Draw("B")
+    finalPath = Draw("F")
+    setup_maze(maze_list, Wall, Start, goal_pen)
+    return wn, path, finalPath, goal_pen
+
+def animate_search(wn, stepper, path, steps_per_tick=25):
+    """Advance the search a few expansions per timer tick so the window stays responsive."""
+    def tick():
+        for event in stepper.run(max_steps=steps_per_tick):
+            node = event.node
+            if node.data not in ('p', 'G'):
+                path.goto(node.x, node.y)
+                path.stamp()
+        if not stepper.done:
+            wn.ontimer(tick, 0)
+    tick()
+
 def dijkstra_performance_test(root, goal_node, n, maze_list, path, finalPath, goal_pen, num_processes, delta):
     # run sequential
     pass
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     user_input = int(input(
         "Enter 1 for A*, 2 for Dijkstra, 3 for Bellman-Ford, 4 for Parallel Dijkstra: ," \
-        "5 for Parallel A*"))
+        "5 for Parallel A*, 6 for Ant Colony"))
     filename = "maze.txt"
     print(filename)
-    Wall = Draw("W")
-    Start = Draw("p")
-    goal_pen = Draw("G")
-    path = Draw("B")
-    finalPath = Draw("F")
-    pen_for_pheromone = Draw("pheromone")
+    # Pens are only created for the options that draw (see open_window)
+    path = finalPath = goal_pen = None
     
     maze_list = read_File_Create_List(filename)
     n = createNodes(maze_list)
@@ -52,21 +72,15 @@ if __name__ == '__main__':
     # wn.onkey(lambda: reset_maze(path, finalPath), 'r')
 
     if user_input == 1:
-        wn = turtle.Screen()
-        wn.bgcolor("black")
-        wn.title("Maze Solver")
-        wn.setup(1400, 800)
-        setup_maze(maze_list, Wall, Start, goal_pen)
+        from algorithms.a_star import A_star_Search
+        wn, path, finalPath, goal_pen = open_window(maze_list)
         A_star_Search(root, goal_node, n, path, finalPath, goal_pen)
         wn.mainloop()
     elif user_input == 2:
-        wn = turtle.Screen()
-        wn.bgcolor("black")
-        wn.title("Maze Solver")
-        wn.setup(1400, 800)
-        setup_maze(maze_list, Wall, Start, goal_pen)
+        from algorithms.dijkstra import dijkstra_steps
+        wn, path, finalPath, goal_pen = open_window(maze_list)
         
-        dijkstra_search(root, goal_node, n, maze_list, path, finalPath, goal_pen)
+        animate_search(wn, SearchStepper(dijkstra_steps(root, goal_node, n)), path)
         wn.mainloop()
     elif user_input == 3:
         pass
@@ -75,15 +89,19 @@ if __name__ == '__main__':
         #                     path, finalPath, goal_pen)
     elif user_input == 4:
         # Run Delta-Stepping Dijkstra
-        num_processes = int(input("Enter number of processes (or 0 for auto): ") or "0")
-        delta = int(input("Enter delta value (or 0 for default): ") or "0")
+        from algorithms.parallel_dijkstra import delta_stepping_dijkstra
+        num_processes = int(input("Enter number of processes (or 0 for tuned/auto): ") or "0")
+        delta = int(input("Enter delta value (or 0 for tuned/default): ") or "0")
         if num_processes <= 0:
             num_processes = None
         if delta <= 0:
-            delta = 20  # Default delta value
+            delta = None  # Tuned profile value, or 20 when no profile exists
         # setup_maze(maze_list, Wall, Start, goal_pen)
-        final_path, execution_time, _ = delta_stepping_dijkstra(root, goal_node, n, maze_list, path, finalPath, goal_pen, num_processes, delta)
+        stats = SearchStats()
+        final_path, execution_time, _ = delta_stepping_dijkstra(root, goal_node, n, maze_list, path, finalPath, goal_pen, num_processes, delta,
+                                                                stats=stats)
         print(f"Execution time: {execution_time:.2f} seconds")
+        print(stats.summary())
         print("Final path coordinates:")
         for node in final_path:
             print(f"  ({node.row}, {node.col}) at position ({node.x}, {node.y})")
@@ -94,13 +112,16 @@ if __name__ == '__main__':
         # Update the section that calls parallel_a_star:
     
     elif user_input == 5:
+        from algorithms.parallel_astar import parallel_a_star
         # setup_maze(maze_list, Wall, Start, goal_pen)
         start_time = time.time()
-        final_path, nodes_processed = parallel_a_star(root, goal_node, n, maze_list, path, finalPath, goal_pen)
+        stats = SearchStats()
+        final_path, nodes_processed = parallel_a_star(root, goal_node, n, maze_list, path, finalPath, goal_pen, stats=stats)
         execution_time = time.time() - start_time
         
         print(f"Parallel A* search completed in {execution_time:.4f} seconds")
         print(f"Nodes processed: {nodes_processed}")
+        print(stats.summary())
         
         if final_path:
             print(f"Path found with {len(final_path)} steps")
@@ -111,5 +132,24 @@ if __name__ == '__main__':
         else:
             print("No path found!")
     elif user_input == 6:
-        print("Running Parallel Dijkstra...")
+        from algorithms.ant_colony import ant_colony
+        from visuals.draw import Draw
+        wn, path, finalPath, goal_pen = open_window(maze_list)
+        stats = SearchStats()
+        final_path, execution_time, epochs = ant_colony(root, goal_node, n, stats=stats)
+        print(f"Ant colony search completed in {execution_time:.4f} seconds ({epochs} epochs)")
+        print(stats.summary())
+        # Stamp the strongest trails, then the best path over them
+        pen_for_pheromone = Draw("pheromone")
+        strongest = max(node.pheromone for node in n)
+        for node in n:
+            if node.data not in ('X', 'p', 'G') and node.pheromone >= strongest / 2:
+                pen_for_pheromone.goto(node.x, node.y)
+                pen_for_pheromone.stamp()
+        for node in final_path[1:-1]:
+            finalPath.goto(node.x, node.y)
+            finalPath.stamp()
+        if not final_path:
+            print("No path found!")
+        wn.mainloop()
     
\ No newline at end of file
@@ -1,12 +1,12 @@
+import argparse
 import time
-import matplotlib.pyplot as plt
-from core.maze_utils import generate_maze
+from core.corpus import Corpus, trial_mazes
 from core.maze_utils import createNodes, createFriendsList
-from algorithms.a_star import A_star_Search
+from algorithms.a_star import a_star_steps
 from algorithms.parallel_astar import parallel_a_star
-from visuals.draw import Draw
+from core.stepper import SearchStepper
 
-def a_star_performance_test(sizes=None, num_trials=3, wall_density=0.2):
+def a_star_performance_test(sizes=None, num_trials=3, wall_density=0.2, seed=0, corpus=None, family='random'):
     """
     Run performance tests comparing sequential and parallel A* algorithms
     on mazes of increasing sizes.
@@ -15,6 +15,9 @@ def a_star_performance_test(sizes=None, num_trials=3, wall_density=0.2):
         sizes: List of (width, height) tuples for maze sizes
         num_trials: Number of trials to run for each size (results will be averaged)
         wall_density: Density of walls in the generated mazes
+        seed: Seed of the first trial's maze when no corpus is given
+        corpus: core.corpus.Corpus to replay the mazes from, or None to generate them
+        family: Maze family to replay from the corpus
         
     Returns:
         Dictionary with test results
@@ -33,10 +36,8 @@ def a_star_performance_test(sizes=None, num_trials=3, wall_density=0.2):
         'speedup': []
     }
     
-    # Create dummy visualization objects (not actually used for timing tests)
-    path = Draw("B")
-    finalPath = Draw("F")
-    goal_pen = Draw("G")
+    # No visualization while timing, so no turtle window is needed
+    path = finalPath = goal_pen = None
     
     # Run tests for each maze size
     for width, height in sizes:
@@ -46,11 +47,10 @@ def a_star_performance_test(sizes=None, num_trials=3, wall_density=0.2):
         size_sequential_nodes = []
         size_parallel_nodes = []
         
-        for trial in range(num_trials):
-            print(f"  Trial {trial+1}/{num_trials}...")
-            
-            # Generate random maze
-            maze_list = generate_maze(width, height, wall_density)
+        # Seeded or replayed instances, prepared before any trial is timed
+        mazes = trial_mazes(width, height, num_trials, wall_density, seed, corpus, family)
+        for trial, maze_list in enumerate(mazes):
+            print(f"  Trial {trial+1}/{len(mazes)}...")
             
             # Setup maze nodes and graph
             nodes = createNodes(maze_list)
@@ -76,16 +76,9 @@ def a_star_performance_test(sizes=None, num_trials=3, wall_density=0.2):
             # For now, we'll time it externally
             sequential_start_time = time.time()
             try:
-                # The original A_star_Search doesn't return path, so we'll handle that
-                # by catching exceptions and recording known results
-                A_star_Search(sequential_start, sequential_goal, sequential_nodes, path, finalPath, goal_pen)
-                # Count path nodes by following parent pointers from goal
-                path_nodes = []
-                current = sequential_goal
-                while current is not None:
-                    path_nodes.append(current)
-                    current = current.parent
-                sequential_path = path_nodes[::-1]  # Reverse to get start-to-goal
+                # A_star_Search draws every expansion, so time the headless generator form instead
+                sequential_path = SearchStepper(
+                    a_star_steps(sequential_start, sequential_goal, sequential_nodes)).run_to_completion()
             except Exception as e:
                 print(f"  Sequential A* error: {e}")
                 sequential_path = []
@@ -137,6 +130,7 @@ def a_star_performance_test(sizes=None, num_trials=3, wall_density=0.2):
     return results
 
 def plot_results(results):
+    import matplotlib.pyplot as plt
     """Plot the performance comparison results."""
     plt.figure(figsize=(12, 10))
     
@@ -223,6 +217,12 @@ def modified_a_star_search(start, goal, nodes, original_maze=None, path=None, fi
     return path_list, nodes_explored
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare sequential and parallel A* on seeded mazes.')
+    parser.add_argument('--corpus', help='replay the mazes of a corpus directory (see core/corpus.py)')
+    parser.add_argument('--family', default='random', help='maze family to replay from the corpus')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
     # Define maze sizes to test: (width, height)
     # Use slightly larger mazes to better see the parallel performance difference
     sizes = [(10,10), (20, 20), (30, 30), (40, 40), (50, 50)]
@@ -231,4 +231,5 @@ if __name__ == "__main__":
     wall_density = 0.25
     
     # Run the performance test with 3 trials per maze size
-    a_star_performance_test(sizes=sizes, num_trials=3, wall_density=wall_density)
\ No newline at end of file
+    a_star_performance_test(sizes=sizes, num_trials=3, wall_density=wall_density, seed=args.seed,
+                            corpus=Corpus.load(args.corpus) if args.corpus else None, family=args.family)
\ No newline at end of file
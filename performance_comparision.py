@@ -1,12 +1,12 @@
+import argparse
 import time
-import matplotlib.pyplot as plt
-from core.maze_utils import generate_maze
+from core.corpus import Corpus, trial_mazes
 from core.maze_utils import createNodes, createFriendsList
 from algorithms.dijkstra import dijkstra_search
 from algorithms.parallel_dijkstra import delta_stepping_dijkstra
-from visuals.draw import Draw
 
-def performance_test(sizes=None, num_trials=3, wall_density=0.2, num_processes=8, delta=20):
+def performance_test(sizes=None, num_trials=3, wall_density=0.2, num_processes=None, delta=None, seed=0,
+                     corpus=None):
     """
     Run performance tests comparing sequential and parallel Dijkstra algorithms
     on mazes of increasing sizes.
@@ -15,8 +15,10 @@ def performance_test(sizes=None, num_trials=3, wall_density=0.2, num_processes=8
         sizes: List of (width, height) tuples for maze sizes
         num_trials: Number of trials to run for each size (results will be averaged)
         wall_density: Density of walls in the generated mazes
-        num_processes: Number of processes for parallel algorithm (None for auto)
-        delta: Delta parameter for parallel Dijkstra
+        num_processes: Number of processes for parallel algorithm (None for tuned/auto)
+        delta: Delta parameter for parallel Dijkstra (None for tuned/default)
+        seed: Seed of the first trial's maze when no corpus is given
+        corpus: core.corpus.Corpus to replay the mazes from, or None to generate them
         
     Returns:
         Dictionary with test results
@@ -34,10 +36,8 @@ def performance_test(sizes=None, num_trials=3, wall_density=0.2, num_processes=8
         'speedup': []
     }
     
-    # Create dummy visualization objects (not actually used)
-    path = Draw("B")
-    finalPath = Draw("F")
-    goal_pen = Draw("G")
+    # No visualization while timing, so no turtle window is needed
+    path = finalPath = goal_pen = None
     
     # Run tests for each maze size
     for width, height in sizes:
@@ -47,12 +47,11 @@ def performance_test(sizes=None, num_trials=3, wall_density=0.2, num_processes=8
         size_sequential_nodes = []
         size_parallel_nodes = []
         
-        for trial in range(num_trials):
-            print(f"  Trial {trial+1}/{num_trials}...")
+        # Seeded or replayed instances, prepared before any trial is timed
+        mazes = trial_mazes(width, height, num_trials, wall_density, seed, corpus)
+        for trial, maze_list in enumerate(mazes):
+            print(f"  Trial {trial+1}/{len(mazes)}...")
             
-            # Generate random maze
-            maze_list = generate_maze(width, height, wall_density)
-            # print(maze_list)
             # Setup maze nodes and graph
             nodes = createNodes(maze_list)
             start, goal, edge_list = createFriendsList(nodes)
@@ -108,6 +107,7 @@ def performance_test(sizes=None, num_trials=3, wall_density=0.2, num_processes=8
     return results
 
 def plot_results(results):
+    import matplotlib.pyplot as plt
     """Plot the performance comparison results."""
     plt.figure(figsize=(12, 10))
     
@@ -135,8 +135,14 @@ def plot_results(results):
     plt.show()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare sequential and parallel Dijkstra on seeded mazes.')
+    parser.add_argument('--corpus', help='replay the mazes of a corpus directory (see core/corpus.py)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
     # Define maze sizes to test: (width, height)
     sizes = [(10, 10), (20, 20), (30, 30), (40, 40), (50, 50)]
     
     # Run the performance test
-    performance_test(sizes=sizes, num_trials=3)
\ No newline at end of file
+    performance_test(sizes=sizes, num_trials=3, seed=args.seed,
+                     corpus=Corpus.load(args.corpus) if args.corpus else None)
\ No newline at end of file
@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from core.maze_utils import read_File_Create_List
+
+
+def open_cells(maze_file):
+    maze = read_File_Create_List(maze_file)
+    return [[row, col] for row in range(len(maze)) for col in range(len(maze[row])) if maze[row][col] != 'X']
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_connection(host, port, queries, pipeline, latencies, errors):
+    """Send ``queries`` over one connection with at most ``pipeline`` requests outstanding."""
+    reader, writer = await asyncio.open_connection(host, port)
+    sent_at = {}
+    window = asyncio.Semaphore(pipeline)
+
+    async def receive():
+        for _ in range(len(queries)):
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("server closed the connection")
+            response = json.loads(line)
+            latencies.append(time.perf_counter() - sent_at.pop(response['id']))
+            if 'error' in response:
+                errors.append(response['error'])
+            window.release()
+
+    receiver = asyncio.create_task(receive())
+    for request_id, start, goal in queries:
+        await window.acquire()
+        sent_at[request_id] = time.perf_counter()
+        writer.write(json.dumps({'id': request_id, 'start': start, 'goal': goal}).encode() + b'\n')
+        await writer.drain()
+    await receiver
+    writer.close()
+    await writer.wait_closed()
+
+
+async def generate_load(host, port, maze_file, connections=16, requests=200, pipeline=4, seed=0):
+    """
+    Drive the path service with random queries and measure latency.
+
+    Args:
+        host: Server host
+        port: Server port
+        maze_file: The maze the server loaded, used to pick open start/goal cells
+        connections: Concurrent client connections
+        requests: Requests per connection
+        pipeline: Outstanding requests allowed per connection
+        seed: Seed for picking query cells
+
+    Returns:
+        Dictionary with throughput and latency percentiles
+    """
+    rng = random.Random(seed)
+    cells = open_cells(maze_file)
+    workloads = []
+    for c in range(connections):
+        workloads.append([(c * requests + i, rng.choice(cells), rng.choice(cells)) for i in range(requests)])
+
+    latencies = []
+    errors = []
+    start_time = time.perf_counter()
+    await asyncio.gather(*(run_connection(host, port, queries, pipeline, latencies, errors)
+                           for queries in workloads))
+    elapsed = time.perf_counter() - start_time
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load generator for service.server.')
+    parser.add_argument('--maze', default='maze.txt')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200, help='requests per connection')
+    parser.add_argument('--pipeline', type=int, default=4, help='outstanding requests per connection')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    report = asyncio.run(generate_load(args.host, args.port, args.maze, args.connections, args.requests,
+                                       args.pipeline, args.seed))
+    print(f"{report['requests']} requests ({report['errors']} errors) in {report['seconds']:.2f}s")
+    print(f"Throughput: {report['throughput']:.1f} req/s")
+    print(f"Latency p50: {report['p50_ms']:.2f} ms, p99: {report['p99_ms']:.2f} ms, max: {report['max_ms']:.2f} ms")
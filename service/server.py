@@ -0,0 +1,268 @@
+"""Line-delimited JSON shortest-path service.
+
+Each request is one JSON object per line::
+
+    {"id": 1, "start": [row, col], "goal": [row, col]}
+
+and each response echoes the id::
+
+    {"id": 1, "cost": 720, "path": [[row, col], ...]}
+    {"id": 1, "error": "goal is a wall"}
+
+Responses may come back out of order on a pipelined connection. Queries that
+arrive within ``batch_window`` seconds of each other are coalesced into one
+batch, grouped by start cell so that one search answers every goal that shares
+a start, and solved on a pool of workers that loaded the maze at startup.
+Workers also label the maze's connected components once, so a query whose
+endpoints lie in different regions is answered "no path" without a search.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing as mp
+
+from core.components import ComponentIndex
+from core.grid import wall_grid
+from core.maze_utils import read_File_Create_List
+
+logger = logging.getLogger(__name__)
+
+EDGE_WEIGHT = 20
+
+# Maze and its component labels, loaded once in every worker by init_worker
+global_maze = None
+global_components = None
+
+
+def init_worker(maze_file):
+    global global_maze, global_components
+    global_maze = read_File_Create_List(maze_file)
+    global_components = ComponentIndex(wall_grid(global_maze))
+
+
+def validate_cell(maze, cell, name):
+    """Return an error message for an unusable cell, or None."""
+    try:
+        row, col = cell
+    except (TypeError, ValueError):
+        return f"{name} must be [row, col]"
+    if not (isinstance(row, int) and isinstance(col, int)):
+        return f"{name} must be [row, col]"
+    if row < 0 or row >= len(maze) or col < 0 or col >= len(maze[row]):
+        return f"{name} is outside the maze"
+    if maze[row][col] == 'X':
+        return f"{name} is a wall"
+    return None
+
+
+def search_from(maze, start, goals):
+    """Breadth-first search from ``start`` until every cell in ``goals`` is reached.
+
+    Every edge weighs the same, so BFS order equals Dijkstra order. Returns the
+    parent map, which covers all reached goals.
+    """
+    remaining = set(goals)
+    remaining.discard(start)
+    parents = {start: None}
+    queue = deque([start])
+    while queue and remaining:
+        row, col = queue.popleft()
+        for d_row, d_col in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+            n_row, n_col = row + d_row, col + d_col
+            if n_row < 0 or n_row >= len(maze) or n_col < 0 or n_col >= len(maze[n_row]):
+                continue
+            neighbor = (n_row, n_col)
+            if neighbor in parents or maze[n_row][n_col] == 'X':
+                continue
+            parents[neighbor] = (row, col)
+            remaining.discard(neighbor)
+            queue.append(neighbor)
+    return parents
+
+
+def solve_batch(queries):
+    """Answer a batch of queries; runs inside a warm worker.
+
+    Args:
+        queries: List of (request_id, start, goal) with cells as [row, col]
+
+    Returns:
+        List of response dicts in the same order
+    """
+    maze = global_maze
+    responses = [None] * len(queries)
+    by_start = defaultdict(list)
+    for index, (request_id, start, goal) in enumerate(queries):
+        error = validate_cell(maze, start, 'start') or validate_cell(maze, goal, 'goal')
+        if error:
+            responses[index] = {'id': request_id, 'error': error}
+        elif not global_components.connected(start, goal):
+            responses[index] = {'id': request_id, 'error': 'no path'}
+        else:
+            by_start[tuple(start)].append((index, request_id, tuple(goal)))
+
+    for start, group in by_start.items():
+        parents = search_from(maze, start, [goal for _, _, goal in group])
+        for index, request_id, goal in group:
+            if goal not in parents:
+                responses[index] = {'id': request_id, 'error': 'no path'}
+                continue
+            path = []
+            cell = goal
+            while cell is not None:
+                path.append(list(cell))
+                cell = parents[cell]
+            path.reverse()
+            responses[index] = {'id': request_id, 'cost': (len(path) - 1) * EDGE_WEIGHT, 'path': path}
+    return responses
+
+
+class PathService:
+    """Accepts connections, coalesces queries into batches and dispatches them to a warm pool.
+
+    Backpressure: at most ``max_pending`` queries wait for a batch. When the queue
+    is full, connection handlers stop reading their sockets until space frees up,
+    so clients are slowed down by TCP flow control instead of the server buffering
+    without bound. At most one batch per worker is in flight at a time.
+    """
+
+    def __init__(self, maze_file, num_workers=None, batch_window=0.002, max_batch=256, max_pending=4096,
+                 use_threads=False):
+        self.maze_file = maze_file
+        self.num_workers = max(1, num_workers or mp.cpu_count())
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.use_threads = use_threads
+        self.batches = 0
+        self.queries = 0
+
+    async def start(self, host='127.0.0.1', port=8765):
+        if self.use_threads:
+            init_worker(self.maze_file)
+            self.pool = ThreadPoolExecutor(max_workers=self.num_workers)
+        else:
+            self.pool = ProcessPoolExecutor(max_workers=self.num_workers, initializer=init_worker,
+                                            initargs=(self.maze_file,))
+        # Warm every worker before accepting traffic so the first queries do not pay for startup
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, solve_batch, []) for _ in range(self.num_workers)))
+
+        self.pending = asyncio.Queue(maxsize=self.max_pending)
+        self.in_flight = asyncio.Semaphore(self.num_workers)
+        self.batcher = asyncio.create_task(self._batch_loop())
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        logger.info("Serving %s on %s with %d workers",
+                    self.maze_file, ', '.join(str(s.getsockname()) for s in self.server.sockets), self.num_workers)
+        return self.server
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.batcher.cancel()
+        self.pool.shutdown(cancel_futures=True)
+
+    async def _handle_connection(self, reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    query = (request.get('id'), request['start'], request['goal'])
+                except (ValueError, KeyError, AttributeError):
+                    await self._send(writer, write_lock, {'id': None, 'error': 'malformed request'})
+                    continue
+                future = asyncio.get_running_loop().create_future()
+                await self.pending.put((query, future))
+                task = asyncio.create_task(self._reply(writer, write_lock, future))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _reply(self, writer, write_lock, future):
+        response = await future
+        await self._send(writer, write_lock, response)
+
+    async def _send(self, writer, write_lock, response):
+        async with write_lock:
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.pending.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.pending.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self.in_flight.acquire()
+            asyncio.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            queries = [query for query, _ in batch]
+            try:
+                responses = await loop.run_in_executor(self.pool, solve_batch, queries)
+            except Exception as exc:
+                logger.exception("Batch of %d queries failed", len(batch))
+                responses = [{'id': query[0], 'error': f'internal error: {exc}'} for query in queries]
+            for (_, future), response in zip(batch, responses):
+                if not future.done():
+                    future.set_result(response)
+            self.batches += 1
+            self.queries += len(batch)
+        finally:
+            self.in_flight.release()
+
+
+async def serve(args):
+    service = PathService(args.maze, args.workers, args.batch_window / 1000.0, args.max_batch, args.max_pending,
+                          args.threads)
+    server = await service.start(args.host, args.port)
+    start_time = time.monotonic()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        elapsed = time.monotonic() - start_time
+        logger.info("Answered %d queries in %d batches over %.1fs", service.queries, service.batches, elapsed)
+        await service.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve shortest-path queries on one preloaded maze.')
+    parser.add_argument('--maze', default='maze.txt')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--threads', action='store_true', help='use a thread pool instead of processes')
+    parser.add_argument('--batch-window', type=float, default=2.0, help='milliseconds to wait while filling a batch')
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-pending', type=int, default=4096, help='queued queries before reads pause')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass